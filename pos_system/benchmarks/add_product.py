@@ -0,0 +1,47 @@
+"""Latency of ReceiptsDB.add_product as the receipt grows.
+
+python -m pos_system.benchmarks.add_product
+"""
+
+from __future__ import annotations
+
+import time
+from statistics import mean
+from uuid import UUID
+
+from pos_system.benchmarks.common import percentile, seed_products, temporary_db
+from pos_system.infra.repository import ConnectionPool, ReceiptsDB
+
+SIZES = (1, 10, 100, 500)
+SCANS = 200
+
+
+def run(receipts: ReceiptsDB, product_ids: list[UUID], lines: int) -> list[float]:
+    receipt = receipts.create()
+    for product_id in product_ids[:lines]:
+        receipts.add_product(receipt.id, product_id, 1)
+
+    timings = []
+    for i in range(SCANS):
+        start = time.perf_counter()
+        receipts.add_product(receipt.id, product_ids[i % lines], 1)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main() -> None:
+    with temporary_db() as db_file:
+        product_ids = seed_products(db_file, max(SIZES))
+        pool = ConnectionPool(db_file)
+        receipts = ReceiptsDB(pool)
+
+        print(f"{'lines':>6} {'mean ms':>9} {'p95 ms':>9}")
+        for lines in SIZES:
+            timings = run(receipts, product_ids, lines)
+            p95 = percentile(timings, 95)
+            print(f"{lines:>6} {mean(timings) * 1e3:>9.3f} {p95 * 1e3:>9.3f}")
+        pool.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Barcode lookup latency over a 200k-SKU catalog, against listing the catalog.
+
+python -m pos_system.benchmarks.barcode
+"""
+
+from __future__ import annotations
+
+import random
+import time
+from statistics import mean
+
+from fastapi.testclient import TestClient
+
+from pos_system.benchmarks.common import percentile, seed_products, temporary_db
+from pos_system.runner.settings import Settings
+from pos_system.runner.setup import init_app
+
+CATALOG_SIZE = 200_000
+LOOKUPS = 2_000
+
+
+def lookups(client: TestClient, barcodes: list[str]) -> list[float]:
+    timings = []
+    for barcode in barcodes:
+        start = time.perf_counter()
+        response = client.get(f"/products/by-barcode/{barcode}")
+        timings.append(time.perf_counter() - start)
+        assert response.status_code == 200
+    return timings
+
+
+def report(name: str, timings: list[float]) -> None:
+    print(
+        f"{name:>14}: mean {mean(timings) * 1e3:7.3f} ms"
+        f"  p50 {percentile(timings, 50) * 1e3:7.3f} ms"
+        f"  p99 {percentile(timings, 99) * 1e3:7.3f} ms"
+    )
+
+
+def main() -> None:
+    with temporary_db() as db_file:
+        seed_products(db_file, CATALOG_SIZE)
+        barcodes = [f"{i:013d}" for i in random.sample(range(CATALOG_SIZE), LOOKUPS)]
+
+        with TestClient(init_app(Settings(db_file))) as client:
+            report("cold (index)", lookups(client, barcodes))
+            report("warm (cache)", lookups(client, barcodes))
+
+            start = time.perf_counter()
+            client.get("/products")
+            print(
+                f"{'GET /products':>14}: {(time.perf_counter() - start) * 1e3:.0f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,282 @@
+"""End-to-end cashier workload: concurrent cashiers open receipts, scan items,
+read and close (or now and then delete) them while a manager polls /sales.
+
+Runs against init_app() in process, or against a live `run` server with
+--live, on either backend and optionally with the receipt journal. Prints a
+table, or JSON with --json.
+
+    python -m pos_system.benchmarks.cashiers --cashiers 16 --receipts 50
+    python -m pos_system.benchmarks.cashiers --backend memory
+    python -m pos_system.benchmarks.cashiers --journal
+    python -m pos_system.benchmarks.cashiers --writer
+    python -m pos_system.benchmarks.cashiers --live --json
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from dataclasses import asdict, dataclass, field, replace
+from pathlib import Path
+from typing import Annotated, AsyncIterator
+
+import httpx
+from typer import Option, Typer
+
+from pos_system.benchmarks.common import percentile
+from pos_system.runner.settings import Backend, Settings
+from pos_system.runner.setup import init_app
+
+cli = Typer(add_completion=False)
+
+
+@dataclass
+class Workload:
+    cashiers: int = 8
+    receipts: int = 25
+    max_items: int = 20
+    catalog: int = 500
+    delete_rate: float = 0.05
+    poll_interval: float = 0.5
+
+
+@dataclass
+class Timings:
+    samples: dict[str, list[float]] = field(default_factory=lambda: defaultdict(list))
+
+    async def request(
+        self,
+        client: httpx.AsyncClient,
+        endpoint: str,
+        method: str,
+        url: str,
+        body: object = None,
+    ) -> httpx.Response:
+        start = time.perf_counter()
+        response = await client.request(method, url, json=body)
+        self.samples[endpoint].append(time.perf_counter() - start)
+        response.raise_for_status()
+        return response
+
+
+async def seed(client: httpx.AsyncClient, catalog: int) -> list[str]:
+    unit = await client.post("/units", json={"name": f"pc-{random.random()}"})
+    unit_id = unit.json()["unit"]["id"]
+    rows = [
+        {"unit_id": unit_id, "name": f"p{i}", "barcode": f"{i:013d}", "price": 1.5}
+        for i in range(catalog)
+    ]
+    (await client.post("/products/batch", json=rows)).raise_for_status()
+    products = (await client.get("/products")).json()["products"]
+    return [product["id"] for product in products]
+
+
+async def cashier(
+    client: httpx.AsyncClient, timings: Timings, workload: Workload, ids: list[str]
+) -> None:
+    for _ in range(workload.receipts):
+        opened = await timings.request(client, "POST /receipts", "POST", "/receipts")
+        url = f"/receipts/{opened.json()['receipt']['id']}"
+        for _ in range(random.randint(1, workload.max_items)):
+            scan = {"id": random.choice(ids), "quantity": 1}
+            await timings.request(
+                client, "POST /receipts/{id}/products", "POST", url + "/products", scan
+            )
+        await timings.request(client, "GET /receipts/{id}", "GET", url)
+        if random.random() < workload.delete_rate:
+            await timings.request(client, "DELETE /receipts/{id}", "DELETE", url)
+        else:
+            closed = {"status": "closed"}
+            await timings.request(client, "PATCH /receipts/{id}", "PATCH", url, closed)
+
+
+async def manager(
+    client: httpx.AsyncClient, timings: Timings, interval: float, done: asyncio.Event
+) -> None:
+    while not done.is_set():
+        await timings.request(client, "GET /sales", "GET", "/sales")
+        try:
+            await asyncio.wait_for(done.wait(), interval)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def replay(
+    client: httpx.AsyncClient, workload: Workload, db_file: Path
+) -> dict[str, object]:
+    ids = await seed(client, workload.catalog)
+    size_before = db_size(db_file)
+    timings = Timings()
+    done = asyncio.Event()
+    polling = asyncio.create_task(
+        manager(client, timings, workload.poll_interval, done)
+    )
+
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(cashier(client, timings, workload, ids) for _ in range(workload.cashiers))
+    )
+    elapsed = time.perf_counter() - start
+    done.set()
+    await polling
+
+    requests = sum(len(samples) for samples in timings.samples.values())
+    return {
+        "workload": asdict(workload),
+        "seconds": elapsed,
+        "requests_per_second": requests / elapsed,
+        "receipts_per_second": workload.cashiers * workload.receipts / elapsed,
+        "db_bytes_before": size_before,
+        "db_bytes_after": db_size(db_file),
+        "endpoints": {
+            endpoint: {
+                "requests": len(samples),
+                "p50_ms": percentile(samples, 50) * 1e3,
+                "p95_ms": percentile(samples, 95) * 1e3,
+                "p99_ms": percentile(samples, 99) * 1e3,
+            }
+            for endpoint, samples in sorted(timings.samples.items())
+        },
+    }
+
+
+def db_size(db_file: Path) -> int:
+    files = (db_file, db_file.with_name(db_file.name + "-wal"))
+    return sum(path.stat().st_size for path in files if path.exists())
+
+
+@asynccontextmanager
+async def in_process(settings: Settings) -> AsyncIterator[httpx.AsyncClient]:
+    app = init_app(settings)
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://pos") as c:
+            yield c
+
+
+@asynccontextmanager
+async def live_server(
+    settings: Settings, port: int, workers: int = 1
+) -> AsyncIterator[httpx.AsyncClient]:
+    env = {
+        **os.environ,
+        **settings.to_env(),
+        "PYTHONPATH": os.pathsep.join(sys.path),
+    }
+    command = ["--port", str(port), "--workers", str(workers)]
+    server = subprocess.Popen(
+        [sys.executable, "-m", "pos_system.runner", *command],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}") as client:
+            await wait_until_up(client)
+            yield client
+    finally:
+        server.terminate()
+        server.wait()
+
+
+async def wait_until_up(client: httpx.AsyncClient, timeout: float = 30) -> None:
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            (await client.get("/sales")).raise_for_status()
+            return
+        except httpx.TransportError:
+            if time.monotonic() > deadline:
+                raise
+            await asyncio.sleep(0.1)
+
+
+def describe(settings: Settings) -> str:
+    journal = "+journal" if settings.journal else ""
+    writer = "+writer" if settings.writer else ""
+    return f"{settings.backend}{journal}{writer}"
+
+
+async def run(
+    workload: Workload, settings: Settings, use_live: bool, port: int
+) -> dict[str, object]:
+    """Replay the workload on a fresh database in a temporary directory, which
+    settings.journal, if set, is taken relative to.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        db_file = Path(directory) / "pos_db.db"
+        settings = replace(
+            settings,
+            database=str(db_file),
+            journal=settings.journal and str(Path(directory) / settings.journal),
+        )
+        if use_live:
+            target = live_server(settings, port)
+        else:
+            target = in_process(settings)
+        async with target as client:
+            result = await replay(client, workload, db_file)
+    return {
+        "target": "live" if use_live else "in-process",
+        "mode": describe(settings),
+        **result,
+    }
+
+
+def print_table(result: dict[str, object]) -> None:
+    print(
+        f"{result['target']} {result['mode']}: "
+        f"{result['requests_per_second']:,.0f} req/s, "
+        f"{result['receipts_per_second']:,.1f} receipts/s, db "
+        f"{result['db_bytes_before']:,} -> {result['db_bytes_after']:,} bytes"
+    )
+    endpoints = result["endpoints"]
+    assert isinstance(endpoints, dict)
+    print(f"{'endpoint':<30} {'n':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for endpoint, stats in endpoints.items():
+        print(
+            f"{endpoint:<30} {stats['requests']:>6} {stats['p50_ms']:>8.2f}"
+            f" {stats['p95_ms']:>8.2f} {stats['p99_ms']:>8.2f}"
+        )
+
+
+@cli.command()
+def main(
+    cashiers: int = Workload.cashiers,
+    receipts: int = Workload.receipts,
+    max_items: int = Workload.max_items,
+    catalog: int = Workload.catalog,
+    delete_rate: float = Workload.delete_rate,
+    poll_interval: float = Workload.poll_interval,
+    backend: Backend = "sqlite",
+    journal: bool = False,
+    writer: bool = False,
+    live: bool = False,
+    port: int = 8765,
+    json_output: Annotated[bool, Option("--json")] = False,
+) -> None:
+    workload = Workload(
+        cashiers, receipts, max_items, catalog, delete_rate, poll_interval
+    )
+    settings = Settings(
+        backend=backend,
+        journal="receipts.journal" if journal else None,
+        writer=writer,
+    )
+    result = asyncio.run(run(workload, settings, live, port))
+    if json_output:
+        print(json.dumps(result, indent=2))
+    else:
+        print_table(result)
+
+
+if __name__ == "__main__":
+    cli()
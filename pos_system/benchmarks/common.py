@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+import os
+import sqlite3
+import tempfile
+from contextlib import contextmanager
+from statistics import quantiles
+from typing import Iterator
+from uuid import UUID, uuid4
+
+from pos_system.sqlite import create_tables
+
+
+@contextmanager
+def temporary_db() -> Iterator[str]:
+    with tempfile.TemporaryDirectory() as directory:
+        db_file = os.path.join(directory, "bench.db")
+        create_tables(db_file)
+        yield db_file
+
+
+def seed_products(db_file: str, count: int, price: float = 1.5) -> list[UUID]:
+    unit_id = uuid4()
+    product_ids = [uuid4() for _ in range(count)]
+    with sqlite3.connect(db_file) as conn:
+        conn.execute(
+            "INSERT INTO units (uuid, name) VALUES (?, ?)", (str(unit_id), "pc")
+        )
+        conn.executemany(
+            "INSERT INTO products (uuid, unit_id, name, barcode, price)"
+            " VALUES (?, ?, ?, ?, ?)",
+            [
+                (str(product_id), str(unit_id), f"p{i}", f"{i:013d}", price)
+                for i, product_id in enumerate(product_ids)
+            ],
+        )
+    conn.close()
+    return product_ids
+
+
+def percentile(timings: list[float], p: int) -> float:
+    if len(timings) < 2:
+        return timings[0]
+    return quantiles(timings, n=100)[p - 1]
@@ -0,0 +1,42 @@
+"""Write contention: the cashier workload at 1, 8 and 32 concurrent cashiers,
+with writes queued for SQLite's write lock on the event loop (the default)
+or sent as commands to the single batching writer.
+
+    python -m pos_system.benchmarks.contention --receipts 20
+"""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any
+
+from typer import Typer
+
+from pos_system.benchmarks.cashiers import Workload, run
+from pos_system.runner.settings import Settings
+
+cli = Typer(add_completion=False)
+
+CASHIERS = (1, 8, 32)
+SCAN = "POST /receipts/{id}/products"
+
+
+@cli.command()
+def main(receipts: int = 10, max_items: int = Workload.max_items) -> None:
+    print(f"{'cashiers':>8} {'mode':>10} {'req/s':>8} {'scan p50':>9} {'scan p99':>9}")
+    for cashiers in CASHIERS:
+        workload = Workload(cashiers, receipts, max_items)
+        for writer in (False, True):
+            result: dict[str, Any] = asyncio.run(
+                run(workload, Settings(writer=writer), use_live=False, port=0)
+            )
+            scans = result["endpoints"][SCAN]
+            print(
+                f"{cashiers:>8} {'writer' if writer else 'lock':>10}"
+                f" {result['requests_per_second']:>8,.0f}"
+                f" {scans['p50_ms']:>8.2f}ms {scans['p99_ms']:>8.2f}ms"
+            )
+
+
+if __name__ == "__main__":
+    cli()
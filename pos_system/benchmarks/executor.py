@@ -0,0 +1,91 @@
+"""Requests/sec of the cashier workload on the old sync path (plain `def`
+routes calling the repository, as before async routes) versus the async
+routes with repository calls on Starlette's shared thread pool or on a
+dedicated, bounded executor.
+
+    python -m pos_system.benchmarks.executor
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Any
+from uuid import UUID
+
+import httpx
+from fastapi import FastAPI
+
+from pos_system.benchmarks.common import seed_products, temporary_db
+from pos_system.infra.metrics import MetricsMiddleware
+from pos_system.infra.repository import ConnectionPool, ReceiptsDB
+from pos_system.infra.repository.executor import Executor
+from pos_system.runner.settings import Settings
+from pos_system.runner.setup import init_app
+
+CONCURRENCY = 32
+REQUESTS_PER_CLIENT = 100
+
+
+async def cashier(client: httpx.AsyncClient, product_id: UUID) -> None:
+    receipt_id = (await client.post("/receipts")).json()["receipt"]["id"]
+    for i in range(REQUESTS_PER_CLIENT):
+        if i % 2:
+            await client.get(f"/receipts/{receipt_id}")
+        else:
+            await client.post(
+                f"/receipts/{receipt_id}/products",
+                json={"id": str(product_id), "quantity": 1},
+            )
+
+
+def sync_app(pool: ConnectionPool) -> FastAPI:
+    """The receipt routes the workload uses, as sync routes over ReceiptsDB."""
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+    receipts = ReceiptsDB(pool)
+
+    @app.post("/receipts", status_code=201)  # type: ignore
+    def create_receipt() -> dict[str, Any]:
+        return {"receipt": receipts.create()}
+
+    @app.post("/receipts/{receipt_id}/products", status_code=201)  # type: ignore
+    def add_product(receipt_id: UUID, line: dict[str, str]) -> dict[str, Any]:
+        receipts.add_product(receipt_id, UUID(line["id"]), int(line["quantity"]))
+        return {"receipt": receipts.get(receipt_id)}
+
+    @app.get("/receipts/{receipt_id}")  # type: ignore
+    def get_receipt(receipt_id: UUID) -> dict[str, Any]:
+        return {"receipt": receipts.get(receipt_id)}
+
+    return app
+
+
+async def run(app: FastAPI, product_id: UUID) -> float:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://pos") as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(cashier(client, product_id) for _ in range(CONCURRENCY)))
+        elapsed = time.perf_counter() - start
+    return CONCURRENCY * (REQUESTS_PER_CLIENT + 1) / elapsed
+
+
+def main() -> None:
+    with temporary_db() as db_file:
+        (product_id,) = seed_products(db_file, 1)
+        pool = ConnectionPool(db_file)
+        rps = asyncio.run(run(sync_app(pool), product_id))
+        pool.close()
+        print(f"{'sync':>10}: {rps:,.0f} req/s")
+
+        modes = {"threadpool": Executor(), "dedicated": Executor(max_workers=8)}
+        for name, executor in modes.items():
+            app = init_app(Settings(db_file), executor)
+            rps = asyncio.run(run(app, product_id))
+            executor.shutdown()
+            app.state.db.close()
+            print(f"{name:>10}: {rps:,.0f} req/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""Rows/sec through POST /products/batch for JSON, NDJSON and CSV payloads.
+
+python -m pos_system.benchmarks.product_import
+"""
+
+from __future__ import annotations
+
+import json
+import time
+from typing import Any
+
+from fastapi.testclient import TestClient
+
+from pos_system.benchmarks.common import seed_products, temporary_db
+from pos_system.runner.settings import Settings
+from pos_system.runner.setup import init_app
+
+ROWS = 50_000
+
+
+def payloads(unit_id: str) -> dict[str, tuple[str, bytes]]:
+    def rows(prefix: str) -> list[dict[str, Any]]:
+        return [
+            {"unit_id": unit_id, "name": f"n{i}", "barcode": f"{prefix}{i}", "price": 1}
+            for i in range(ROWS)
+        ]
+
+    csv_rows = "".join(
+        f"{row['unit_id']},{row['name']},{row['barcode']},{row['price']}\n"
+        for row in rows("csv-")
+    )
+    return {
+        "json": ("application/json", json.dumps(rows("json-")).encode()),
+        "ndjson": (
+            "application/x-ndjson",
+            "\n".join(json.dumps(row) for row in rows("ndjson-")).encode(),
+        ),
+        "csv": ("text/csv", ("unit_id,name,barcode,price\n" + csv_rows).encode()),
+    }
+
+
+def main() -> None:
+    with temporary_db() as db_file:
+        seed_products(db_file, 1)
+        with TestClient(init_app(Settings(db_file))) as client:
+            unit_id = client.get("/units").json()["units"][0]["id"]
+            for name, (content_type, body) in payloads(unit_id).items():
+                start = time.perf_counter()
+                response = client.post(
+                    "/products/batch",
+                    content=body,
+                    headers={"content-type": content_type},
+                )
+                elapsed = time.perf_counter() - start
+                assert response.json()["created"] == ROWS
+                print(f"{name:>7}: {ROWS / elapsed:,.0f} rows/s")
+
+
+if __name__ == "__main__":
+    main()
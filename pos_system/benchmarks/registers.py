@@ -0,0 +1,57 @@
+"""Scans/sec with several registers writing at once, each in its own thread
+and BEGIN IMMEDIATE unit of work, as requests do.
+
+    python -m pos_system.benchmarks.registers
+"""
+
+from __future__ import annotations
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from uuid import UUID
+
+from pos_system.benchmarks.common import seed_products, temporary_db
+from pos_system.infra.repository import ConnectionPool, ReceiptsDB, ReportDB
+
+REGISTERS = (1, 4, 16)
+RECEIPTS = 20
+SCANS = 25
+
+
+def register(pool: ConnectionPool, product_id: UUID) -> None:
+    for _ in range(RECEIPTS):
+        with pool.unit_of_work(immediate=True) as uow:
+            receipt = ReceiptsDB(uow).create()
+        for _ in range(SCANS):
+            with pool.unit_of_work(immediate=True) as uow:
+                ReceiptsDB(uow).add_product(receipt.id, product_id, 1)
+        with pool.unit_of_work(immediate=True) as uow:
+            ReceiptsDB(uow).close(receipt.id)
+
+
+def run(registers: int) -> tuple[float, bool]:
+    with temporary_db() as db_file:
+        (product_id,) = seed_products(db_file, 1, price=1.0)
+        pool = ConnectionPool(db_file, size=registers)
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(registers) as executor:
+            list(executor.map(lambda _: register(pool, product_id), range(registers)))
+        elapsed = time.perf_counter() - start
+
+        report = ReportDB(pool).get()
+        pool.close()
+    closed = registers * RECEIPTS
+    exact = report.n_receipts == closed and report.revenue == closed * SCANS
+    return closed * SCANS / elapsed, exact
+
+
+def main() -> None:
+    print(f"{'registers':>9} {'scans/s':>9} {'exact':>6}")
+    for registers in REGISTERS:
+        rate, exact = run(registers)
+        print(f"{registers:>9} {rate:>9,.0f} {str(exact):>6}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Read scaling across worker processes: a live `run --workers N` server for
+each N, hammered with product lookups by id from several client processes
+for a fixed time. The server gets a fresh database, seeded over the API.
+
+    python -m pos_system.benchmarks.scaling --workers 1 --workers 2 --workers 4
+
+Throughput can only grow with N while there are cores to spare for both the
+workers and the clients; compare against `nproc`.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import random
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Annotated
+
+import httpx
+from typer import Option, Typer
+
+from pos_system.benchmarks.cashiers import live_server, seed
+from pos_system.benchmarks.common import percentile
+from pos_system.runner.settings import Settings
+
+cli = Typer(add_completion=False)
+
+
+async def lookups(
+    base_url: str, ids: list[str], concurrency: int, seconds: float
+) -> list[float]:
+    samples: list[float] = []
+    deadline = time.perf_counter() + seconds
+
+    async def loop(client: httpx.AsyncClient) -> None:
+        while (start := time.perf_counter()) < deadline:
+            response = await client.get(f"/products/{random.choice(ids)}")
+            response.raise_for_status()
+            samples.append(time.perf_counter() - start)
+
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits) as client:
+        await asyncio.gather(*(loop(client) for _ in range(concurrency)))
+    return samples
+
+
+def client_process(
+    base_url: str, ids: list[str], concurrency: int, seconds: float
+) -> list[float]:
+    return asyncio.run(lookups(base_url, ids, concurrency, seconds))
+
+
+async def measure(
+    workers: int, clients: int, concurrency: int, seconds: float, port: int
+) -> dict[str, float]:
+    with tempfile.TemporaryDirectory() as directory:
+        settings = Settings(str(Path(directory) / "pos_db.db"))
+        async with live_server(settings, port, workers) as client:
+            ids = await seed(client, 500)
+            base_url = str(client.base_url)
+            loop = asyncio.get_running_loop()
+            with ProcessPoolExecutor(clients) as pool:
+                runs = [
+                    loop.run_in_executor(
+                        pool, client_process, base_url, ids, concurrency, seconds
+                    )
+                    for _ in range(clients)
+                ]
+                samples = [s for run in await asyncio.gather(*runs) for s in run]
+    return {
+        "requests_per_second": len(samples) / seconds,
+        "p50_ms": percentile(samples, 50) * 1e3,
+        "p99_ms": percentile(samples, 99) * 1e3,
+    }
+
+
+@cli.command()
+def main(
+    workers: Annotated[list[int], Option(help="Worker counts.")] = [1, 2, 4],
+    clients: int = 4,
+    concurrency: int = 8,
+    seconds: float = 5.0,
+    port: int = 8765,
+) -> None:
+    print(f"{os.cpu_count()} cores, {clients} clients x {concurrency} connections")
+    print(f"{'workers':>7} {'req/s':>8} {'p50':>9} {'p99':>9}")
+    for count in workers:
+        result = asyncio.run(measure(count, clients, concurrency, seconds, port))
+        print(
+            f"{count:>7} {result['requests_per_second']:>8,.0f}"
+            f" {result['p50_ms']:>7.2f}ms {result['p99_ms']:>7.2f}ms"
+        )
+
+
+if __name__ == "__main__":
+    cli()
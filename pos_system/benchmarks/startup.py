@@ -0,0 +1,59 @@
+"""Startup time: seconds from launching a live `run` server until it answers,
+and the latency of its first product lookup, for a few catalog sizes, with
+the product cache preloaded at startup or left cold.
+
+    python -m pos_system.benchmarks.startup --catalog 0 --catalog 100000
+"""
+
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+from typing import Annotated
+from uuid import uuid4
+
+from typer import Option, Typer
+
+from pos_system.benchmarks.cashiers import live_server
+from pos_system.benchmarks.common import seed_products, temporary_db
+from pos_system.runner.settings import Settings
+
+cli = Typer(add_completion=False)
+
+
+async def measure(
+    db_file: str, cache_products: bool, ids: list[str], port: int
+) -> tuple[float, float]:
+    settings = Settings(db_file, cache_products=cache_products)
+    start = time.perf_counter()
+    async with live_server(settings, port) as client:
+        ready = time.perf_counter() - start
+        start = time.perf_counter()
+        # An empty catalog answers 404, which is as good a first request.
+        await client.get(f"/products/{random.choice(ids)}")
+        first = time.perf_counter() - start
+    return ready, first
+
+
+@cli.command()
+def main(
+    catalog: Annotated[list[int], Option(help="Catalog sizes.")] = [0, 10_000],
+    port: int = 8766,
+) -> None:
+    print(f"{'catalog':>8} {'cache':>6} {'ready':>8} {'first lookup':>13}")
+    for size in catalog:
+        with temporary_db() as db_file:
+            ids = [str(product_id) for product_id in seed_products(db_file, size)]
+            for cache_products in (False, True):
+                ready, first = asyncio.run(
+                    measure(db_file, cache_products, ids or [str(uuid4())], port)
+                )
+                print(
+                    f"{size:>8,} {'warm' if cache_products else 'cold':>6}"
+                    f" {ready:>7.2f}s {first * 1e3:>11.2f}ms"
+                )
+
+
+if __name__ == "__main__":
+    cli()
@@ -1,7 +1,13 @@
+import logging
 import sqlite3
 from sqlite3 import Error
 from typing import Optional
 
+from pos_system.infra.log import configure_logging
+from pos_system.runner.settings import Settings
+
+logger = logging.getLogger(__name__)
+
 
 class DatabaseManager:
     def __init__(self, db_file: str) -> None:
@@ -13,11 +19,19 @@ class DatabaseManager:
             conn = sqlite3.connect(self.db_file)
             return conn
         except Error as e:
-            print(e)
+            logger.error("Database error", extra={"error": str(e)})
         return conn
 
     def clear_tables(self) -> None:
-        tables = ["units", "products", "sales_report", "receipts", "receipt_products"]
+        tables = [
+            "units",
+            "products",
+            "sales_report",
+            "sales_rollups",
+            "receipts",
+            "receipt_products",
+            "journal_applied",
+        ]
         conn = self.create_connection()
         if conn:
             try:
@@ -25,13 +39,17 @@ class DatabaseManager:
                 for table in tables:
                     cursor.execute(f"DELETE FROM {table}")
                 conn.commit()
-                print("Tables cleared successfully.")
+                logger.info("Tables cleared")
             except Error as e:
-                print(e)
+                logger.error("Database error", extra={"error": str(e)})
             finally:
                 conn.close()
 
 
 if __name__ == "__main__":
-    db_manager = DatabaseManager(r".\pos_db.db")
-    db_manager.clear_tables()
+    listener = configure_logging()
+    try:
+        db_manager = DatabaseManager(Settings.from_env().database)
+        db_manager.clear_tables()
+    finally:
+        listener.stop()
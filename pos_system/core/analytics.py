@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Protocol
+from uuid import UUID
+
+
+class SalesAnalytics(Protocol):
+    def summarise(self, start: datetime | None, end: datetime | None) -> SalesSummary:
+        pass
+
+
+class AsyncSalesAnalytics(Protocol):
+    async def summarise(
+        self, start: datetime | None, end: datetime | None
+    ) -> SalesSummary:
+        pass
+
+
+@dataclass
+class ProductSales:
+    id: UUID
+    unit_id: UUID | None
+    quantity: int
+    revenue: float
+
+
+@dataclass
+class UnitSales:
+    id: UUID | None
+    quantity: int
+    revenue: float
+
+
+@dataclass
+class SalesSummary:
+    """Closed-receipt sales, best sellers first, with basket size -> receipts.
+    Sales of products deleted since have no unit (None)."""
+
+    products: list[ProductSales]
+    units: list[UnitSales]
+    basket_sizes: dict[int, int]
@@ -9,16 +9,51 @@ class ProductRepository(Protocol):
     def create(self, product: Product) -> Product:
         pass
 
+    def create_many(self, products: list[Product]) -> list[RejectedProduct]:
+        pass
+
     def get(self, product_id: UUID) -> Product:
         pass
 
+    def get_many(self, product_ids: list[UUID]) -> list[Product]:
+        pass
+
+    def get_by_barcode(self, barcode: str) -> Product:
+        pass
+
     def get_all(self) -> list[Product]:
         pass
 
+    def get_page(self, after: UUID | None, limit: int | None) -> list[Product]:
+        pass
+
     def update_price(self, product_id: UUID, new_price: float) -> None:
         pass
 
 
+class AsyncProductRepository(Protocol):
+    async def create(self, product: Product) -> Product:
+        pass
+
+    async def create_many(self, products: list[Product]) -> list[RejectedProduct]:
+        pass
+
+    async def get(self, product_id: UUID) -> Product:
+        pass
+
+    async def get_by_barcode(self, barcode: str) -> Product:
+        pass
+
+    async def get_all(self) -> list[Product]:
+        pass
+
+    async def get_page(self, after: UUID | None, limit: int | None) -> list[Product]:
+        pass
+
+    async def update_price(self, product_id: UUID, new_price: float) -> None:
+        pass
+
+
 @dataclass
 class Product:
     unit_id: UUID
@@ -27,3 +62,10 @@ class Product:
     price: float
 
     id: UUID = field(default_factory=uuid4)
+
+
+@dataclass
+class RejectedProduct:
+    index: int
+    product: Product
+    error: Exception
@@ -9,7 +9,10 @@ class ReceiptRepository(Protocol):
     def create(self) -> Receipt:
         pass
 
-    def add_product(self, receipt_id: UUID, product_id: UUID, quantity: int) -> Receipt:
+    def add_product(self, receipt_id: UUID, product_id: UUID, quantity: int) -> None:
+        pass
+
+    def add_products(self, receipt_id: UUID, quantities: dict[UUID, int]) -> None:
         pass
 
     def get(self, receipt_id: UUID) -> Receipt:
@@ -22,6 +25,28 @@ class ReceiptRepository(Protocol):
         pass
 
 
+class AsyncReceiptRepository(Protocol):
+    async def create(self) -> Receipt:
+        pass
+
+    async def add_product(
+        self, receipt_id: UUID, product_id: UUID, quantity: int
+    ) -> None:
+        pass
+
+    async def add_products(self, receipt_id: UUID, quantities: dict[UUID, int]) -> None:
+        pass
+
+    async def get(self, receipt_id: UUID) -> Receipt:
+        pass
+
+    async def close(self, receipt_id: UUID) -> None:
+        pass
+
+    async def delete(self, receipt_id: UUID) -> None:
+        pass
+
+
 @dataclass
 class Receipt:
     status: str
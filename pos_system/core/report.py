@@ -1,15 +1,40 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Protocol
+from datetime import datetime
+from typing import Literal, Protocol
+
+Granularity = Literal["hour", "day"]
 
 
 class ReportRepository(Protocol):
     def get(self) -> Report:
         pass
 
+    def get_buckets(
+        self, granularity: Granularity, start: datetime | None, end: datetime | None
+    ) -> list[SalesBucket]:
+        pass
+
+
+class AsyncReportRepository(Protocol):
+    async def get(self) -> Report:
+        pass
+
+    async def get_buckets(
+        self, granularity: Granularity, start: datetime | None, end: datetime | None
+    ) -> list[SalesBucket]:
+        pass
+
 
 @dataclass
 class Report:
     n_receipts: int
     revenue: float
+
+
+@dataclass
+class SalesBucket:
+    start: datetime
+    n_receipts: int
+    revenue: float
@@ -15,6 +15,23 @@ class UnitRepository(Protocol):
     def get_all(self) -> list[Unit]:
         pass
 
+    def get_page(self, after: UUID | None, limit: int | None) -> list[Unit]:
+        pass
+
+
+class AsyncUnitRepository(Protocol):
+    async def create(self, unit: Unit) -> Unit:
+        pass
+
+    async def get(self, unit_id: UUID) -> Unit:
+        pass
+
+    async def get_all(self) -> list[Unit]:
+        pass
+
+    async def get_page(self, after: UUID | None, limit: int | None) -> list[Unit]:
+        pass
+
 
 @dataclass
 class Unit:
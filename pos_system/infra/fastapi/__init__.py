@@ -1,6 +1,7 @@
+from pos_system.infra.fastapi.metrics import metrics_api
 from pos_system.infra.fastapi.products import product_api
 from pos_system.infra.fastapi.receipt import receipt_api
 from pos_system.infra.fastapi.report import report_api
 from pos_system.infra.fastapi.units import unit_api
 
-__all__ = ["unit_api", "product_api", "report_api", "receipt_api"]
+__all__ = ["unit_api", "product_api", "report_api", "receipt_api", "metrics_api"]
@@ -1,41 +1,186 @@
-from typing import Annotated
+from contextlib import nullcontext
+from typing import Annotated, AsyncIterator
 
 from fastapi import Depends
 from fastapi.requests import Request
 
-from pos_system.core.products import ProductRepository
-from pos_system.core.receipt import ReceiptRepository
-from pos_system.core.report import ReportRepository
-from pos_system.core.units import UnitRepository
+from pos_system.core.analytics import AsyncSalesAnalytics
+from pos_system.core.products import AsyncProductRepository, ProductRepository
+from pos_system.core.receipt import AsyncReceiptRepository
+from pos_system.core.report import AsyncReportRepository
+from pos_system.core.units import AsyncUnitRepository, UnitRepository
+from pos_system.infra.repository import (
+    MemoryProductsDB,
+    MemoryReceiptsDB,
+    MemoryReportDB,
+    MemoryStore,
+    MemoryUnitsDB,
+    ProductsDB,
+    ReceiptsDB,
+    ReportDB,
+    UnitsDB,
+)
+from pos_system.infra.repository.cache import CachedProductsDB, CachedUnitsDB
+from pos_system.infra.repository.connection import ConnectionPool, Database
+from pos_system.infra.repository.executor import (
+    AsyncProductsDB,
+    AsyncReceiptsDB,
+    AsyncReportDB,
+    AsyncSalesAnalyticsDB,
+    AsyncUnitsDB,
+    Runner,
+)
+from pos_system.infra.repository.journal import JournaledReceiptsDB
+
+
+def is_write(request: Request) -> bool:
+    """Whether a request needs SQLite's write lock. Journaled receipt writes
+    do not: the journal batches concurrent writers instead.
+    """
+    journaled = request.app.state.journal is not None
+    if journaled and request.url.path.startswith("/receipts"):
+        return False
+    return request.method not in ("GET", "HEAD")
+
+
+def get_executor(request: Request) -> Runner:
+    writer = request.app.state.writer
+    if writer is not None and is_write(request):
+        return writer  # type: ignore
+    return request.app.state.executor  # type: ignore
+
+
+ExecutorDependable = Annotated[Runner, Depends(get_executor)]
+
+
+def get_database(request: Request) -> ConnectionPool | MemoryStore:
+    return request.app.state.db  # type: ignore
+
+
+DatabaseDependable = Annotated[ConnectionPool | MemoryStore, Depends(get_database)]
+
+
+async def get_unit_of_work(
+    request: Request, executor: ExecutorDependable, db: DatabaseDependable
+) -> AsyncIterator[Database | MemoryStore]:
+    if isinstance(db, MemoryStore):
+        # Inline calls on the event loop cannot interleave; nothing to begin.
+        yield db
+        return
+    writes = is_write(request)
+    if writes and request.app.state.writer is not None:
+        # Each repository call becomes a command for the writer thread.
+        yield request.app.state.writer
+        return
+    # Queue writers on the event loop rather than in executor threads that
+    # would otherwise sit blocked on SQLite's write lock.
+    async with request.app.state.write_lock if writes else nullcontext():
+        uow = await executor.run(db.begin, writes)
+        try:
+            yield uow
+        except BaseException:
+            await executor.run(uow.rollback)
+            raise
+        await executor.run(uow.commit)
+
+
+UnitOfWorkDependable = Annotated[
+    Database | MemoryStore, Depends(get_unit_of_work, scope="function")
+]
+
+
+def get_units_repository(
+    request: Request, db: UnitOfWorkDependable, executor: ExecutorDependable
+) -> AsyncUnitRepository:
+    if isinstance(db, MemoryStore):
+        return AsyncUnitsDB(MemoryUnitsDB(db), executor)
+    units = CachedUnitsDB(UnitsDB(db), request.app.state.unit_cache, db)
+    return AsyncUnitsDB(units, executor)
+
+
+UnitsRepositoryDependable = Annotated[
+    AsyncUnitRepository, Depends(get_units_repository)
+]
 
 
-def get_units_repository(request: Request) -> UnitRepository:
-    return request.app.state.units  # type: ignore
+def get_product_catalog(
+    request: Request, db: UnitOfWorkDependable
+) -> ProductRepository:
+    if isinstance(db, MemoryStore):
+        return MemoryProductsDB(db)
+    cache = request.app.state.product_cache
+    if cache is None:
+        return ProductsDB(db)
+    return CachedProductsDB(ProductsDB(db), cache, db)
 
 
-UnitsRepositoryDependable = Annotated[UnitRepository, Depends(get_units_repository)]
+ProductCatalogDependable = Annotated[ProductRepository, Depends(get_product_catalog)]
 
 
-def get_products_repository(request: Request) -> ProductRepository:
-    return request.app.state.products  # type: ignore
+def get_products_repository(
+    catalog: ProductCatalogDependable, executor: ExecutorDependable
+) -> AsyncProductRepository:
+    return AsyncProductsDB(catalog, executor)
 
 
 ProductsRepositoryDependable = Annotated[
-    ProductRepository, Depends(get_products_repository)
+    AsyncProductRepository, Depends(get_products_repository)
 ]
 
 
-def get_report_repository(request: Request) -> ReportRepository:
-    return request.app.state.report  # type: ignore
+def get_report_repository(
+    db: UnitOfWorkDependable, executor: ExecutorDependable
+) -> AsyncReportRepository:
+    report = MemoryReportDB(db) if isinstance(db, MemoryStore) else ReportDB(db)
+    return AsyncReportDB(report, executor)
+
+
+ReportRepositoryDependable = Annotated[
+    AsyncReportRepository, Depends(get_report_repository)
+]
+
 
+def get_sales_analytics(request: Request) -> AsyncSalesAnalytics:
+    return AsyncSalesAnalyticsDB(
+        request.app.state.analytics, request.app.state.analytics_executor
+    )
 
-ReportRepositoryDependable = Annotated[ReportRepository, Depends(get_report_repository)]
 
+SalesAnalyticsDependable = Annotated[AsyncSalesAnalytics, Depends(get_sales_analytics)]
 
-def get_receipt_repository(request: Request) -> ReceiptRepository:
-    return request.app.state.receipts  # type: ignore
+
+def get_receipt_repository(
+    request: Request,
+    db: UnitOfWorkDependable,
+    catalog: ProductCatalogDependable,
+    executor: ExecutorDependable,
+) -> AsyncReceiptRepository:
+    if isinstance(db, MemoryStore):
+        return AsyncReceiptsDB(MemoryReceiptsDB(db), executor)
+    journal = request.app.state.journal
+    if journal is not None:
+        # Reads run on their own connections, to see the applier's commits.
+        receipts = ReceiptsDB(request.app.state.db)
+        return AsyncReceiptsDB(
+            JournaledReceiptsDB(journal, receipts, catalog), executor
+        )
+    return AsyncReceiptsDB(ReceiptsDB(db, catalog), executor)
 
 
 ReceiptRepositoryDependable = Annotated[
-    ReceiptRepository, Depends(get_receipt_repository)
+    AsyncReceiptRepository, Depends(get_receipt_repository)
 ]
+
+
+def get_products_pages(db: DatabaseDependable) -> ProductRepository:
+    return MemoryProductsDB(db) if isinstance(db, MemoryStore) else ProductsDB(db)
+
+
+ProductsPagesDependable = Annotated[ProductRepository, Depends(get_products_pages)]
+
+
+def get_units_pages(db: DatabaseDependable) -> UnitRepository:
+    return MemoryUnitsDB(db) if isinstance(db, MemoryStore) else UnitsDB(db)
+
+
+UnitsPagesDependable = Annotated[UnitRepository, Depends(get_units_pages)]
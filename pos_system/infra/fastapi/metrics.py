@@ -0,0 +1,11 @@
+from fastapi import APIRouter
+from starlette.responses import PlainTextResponse
+
+from pos_system.infra.metrics import REGISTRY
+
+metrics_api = APIRouter(tags=["Metrics"])
+
+
+@metrics_api.get("/metrics", response_class=PlainTextResponse)  # type: ignore
+async def get_metrics() -> PlainTextResponse:
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
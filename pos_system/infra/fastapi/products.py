@@ -1,9 +1,12 @@
+import csv
+import io
+import json
 from typing import Any
 from uuid import UUID
 
-from fastapi import APIRouter
-from pydantic import BaseModel
-from starlette.responses import JSONResponse
+from fastapi import APIRouter, Query, Request
+from pydantic import BaseModel, ValidationError
+from starlette.responses import JSONResponse, StreamingResponse
 
 from pos_system.core.errors import (
     DoesNotExistError,
@@ -11,7 +14,11 @@ from pos_system.core.errors import (
     ParameterDoesNotExistError,
 )
 from pos_system.core.products import Product
-from pos_system.infra.fastapi.dependables import ProductsRepositoryDependable
+from pos_system.infra.fastapi.dependables import (
+    ProductsPagesDependable,
+    ProductsRepositoryDependable,
+)
+from pos_system.infra.fastapi.streaming import stream_ndjson
 
 product_api = APIRouter(tags=["Products"])
 
@@ -39,6 +46,16 @@ class ProductListEnvelope(BaseModel):  # type: ignore
     products: list[ProductItem]
 
 
+class RejectedRow(BaseModel):  # type: ignore
+    index: int
+    message: str
+
+
+class ImportResponse(BaseModel):  # type: ignore
+    created: int
+    rejected: list[RejectedRow]
+
+
 class UpdateRequest(BaseModel):  # type: ignore
     new_price: float
 
@@ -52,38 +69,91 @@ class UpdateResponse(BaseModel):  # type: ignore
     status_code=201,
     response_model=ProductEnvelope,
 )  # type: ignore
-def create_product(
+async def create_product(
     request: CreateProductRequest, products: ProductsRepositoryDependable
 ) -> dict[str, Any] | JSONResponse:
+    product = Product(**request.model_dump())
     try:
-        product = Product(**request.model_dump())
-        products.create(product)
+        await products.create(product)
 
         return {"product": product}
-    except ExistsError:
+    except ExistsError as e:
         return JSONResponse(
-            status_code=409,
-            content={
-                "message": f"Product with barcode<{request.barcode}> already exist."
-            },
+            status_code=409, content={"message": create_error_message(e, product)}
         )
-    except ParameterDoesNotExistError:
+    except ParameterDoesNotExistError as e:
         return JSONResponse(
-            status_code=404,
-            content={"message": f"Unit with id<{request.unit_id}> does not exist."},
+            status_code=404, content={"message": create_error_message(e, product)}
+        )
+
+
+@product_api.post(
+    "/products/batch",
+    status_code=201,
+    response_model=ImportResponse,
+)  # type: ignore
+async def import_products(
+    request: Request, products: ProductsRepositoryDependable
+) -> dict[str, Any] | JSONResponse:
+    try:
+        rows = parse_rows(request.headers.get("content-type", ""), await request.body())
+    except (ValueError, csv.Error):
+        return JSONResponse(
+            status_code=400, content={"message": "Malformed product import."}
+        )
+
+    indexes: list[int] = []
+    valid: list[Product] = []
+    rejected: list[dict[str, Any]] = []
+    for index, row in enumerate(rows):
+        try:
+            valid.append(
+                Product(**CreateProductRequest.model_validate(row).model_dump())
+            )
+            indexes.append(index)
+        except ValidationError as e:
+            rejected.append({"index": index, "message": str(e)})
+
+    conflicts = await products.create_many(valid)
+    for conflict in conflicts:
+        rejected.append(
+            {
+                "index": indexes[conflict.index],
+                "message": create_error_message(conflict.error, conflict.product),
+            }
         )
 
+    rejected.sort(key=lambda item: int(item["index"]))
+    return {"created": len(valid) - len(conflicts), "rejected": rejected}
+
+
+def parse_rows(content_type: str, body: bytes) -> list[Any]:
+    if content_type.startswith("text/csv"):
+        return list(csv.DictReader(io.StringIO(body.decode())))
+    if content_type.startswith("application/x-ndjson"):
+        return [json.loads(line) for line in body.splitlines() if line.strip()]
+    rows = json.loads(body)
+    if not isinstance(rows, list):
+        raise ValueError("Expected a JSON array of products.")
+    return rows
+
+
+def create_error_message(error: Exception, product: Product) -> str:
+    if isinstance(error, ExistsError):
+        return f"Product with barcode<{product.barcode}> already exist."
+    return f"Unit with id<{product.unit_id}> does not exist."
+
 
 @product_api.get(
     "/products/{product_id}",
     status_code=200,
     response_model=ProductEnvelope,
 )  # type: ignore
-def get_product(
+async def get_product(
     product_id: UUID, products: ProductsRepositoryDependable
 ) -> dict[str, Any] | JSONResponse:
     try:
-        return {"product": products.get(product_id)}
+        return {"product": await products.get(product_id)}
     except DoesNotExistError:
         return JSONResponse(
             status_code=404,
@@ -91,23 +161,48 @@ def get_product(
         )
 
 
+@product_api.get(
+    "/products/by-barcode/{barcode}",
+    status_code=200,
+    response_model=ProductEnvelope,
+)  # type: ignore
+async def get_product_by_barcode(
+    barcode: str, products: ProductsRepositoryDependable
+) -> dict[str, Any] | JSONResponse:
+    try:
+        return {"product": await products.get_by_barcode(barcode)}
+    except DoesNotExistError:
+        return JSONResponse(
+            status_code=404,
+            content={"message": f"Product with barcode<{barcode}> does not exist."},
+        )
+
+
 @product_api.get(
     "/products", status_code=200, response_model=ProductListEnvelope
 )  # type: ignore
-def get_all_products(products: ProductsRepositoryDependable) -> dict[str, Any]:
-    return {"products": products.get_all()}
+async def get_all_products(
+    products: ProductsRepositoryDependable,
+    pages: ProductsPagesDependable,
+    after: UUID | None = None,
+    limit: int | None = Query(default=None, ge=1),
+    stream: bool = False,
+) -> dict[str, Any] | StreamingResponse:
+    if stream:
+        return stream_ndjson(pages.get_page, after, limit)
+    return {"products": await products.get_page(after, limit)}
 
 
 @product_api.patch(
     "/products/{product_id}", status_code=200, response_model=UpdateResponse
 )  # type: ignore
-def update_product(
+async def update_product(
     product_id: UUID,
     update_request: UpdateRequest,
     products: ProductsRepositoryDependable,
 ) -> UpdateResponse | JSONResponse:
     try:
-        products.update_price(product_id, update_request.new_price)
+        await products.update_price(product_id, update_request.new_price)
         return UpdateResponse()
     except DoesNotExistError:
         return JSONResponse(
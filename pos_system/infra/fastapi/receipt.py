@@ -1,8 +1,9 @@
+from collections import Counter
 from typing import Any, List
 from uuid import UUID
 
 from fastapi import APIRouter
-from pydantic import BaseModel
+from pydantic import BaseModel, model_validator
 from starlette.responses import JSONResponse
 
 from pos_system.core.errors import (
@@ -10,7 +11,10 @@ from pos_system.core.errors import (
     ParameterDoesNotExistError,
     ReceiptAlreadyClosedError,
 )
-from pos_system.infra.fastapi.dependables import ReceiptRepositoryDependable
+from pos_system.infra.fastapi.dependables import (
+    ProductsRepositoryDependable,
+    ReceiptRepositoryDependable,
+)
 
 receipt_api = APIRouter(tags=["Receipts"])
 
@@ -23,6 +27,18 @@ class ReceiptProductModel(BaseModel):  # type: ignore
 
 
 class ProductAddRequest(BaseModel):  # type: ignore
+    id: UUID | None = None
+    barcode: str | None = None
+    quantity: int
+
+    @model_validator(mode="after")  # type: ignore
+    def check_product_reference(self) -> "ProductAddRequest":
+        if (self.id is None) == (self.barcode is None):
+            raise ValueError("Exactly one of id or barcode is required.")
+        return self
+
+
+class ProductBatchItem(BaseModel):  # type: ignore
     id: UUID
     quantity: int
 
@@ -51,8 +67,8 @@ class StatusUpdateResponse(BaseModel):  # type: ignore
     status_code=201,
     response_model=ReceiptEnvelope,
 )  # type: ignore
-def create_receipt(receipts: ReceiptRepositoryDependable) -> dict[str, Any]:
-    return {"receipt": receipts.create()}
+async def create_receipt(receipts: ReceiptRepositoryDependable) -> dict[str, Any]:
+    return {"receipt": await receipts.create()}
 
 
 @receipt_api.post(
@@ -60,32 +76,87 @@ def create_receipt(receipts: ReceiptRepositoryDependable) -> dict[str, Any]:
     status_code=201,
     response_model=ReceiptEnvelope,
 )  # type: ignore
-def add_product(
-    receipt_id: UUID, product: ProductAddRequest, receipts: ReceiptRepositoryDependable
+async def add_product(
+    receipt_id: UUID,
+    product: ProductAddRequest,
+    receipts: ReceiptRepositoryDependable,
+    products: ProductsRepositoryDependable,
 ) -> dict[str, Any] | JSONResponse:
+    product_id = product.id
+    if product_id is None:
+        try:
+            product_id = (await products.get_by_barcode(str(product.barcode))).id
+        except DoesNotExistError:
+            return JSONResponse(
+                status_code=404,
+                content={
+                    "message": f"Product with barcode<{product.barcode}> "
+                    f"does not exist."
+                },
+            )
+
     try:
-        receipts.add_product(receipt_id, product.id, product.quantity)
-        return {"receipt": receipts.get(receipt_id)}
+        await receipts.add_product(receipt_id, product_id, product.quantity)
+        return {"receipt": await receipts.get(receipt_id)}
     except ParameterDoesNotExistError:
         return JSONResponse(
             status_code=404,
-            content={"message": f"Product with id<{product.id}> does not exist."},
+            content={"message": f"Product with id<{product_id}> does not exist."},
         )
     except DoesNotExistError:
         return JSONResponse(
             status_code=404,
             content={"message": f"Receipt with id<{receipt_id}> does not exist."},
         )
+    except ReceiptAlreadyClosedError:
+        return JSONResponse(
+            status_code=403,
+            content={"message": f"Receipt with id<{receipt_id}> is closed."},
+        )
+
+
+@receipt_api.post(
+    "/receipts/{receipt_id}/products/batch",
+    status_code=201,
+    response_model=ReceiptEnvelope,
+)  # type: ignore
+async def add_products(
+    receipt_id: UUID,
+    items: list[ProductBatchItem],
+    receipts: ReceiptRepositoryDependable,
+) -> dict[str, Any] | JSONResponse:
+    quantities: Counter[UUID] = Counter()
+    for item in items:
+        quantities[item.id] += item.quantity
+
+    try:
+        await receipts.add_products(receipt_id, dict(quantities))
+        return {"receipt": await receipts.get(receipt_id)}
+    except ParameterDoesNotExistError as e:
+        return JSONResponse(
+            status_code=404,
+            content={"message": f"Product with id<{e.args[0]}> does not exist."},
+        )
+    except DoesNotExistError:
+        return JSONResponse(
+            status_code=404,
+            content={"message": f"Receipt with id<{receipt_id}> does not exist."},
+        )
+    except ReceiptAlreadyClosedError:
+        return JSONResponse(
+            status_code=403,
+            content={"message": f"Receipt with id<{receipt_id}> is closed."},
+        )
 
 
 @receipt_api.get(
     "/receipts/{receipt_id}", status_code=200, response_model=ReceiptEnvelope
 )  # type: ignore
-def get_receipt(
+async def get_receipt(
     receipt_id: UUID, receipts: ReceiptRepositoryDependable
 ) -> dict[str, Any] | JSONResponse:
     try:
-        return {"receipt": receipts.get(receipt_id)}
+        return {"receipt": await receipts.get(receipt_id)}
     except DoesNotExistError:
         return JSONResponse(
             status_code=404,
@@ -96,13 +167,13 @@ def get_receipt(
 @receipt_api.patch(
     "/receipts/{receipt_id}", status_code=200, response_model=StatusUpdateResponse
 )  # type: ignore
-def close_receipt(
+async def close_receipt(
     receipt_id: UUID,
     update_receipt: StatusUpdateRequest,
     receipts: ReceiptRepositoryDependable,
 ) -> StatusUpdateResponse | JSONResponse:
     try:
-        receipts.close(receipt_id)
+        await receipts.close(receipt_id)
         return StatusUpdateResponse()
     except DoesNotExistError:
         return JSONResponse(
@@ -114,11 +185,11 @@ def close_receipt(
 @receipt_api.delete(
     "/receipts/{receipt_id}", status_code=200, response_model=StatusUpdateResponse
 )  # type: ignore
-def delete_receipt(
+async def delete_receipt(
     receipt_id: UUID, receipts: ReceiptRepositoryDependable
 ) -> StatusUpdateResponse | JSONResponse:
     try:
-        receipts.delete(receipt_id)
+        await receipts.delete(receipt_id)
         return StatusUpdateResponse()
     except DoesNotExistError:
         return JSONResponse(
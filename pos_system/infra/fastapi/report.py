@@ -1,10 +1,17 @@
-from typing import Any
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Annotated, Any
+from uuid import UUID
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends, Query
 from pydantic import BaseModel
+from starlette.responses import JSONResponse
 
-from pos_system.core.report import Report
-from pos_system.infra.fastapi.dependables import ReportRepositoryDependable
+from pos_system.core.report import Granularity, Report
+from pos_system.infra.fastapi.dependables import (
+    ReportRepositoryDependable,
+    SalesAnalyticsDependable,
+)
 
 report_api = APIRouter(tags=["Report"])
 
@@ -14,8 +21,51 @@ class ReportModel(BaseModel):  # type: ignore
     revenue: float
 
 
+class BucketModel(BaseModel):  # type: ignore
+    start: datetime
+    n_receipts: int
+    revenue: float
+
+
 class ReportEnvelope(BaseModel):  # type: ignore
     sales: ReportModel
+    buckets: list[BucketModel] | None = None
+
+
+class ProductSalesModel(BaseModel):  # type: ignore
+    id: UUID
+    unit_id: UUID | None
+    quantity: int
+    revenue: float
+
+
+class BasketSizeModel(BaseModel):  # type: ignore
+    size: int
+    receipts: int
+
+
+class ProductSalesEnvelope(BaseModel):  # type: ignore
+    products: list[ProductSalesModel]
+    basket_sizes: list[BasketSizeModel]
+
+
+class UnitSalesModel(BaseModel):  # type: ignore
+    id: UUID | None
+    quantity: int
+    revenue: float
+
+
+class UnitSalesEnvelope(BaseModel):  # type: ignore
+    units: list[UnitSalesModel]
+
+
+@dataclass
+class Period:
+    start: datetime | None = Query(default=None, alias="from")
+    end: datetime | None = Query(default=None, alias="to")
+
+
+PeriodDependable = Annotated[Period, Depends()]
 
 
 def map_report_to_model(report: Report) -> dict[str, Any]:
@@ -23,8 +73,65 @@ def map_report_to_model(report: Report) -> dict[str, Any]:
 
 
 @report_api.get(
-    "/sales", status_code=200, response_model=ReportEnvelope
+    "/sales",
+    status_code=200,
+    response_model=ReportEnvelope,
+    response_model_exclude_none=True,
+)  # type: ignore
+async def get_sales_report(
+    report: ReportRepositoryDependable,
+    period: PeriodDependable,
+    granularity: Granularity | None = None,
+) -> dict[str, Any] | JSONResponse:
+    if granularity is None:
+        if period != Period(None, None):
+            return JSONResponse(
+                status_code=422,
+                content={"message": "A period needs a granularity: hour or day."},
+            )
+        report_data = await report.get()
+        return {"sales": ReportModel(**map_report_to_model(report_data))}
+
+    buckets = await report.get_buckets(granularity, period.start, period.end)
+    return {
+        "sales": {
+            "n_receipts": sum(bucket.n_receipts for bucket in buckets),
+            "revenue": sum(bucket.revenue for bucket in buckets),
+        },
+        "buckets": [
+            {
+                "start": bucket.start,
+                "n_receipts": bucket.n_receipts,
+                "revenue": bucket.revenue,
+            }
+            for bucket in buckets
+        ],
+    }
+
+
+@report_api.get(
+    "/sales/products", status_code=200, response_model=ProductSalesEnvelope
+)  # type: ignore
+async def get_product_sales(
+    analytics: SalesAnalyticsDependable,
+    period: PeriodDependable,
+    limit: int | None = Query(default=None, ge=1),
+) -> dict[str, Any]:
+    summary = await analytics.summarise(period.start, period.end)
+    return {
+        "products": [asdict(product) for product in summary.products[:limit]],
+        "basket_sizes": [
+            {"size": size, "receipts": receipts}
+            for size, receipts in summary.basket_sizes.items()
+        ],
+    }
+
+
+@report_api.get(
+    "/sales/units", status_code=200, response_model=UnitSalesEnvelope
 )  # type: ignore
-def get_sales_report(report: ReportRepositoryDependable) -> dict[str, Any]:
-    report_data = report.get()
-    return {"sales": ReportModel(**map_report_to_model(report_data))}
+async def get_unit_sales(
+    analytics: SalesAnalyticsDependable, period: PeriodDependable
+) -> dict[str, Any]:
+    summary = await analytics.summarise(period.start, period.end)
+    return {"units": [asdict(unit) for unit in summary.units]}
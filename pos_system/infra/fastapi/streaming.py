@@ -0,0 +1,33 @@
+import json
+from dataclasses import asdict
+from typing import Any, Callable, Iterator, Sequence
+from uuid import UUID
+
+from starlette.responses import StreamingResponse
+
+BATCH_SIZE = 1000
+
+PageFetcher = Callable[[UUID | None, int | None], Sequence[Any]]
+
+
+def stream_ndjson(
+    fetch_page: PageFetcher, after: UUID | None, limit: int | None
+) -> StreamingResponse:
+    """Stream rows as NDJSON, one short keyset-paged query per batch."""
+
+    def rows() -> Iterator[bytes]:
+        remaining = limit
+        cursor = after
+        while remaining is None or remaining > 0:
+            batch = BATCH_SIZE if remaining is None else min(BATCH_SIZE, remaining)
+            page = fetch_page(cursor, batch)
+            yield b"".join(
+                json.dumps(asdict(item), default=str).encode() + b"\n" for item in page
+            )
+            if len(page) < batch:
+                return
+            if remaining is not None:
+                remaining -= len(page)
+            cursor = page[-1].id
+
+    return StreamingResponse(rows(), media_type="application/x-ndjson")
@@ -1,13 +1,17 @@
 from typing import Any
 from uuid import UUID
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Query
 from pydantic import BaseModel
-from starlette.responses import JSONResponse
+from starlette.responses import JSONResponse, StreamingResponse
 
 from pos_system.core.errors import DoesNotExistError, ExistsError
 from pos_system.core.units import Unit
-from pos_system.infra.fastapi.dependables import UnitsRepositoryDependable
+from pos_system.infra.fastapi.dependables import (
+    UnitsPagesDependable,
+    UnitsRepositoryDependable,
+)
+from pos_system.infra.fastapi.streaming import stream_ndjson
 
 unit_api = APIRouter(tags=["Units"])
 
@@ -34,12 +38,12 @@ class UnitListEnvelope(BaseModel):  # type: ignore
     status_code=201,
     response_model=UnitEnvelope,
 )  # type: ignore
-def create_unit(
+async def create_unit(
     request: CreateUnitRequest, units: UnitsRepositoryDependable
 ) -> dict[str, Any] | JSONResponse:
     try:
         unit = Unit(**request.model_dump())
-        units.create(unit)
+        await units.create(unit)
 
         return {"unit": unit}
     except ExistsError:
@@ -54,11 +58,11 @@ def create_unit(
     status_code=200,
     response_model=UnitEnvelope,
 )  # type: ignore
-def get_unit(
+async def get_unit(
     unit_id: UUID, units: UnitsRepositoryDependable
 ) -> dict[str, Any] | JSONResponse:
     try:
-        return {"unit": units.get(unit_id)}
+        return {"unit": await units.get(unit_id)}
     except DoesNotExistError:
         return JSONResponse(
             status_code=404,
@@ -69,5 +73,13 @@ def get_unit(
 @unit_api.get(
     "/units", status_code=200, response_model=UnitListEnvelope
 )  # type: ignore
-def get_all_units(units: UnitsRepositoryDependable) -> dict[str, Any]:
-    return {"units": units.get_all()}
+async def get_all_units(
+    units: UnitsRepositoryDependable,
+    pages: UnitsPagesDependable,
+    after: UUID | None = None,
+    limit: int | None = Query(default=None, ge=1),
+    stream: bool = False,
+) -> dict[str, Any] | StreamingResponse:
+    if stream:
+        return stream_ndjson(pages.get_page, after, limit)
+    return {"units": await units.get_page(after, limit)}
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import copy
+import json
+import logging
+import random
+import sys
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from queue import SimpleQueue
+from typing import Callable, TextIO
+
+ROOT_LOGGER = "pos_system"
+
+_RECORD_FIELDS = frozenset(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {
+    "message",
+    "asctime",
+    "taskName",
+}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line; `extra=` fields are kept as top-level keys."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        entry.update(
+            (key, value)
+            for key, value in vars(record).items()
+            if key not in _RECORD_FIELDS
+        )
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class RecordQueueHandler(QueueHandler):
+    """Enqueues records unformatted so the listener's formatter sees the fields."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg, record.args = record.getMessage(), None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+@dataclass
+class SamplingFilter(logging.Filter):
+    """Keeps a fraction of records per logger prefix; warnings always pass."""
+
+    rates: dict[str, float] = field(default_factory=dict)
+    draw: Callable[[], float] = random.random
+
+    def __post_init__(self) -> None:
+        super().__init__()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        return self.draw() < self.rate(record.name)
+
+    def rate(self, name: str) -> float:
+        while name:
+            if name in self.rates:
+                return self.rates[name]
+            name = name.rpartition(".")[0]
+        return 1.0
+
+
+def parse_sample_rates(options: list[str]) -> dict[str, float]:
+    """Turn `logger=rate` options, e.g. `pos_system.infra=0.1`, into a mapping."""
+    rates = {}
+    for option in options:
+        name, _, rate = option.partition("=")
+        rates[name] = float(rate)
+    return rates
+
+
+def configure_logging(
+    level: str = "INFO",
+    sample_rates: dict[str, float] | None = None,
+    stream: TextIO = sys.stderr,
+) -> QueueListener:
+    """Route pos_system logs through a queue; stop the listener to flush it."""
+    queue: SimpleQueue[logging.LogRecord] = SimpleQueue()
+    handler = RecordQueueHandler(queue)
+    handler.addFilter(SamplingFilter(sample_rates or {}))
+
+    output = logging.StreamHandler(stream)
+    output.setFormatter(JsonFormatter())
+
+    logger = logging.getLogger(ROOT_LOGGER)
+    logger.handlers = [handler]
+    logger.setLevel(level.upper())
+    logger.propagate = False
+
+    listener = QueueListener(queue, output)
+    listener.start()
+    return listener
@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import threading
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from functools import wraps
+from time import perf_counter
+from typing import Any, Callable, Iterator, TypeVar
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+T = TypeVar("T")
+
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+
+@dataclass
+class Histogram:
+    """Latency histogram per label set, rendered in Prometheus text format.
+
+    Each series is its bucket counts followed by the running sum, so an
+    observation is one bisect and two additions under the lock.
+    """
+
+    name: str
+    help: str
+    labels: tuple[str, ...]
+    buckets: tuple[float, ...] = BUCKETS
+
+    _series: dict[tuple[str, ...], list[float]] = field(init=False, repr=False)
+    _lock: threading.Lock = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, values: tuple[str, ...], seconds: float) -> None:
+        index = bisect_left(self.buckets, seconds)
+        with self._lock:
+            series = self._series.get(values)
+            if series is None:
+                series = self._series[values] = [0.0] * (len(self.buckets) + 2)
+            series[index] += 1
+            series[-1] += seconds
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} histogram"
+        with self._lock:
+            snapshot = {values: list(series) for values, series in self._series.items()}
+        for values, series in sorted(snapshot.items()):
+            labels = ",".join(f'{k}="{v}"' for k, v in zip(self.labels, values))
+            count = 0.0
+            for bound, observed in zip((*self.buckets, "+Inf"), series):
+                count += observed
+                yield f'{self.name}_bucket{{{labels},le="{bound}"}} {count:.0f}'
+            yield f"{self.name}_sum{{{labels}}} {series[-1]}"
+            yield f"{self.name}_count{{{labels}}} {count:.0f}"
+
+
+@dataclass
+class MetricsRegistry:
+    requests: Histogram = field(
+        default_factory=lambda: Histogram(
+            "pos_http_request_duration_seconds",
+            "HTTP request latency by route and status.",
+            ("method", "route", "status"),
+        )
+    )
+    calls: Histogram = field(
+        default_factory=lambda: Histogram(
+            "pos_repository_call_duration_seconds",
+            "Repository method latency.",
+            ("repository", "method"),
+        )
+    )
+
+    def render(self) -> str:
+        lines = [*self.requests.render(), *self.calls.render()]
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+
+def timed(cls: type[T]) -> type[T]:
+    """Record the latency of every public method of a repository class."""
+    for name, method in list(vars(cls).items()):
+        if callable(method) and not name.startswith("_"):
+            setattr(cls, name, _timed_method(method, (cls.__name__, name)))
+    return cls
+
+
+def _timed_method(
+    method: Callable[..., Any], values: tuple[str, str]
+) -> Callable[..., Any]:
+    observe = REGISTRY.calls.observe
+
+    @wraps(method)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        start = perf_counter()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            observe(values, perf_counter() - start)
+
+    return wrapper
+
+
+@dataclass
+class MetricsMiddleware:
+    """Times each HTTP request, labelled by its route template, not raw path."""
+
+    app: ASGIApp
+    registry: MetricsRegistry = field(default_factory=lambda: REGISTRY)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        start = perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = getattr(scope.get("route"), "path", "unmatched")
+            self.registry.requests.observe(
+                (scope["method"], route, str(status)), perf_counter() - start
+            )
@@ -1,6 +1,35 @@
+from pos_system.infra.repository.cache import (
+    CachedProductsDB,
+    CachedUnitsDB,
+    ProductCache,
+    UnitCache,
+)
+from pos_system.infra.repository.connection import ConnectionPool
+from pos_system.infra.repository.memory import (
+    MemoryProductsDB,
+    MemoryReceiptsDB,
+    MemoryReportDB,
+    MemoryStore,
+    MemoryUnitsDB,
+)
 from pos_system.infra.repository.products import ProductsDB
 from pos_system.infra.repository.receipt import ReceiptsDB
 from pos_system.infra.repository.report import ReportDB
 from pos_system.infra.repository.units import UnitsDB
 
-__all__ = ["UnitsDB", "ProductsDB", "ReportDB", "ReceiptsDB"]
+__all__ = [
+    "ConnectionPool",
+    "ProductCache",
+    "CachedProductsDB",
+    "UnitCache",
+    "CachedUnitsDB",
+    "UnitsDB",
+    "ProductsDB",
+    "ReportDB",
+    "ReceiptsDB",
+    "MemoryStore",
+    "MemoryUnitsDB",
+    "MemoryProductsDB",
+    "MemoryReportDB",
+    "MemoryReceiptsDB",
+]
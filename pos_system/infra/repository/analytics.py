@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from uuid import UUID
+
+import numpy as np
+import numpy.typing as npt
+
+from pos_system.core.analytics import ProductSales, SalesSummary, UnitSales
+from pos_system.infra.repository.connection import (
+    DEFAULT_DB_FILE,
+    ConnectionPool,
+    transaction,
+)
+from pos_system.infra.repository.report import timestamp_range
+
+Floats = npt.NDArray[np.float64]
+
+# Every sold product gets a dense key: its rowid, or one past the largest
+# rowid for products deleted since they were sold.
+PRODUCT_KEYS_SQL = """
+    WITH product_keys AS (
+        SELECT rowid AS key, uuid AS product_id, unit_id FROM products
+        UNION ALL
+        SELECT (SELECT COALESCE(MAX(rowid), 0) FROM products)
+               + ROW_NUMBER() OVER (ORDER BY product_id), product_id, NULL
+        FROM (
+            SELECT DISTINCT product_id FROM receipt_products
+            WHERE product_id NOT IN (SELECT uuid FROM products)
+        )
+    )
+"""
+
+_local = threading.local()
+
+
+def worker_pool(db_file: str) -> ConnectionPool:
+    """A one-connection pool per worker thread or process, kept between calls."""
+    pools: dict[str, ConnectionPool] = _local.__dict__.setdefault("pools", {})
+    if db_file not in pools:
+        pools[db_file] = ConnectionPool(db_file, size=1)
+    return pools[db_file]
+
+
+@dataclass
+class SalesAnalyticsDB:
+    """Aggregates closed-receipt lines in chunks with NumPy bincount group-bys.
+
+    Lines are keyed by the rowid of their product and receipt, so each chunk
+    folds into dense per-product and per-receipt arrays without a SQL GROUP BY.
+    The whole scan runs in one read transaction and holds on to a picklable
+    db_file rather than a connection, so it can be sent to a worker process.
+    """
+
+    db_file: str = DEFAULT_DB_FILE
+    chunk_size: int = 50_000
+
+    def summarise(self, start: datetime | None, end: datetime | None) -> SalesSummary:
+        select_lines_sql = f"""
+            {PRODUCT_KEYS_SQL}
+            SELECT k.key, r.rowid, rp.quantity, rp.total
+            FROM receipt_products rp
+            JOIN receipts r ON r.id = rp.receipt_id
+            JOIN product_keys k ON k.product_id = rp.product_id
+            WHERE r.status = 'closed'
+              AND COALESCE(r.closed_at, '') >= ? AND COALESCE(r.closed_at, '') < ?
+        """
+        select_keys_sql = f"""
+            {PRODUCT_KEYS_SQL}
+            SELECT key, product_id, unit_id FROM product_keys
+        """
+        with worker_pool(self.db_file).acquire() as conn, transaction(conn) as cursor:
+            products = cursor.execute(select_keys_sql).fetchall()
+            (receipts,) = cursor.execute("SELECT MAX(rowid) FROM receipts").fetchone()
+
+            n_products = 1 + max((rowid for rowid, _, _ in products), default=0)
+            quantity = np.zeros(n_products)
+            revenue = np.zeros(n_products)
+            basket = np.zeros(1 + (receipts or 0))
+            lines = np.zeros(1 + (receipts or 0))
+
+            cursor.execute(select_lines_sql, timestamp_range(start, end))
+            while rows := cursor.fetchmany(self.chunk_size):
+                chunk = np.array(rows, dtype=np.float64)
+                product = chunk[:, 0].astype(np.intp)
+                receipt = chunk[:, 1].astype(np.intp)
+                quantity += np.bincount(product, chunk[:, 2], n_products)
+                revenue += np.bincount(product, chunk[:, 3], n_products)
+                basket += np.bincount(receipt, chunk[:, 2], len(basket))
+                lines += np.bincount(receipt, minlength=len(lines))
+
+        return SalesSummary(
+            products=self._products(products, quantity, revenue),
+            units=self._units(products, quantity, revenue),
+            basket_sizes=self._basket_sizes(basket[lines > 0]),
+        )
+
+    @staticmethod
+    def _products(
+        products: list[tuple[int, str, str | None]], quantity: Floats, revenue: Floats
+    ) -> list[ProductSales]:
+        sold = [row for row in products if quantity[row[0]] > 0]
+        sold.sort(key=lambda row: revenue[row[0]], reverse=True)
+        return [
+            ProductSales(
+                id=UUID(product_id),
+                unit_id=None if unit_id is None else UUID(unit_id),
+                quantity=int(quantity[rowid]),
+                revenue=float(revenue[rowid]),
+            )
+            for rowid, product_id, unit_id in sold
+        ]
+
+    @staticmethod
+    def _units(
+        products: list[tuple[int, str, str | None]], quantity: Floats, revenue: Floats
+    ) -> list[UnitSales]:
+        if not products:
+            return []
+        rowids = np.array([rowid for rowid, _, _ in products], dtype=np.intp)
+        unit_ids, unit = np.unique(
+            [unit_id or "" for _, _, unit_id in products], return_inverse=True
+        )
+        unit_quantity = np.bincount(unit, quantity[rowids], len(unit_ids))
+        unit_revenue = np.bincount(unit, revenue[rowids], len(unit_ids))
+        order = np.argsort(-unit_revenue, kind="stable")
+        return [
+            UnitSales(
+                id=UUID(str(unit_ids[i])) if unit_ids[i] else None,
+                quantity=int(unit_quantity[i]),
+                revenue=float(unit_revenue[i]),
+            )
+            for i in order
+            if unit_quantity[i] > 0
+        ]
+
+    @staticmethod
+    def _basket_sizes(baskets: Floats) -> dict[int, int]:
+        sizes, receipts = np.unique(baskets.astype(np.int64), return_counts=True)
+        return {int(size): int(count) for size, count in zip(sizes, receipts)}
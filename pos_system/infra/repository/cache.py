@@ -0,0 +1,229 @@
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from uuid import UUID
+
+from pos_system.core.products import Product, ProductRepository, RejectedProduct
+from pos_system.core.units import Unit, UnitRepository
+from pos_system.infra.repository.connection import Database
+
+
+@dataclass
+class ProductCache:
+    """Bounded LRU of products by id or barcode; stale-generation puts drop."""
+
+    capacity: int = 50_000
+    hits: int = 0
+    misses: int = 0
+
+    _by_id: OrderedDict[str, Product] = field(init=False, repr=False)
+    _by_barcode: dict[str, str] = field(init=False, repr=False)
+    _lock: threading.Lock = field(init=False, repr=False)
+    _generation: int = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self._by_id = OrderedDict()
+        self._by_barcode = {}
+        self._lock = threading.Lock()
+        self._generation = 0
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def get(self, product_id: UUID) -> Product | None:
+        with self._lock:
+            return self._lookup(str(product_id))
+
+    def get_by_barcode(self, barcode: str) -> Product | None:
+        with self._lock:
+            return self._lookup(self._by_barcode.get(barcode))
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def put(self, product: Product, generation: int | None = None) -> None:
+        key = str(product.id)
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            self._by_id[key] = product
+            self._by_id.move_to_end(key)
+            self._by_barcode[product.barcode] = key
+            while len(self._by_id) > self.capacity:
+                _, evicted = self._by_id.popitem(last=False)
+                self._by_barcode.pop(evicted.barcode, None)
+
+    def invalidate(self, product_id: UUID) -> None:
+        with self._lock:
+            self._generation += 1
+            product = self._by_id.pop(str(product_id), None)
+            if product is not None:
+                self._by_barcode.pop(product.barcode, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._by_id.clear()
+            self._by_barcode.clear()
+
+    def _lookup(self, key: str | None) -> Product | None:
+        product = self._by_id.get(key) if key is not None else None
+        if product is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._by_id.move_to_end(str(product.id))
+        return product
+
+
+@dataclass
+class CachedProductsDB:
+    """Read-through product repository that invalidates the cache on writes."""
+
+    products: ProductRepository
+    cache: ProductCache
+    db: Database
+
+    _generation: int = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        # Taken before db runs any read, so reads of older snapshots are dropped.
+        self._generation = self.cache.generation
+
+    def create(self, product: Product) -> Product:
+        self.products.create(product)
+        self._invalidate(product.id)
+        return product
+
+    def create_many(self, products: list[Product]) -> list[RejectedProduct]:
+        return self.products.create_many(products)
+
+    def get(self, product_id: UUID) -> Product:
+        product = self.cache.get(product_id)
+        if product is None:
+            product = self.products.get(product_id)
+            self.cache.put(product, self._generation)
+        return product
+
+    def get_many(self, product_ids: list[UUID]) -> list[Product]:
+        products = []
+        misses = []
+        for product_id in product_ids:
+            product = self.cache.get(product_id)
+            if product is None:
+                misses.append(product_id)
+            else:
+                products.append(product)
+        if misses:
+            for product in self.products.get_many(misses):
+                self.cache.put(product, self._generation)
+                products.append(product)
+        return products
+
+    def get_by_barcode(self, barcode: str) -> Product:
+        product = self.cache.get_by_barcode(barcode)
+        if product is None:
+            product = self.products.get_by_barcode(barcode)
+            self.cache.put(product, self._generation)
+        return product
+
+    def get_all(self) -> list[Product]:
+        return self.products.get_all()
+
+    def get_page(self, after: UUID | None, limit: int | None) -> list[Product]:
+        return self.products.get_page(after, limit)
+
+    def update_price(self, product_id: UUID, new_price: float) -> None:
+        self.products.update_price(product_id, new_price)
+        self._invalidate(product_id)
+
+    def _invalidate(self, product_id: UUID) -> None:
+        self.cache.invalidate(product_id)
+        self.db.on_commit(lambda: self.cache.invalidate(product_id))
+
+
+@dataclass
+class UnitCache:
+    """Bounded LRU of units, with ProductCache's generation rule."""
+
+    capacity: int = 10_000
+    hits: int = 0
+    misses: int = 0
+
+    _by_id: OrderedDict[str, Unit] = field(init=False, repr=False)
+    _lock: threading.Lock = field(init=False, repr=False)
+    _generation: int = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self._by_id = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = 0
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def get(self, unit_id: UUID) -> Unit | None:
+        key = str(unit_id)
+        with self._lock:
+            unit = self._by_id.get(key)
+            if unit is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._by_id.move_to_end(key)
+            return unit
+
+    def put(self, unit: Unit, generation: int | None = None) -> None:
+        key = str(unit.id)
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            self._by_id[key] = unit
+            self._by_id.move_to_end(key)
+            while len(self._by_id) > self.capacity:
+                self._by_id.popitem(last=False)
+
+    def invalidate(self, unit_id: UUID) -> None:
+        with self._lock:
+            self._generation += 1
+            self._by_id.pop(str(unit_id), None)
+
+
+@dataclass
+class CachedUnitsDB:
+    """Read-through unit repository, invalidated like CachedProductsDB."""
+
+    units: UnitRepository
+    cache: UnitCache
+    db: Database
+
+    _generation: int = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self._generation = self.cache.generation
+
+    def create(self, unit: Unit) -> Unit:
+        self.units.create(unit)
+        self.cache.invalidate(unit.id)
+        self.db.on_commit(lambda: self.cache.invalidate(unit.id))
+        return unit
+
+    def get(self, unit_id: UUID) -> Unit:
+        unit = self.cache.get(unit_id)
+        if unit is None:
+            unit = self.units.get(unit_id)
+            self.cache.put(unit, self._generation)
+        return unit
+
+    def get_all(self) -> list[Unit]:
+        return self.units.get_all()
+
+    def get_page(self, after: UUID | None, limit: int | None) -> list[Unit]:
+        return self.units.get_page(after, limit)
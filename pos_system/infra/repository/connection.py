@@ -0,0 +1,195 @@
+from __future__ import annotations
+
+import sqlite3
+import threading
+from contextlib import AbstractContextManager, contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from queue import Empty, LifoQueue
+from sqlite3 import Connection, Cursor
+from typing import Callable, Iterator, Protocol
+
+DEFAULT_DB_FILE = str(Path(__file__).resolve().parents[2] / "pos_db.db")
+MEMORY_PREFIX = "memory:"
+
+PRAGMAS = (
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA busy_timeout = 5000",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA cache_size = -16000",
+)
+
+
+class Database(Protocol):
+    def transaction(self) -> AbstractContextManager[Cursor]:
+        pass
+
+    def on_commit(self, callback: Callable[[], None]) -> None:
+        pass
+
+
+@contextmanager
+def transaction(conn: Connection, immediate: bool = False) -> Iterator[Cursor]:
+    """Run a block atomically, nesting as a savepoint if a transaction is open."""
+    cursor = conn.cursor()
+    if conn.in_transaction:
+        cursor.execute("SAVEPOINT nested")
+        try:
+            yield cursor
+        except BaseException:
+            cursor.execute("ROLLBACK TO nested")
+            raise
+        finally:
+            cursor.execute("RELEASE nested")
+    else:
+        cursor.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+        try:
+            yield cursor
+        except BaseException:
+            conn.rollback()
+            raise
+        conn.commit()
+
+
+@dataclass
+class UnitOfWork:
+    """A single connection and transaction shared by every repository using it."""
+
+    pool: ConnectionPool
+    conn: Connection
+    callbacks: list[Callable[[], None]] = field(default_factory=list)
+
+    @contextmanager
+    def transaction(self) -> Iterator[Cursor]:
+        with transaction(self.conn) as cursor:
+            yield cursor
+
+    def on_commit(self, callback: Callable[[], None]) -> None:
+        self.callbacks.append(callback)
+
+    def commit(self) -> None:
+        try:
+            self.conn.commit()
+        finally:
+            self.pool.release(self.conn)
+        for callback in self.callbacks:
+            callback()
+
+    def rollback(self) -> None:
+        self.pool.release(self.conn)
+
+
+def sqlite_uri(database: str) -> str:
+    """Map memory:<name> to a process-wide memdb database, else a file path."""
+    if database.startswith(MEMORY_PREFIX):
+        return f"file:/{database.removeprefix(MEMORY_PREFIX)}?vfs=memdb"
+    return database
+
+
+@dataclass
+class ConnectionPool:
+    db_file: str = DEFAULT_DB_FILE
+    size: int = 8
+    on_statement: Callable[[str], None] | None = None
+
+    _idle: LifoQueue[Connection] = field(init=False, repr=False)
+    _opened: list[Connection] = field(init=False, repr=False)
+    _lock: threading.Lock = field(init=False, repr=False)
+    _anchor: Connection | None = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self._idle = LifoQueue()
+        self._opened = []
+        self._lock = threading.Lock()
+        # An in-memory database lives only while a connection to it is open.
+        self._anchor = self.connect() if self.in_memory else None
+
+    @property
+    def in_memory(self) -> bool:
+        return self.db_file.startswith(MEMORY_PREFIX)
+
+    def connect(self) -> Connection:
+        conn = sqlite3.connect(
+            sqlite_uri(self.db_file),
+            isolation_level=None,
+            check_same_thread=False,
+            uri=True,
+        )
+        for pragma in PRAGMAS:
+            conn.execute(pragma)
+        if self.on_statement is not None:
+            conn.set_trace_callback(self.on_statement)
+        return conn
+
+    def checkout(self) -> Connection:
+        try:
+            return self._idle.get_nowait()
+        except Empty:
+            conn = self.connect()
+            with self._lock:
+                self._opened.append(conn)
+            return conn
+
+    def release(self, conn: Connection) -> None:
+        if conn.in_transaction:
+            conn.rollback()
+        with self._lock:
+            keep = conn in self._opened and self._idle.qsize() < self.size
+            if not keep and conn in self._opened:
+                self._opened.remove(conn)
+        if keep:
+            self._idle.put_nowait(conn)
+        else:
+            conn.close()
+
+    def fill(self) -> None:
+        """Open idle connections up to size now instead of on first use."""
+        conns = [self.checkout() for _ in range(self.size - self._idle.qsize())]
+        for conn in conns:
+            self.release(conn)
+
+    @contextmanager
+    def acquire(self) -> Iterator[Connection]:
+        conn = self.checkout()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    @contextmanager
+    def transaction(self) -> Iterator[Cursor]:
+        with self.acquire() as conn, transaction(conn) as cursor:
+            yield cursor
+
+    def on_commit(self, callback: Callable[[], None]) -> None:
+        callback()
+
+    def begin(self, immediate: bool = False) -> UnitOfWork:
+        conn = self.checkout()
+        try:
+            conn.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+        except BaseException:
+            self.release(conn)
+            raise
+        return UnitOfWork(self, conn)
+
+    @contextmanager
+    def unit_of_work(self, immediate: bool = False) -> Iterator[UnitOfWork]:
+        uow = self.begin(immediate)
+        try:
+            yield uow
+        except BaseException:
+            uow.rollback()
+            raise
+        uow.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            opened, self._opened = self._opened, []
+        for conn in opened:
+            conn.close()
+        self._idle = LifoQueue()
+        if self._anchor is not None:
+            self._anchor.close()
+            self._anchor = None
@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+import asyncio
+import multiprocessing
+from concurrent.futures import (
+    Executor as PoolExecutor,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+)
+from contextvars import copy_context
+from dataclasses import dataclass, field
+from datetime import datetime
+from functools import partial
+from typing import Any, Callable, Protocol, TypeVar
+from uuid import UUID
+
+from starlette.concurrency import run_in_threadpool
+
+from pos_system.core.analytics import SalesAnalytics, SalesSummary
+from pos_system.core.products import Product, ProductRepository, RejectedProduct
+from pos_system.core.receipt import Receipt, ReceiptRepository
+from pos_system.core.report import (
+    Granularity,
+    Report,
+    ReportRepository,
+    SalesBucket,
+)
+from pos_system.core.units import Unit, UnitRepository
+from pos_system.infra.tracing import traced
+
+T = TypeVar("T")
+
+
+class Runner(Protocol):
+    async def run(self, function: Callable[..., T], *args: Any) -> T:
+        pass
+
+
+@dataclass
+class Executor:
+    """Runs blocking repository calls off the event loop.
+
+    With max_workers set, calls go to a dedicated, bounded thread pool, or to
+    spawned worker processes for CPU-bound work; otherwise they share
+    Starlette's default thread pool, like sync routes. Inline calls run on the
+    event loop itself, for in-memory repositories that never block.
+    """
+
+    max_workers: int | None = None
+    processes: bool = False
+    inline: bool = False
+
+    _pool: PoolExecutor | None = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self._pool = None
+        if self.processes:
+            context = multiprocessing.get_context("spawn")
+            self._pool = ProcessPoolExecutor(self.max_workers, mp_context=context)
+        elif self.max_workers is not None:
+            self._pool = ThreadPoolExecutor(self.max_workers, "pos-db")
+
+    async def run(self, function: Callable[..., T], *args: Any) -> T:
+        call = partial(function, *args)
+        if self.inline:
+            return traced(call)
+        if self.processes:
+            return await self._submit(call)
+        if self._pool is None:
+            return await run_in_threadpool(traced, call)
+        # Unlike run_in_threadpool, run_in_executor does not carry contextvars.
+        return await self._submit(partial(copy_context().run, traced, call))
+
+    async def _submit(self, call: Callable[[], T]) -> T:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._pool, call)
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown()
+
+
+@dataclass
+class AsyncUnitsDB:
+    units: UnitRepository
+    executor: Runner
+
+    async def create(self, unit: Unit) -> Unit:
+        return await self.executor.run(self.units.create, unit)
+
+    async def get(self, unit_id: UUID) -> Unit:
+        return await self.executor.run(self.units.get, unit_id)
+
+    async def get_all(self) -> list[Unit]:
+        return await self.executor.run(self.units.get_all)
+
+    async def get_page(self, after: UUID | None, limit: int | None) -> list[Unit]:
+        return await self.executor.run(self.units.get_page, after, limit)
+
+
+@dataclass
+class AsyncProductsDB:
+    products: ProductRepository
+    executor: Runner
+
+    async def create(self, product: Product) -> Product:
+        return await self.executor.run(self.products.create, product)
+
+    async def create_many(self, products: list[Product]) -> list[RejectedProduct]:
+        return await self.executor.run(self.products.create_many, products)
+
+    async def get(self, product_id: UUID) -> Product:
+        return await self.executor.run(self.products.get, product_id)
+
+    async def get_by_barcode(self, barcode: str) -> Product:
+        return await self.executor.run(self.products.get_by_barcode, barcode)
+
+    async def get_all(self) -> list[Product]:
+        return await self.executor.run(self.products.get_all)
+
+    async def get_page(self, after: UUID | None, limit: int | None) -> list[Product]:
+        return await self.executor.run(self.products.get_page, after, limit)
+
+    async def update_price(self, product_id: UUID, new_price: float) -> None:
+        await self.executor.run(self.products.update_price, product_id, new_price)
+
+
+@dataclass
+class AsyncReceiptsDB:
+    receipts: ReceiptRepository
+    executor: Runner
+
+    async def create(self) -> Receipt:
+        return await self.executor.run(self.receipts.create)
+
+    async def add_product(
+        self, receipt_id: UUID, product_id: UUID, quantity: int
+    ) -> None:
+        await self.executor.run(
+            self.receipts.add_product, receipt_id, product_id, quantity
+        )
+
+    async def add_products(self, receipt_id: UUID, quantities: dict[UUID, int]) -> None:
+        await self.executor.run(self.receipts.add_products, receipt_id, quantities)
+
+    async def get(self, receipt_id: UUID) -> Receipt:
+        return await self.executor.run(self.receipts.get, receipt_id)
+
+    async def close(self, receipt_id: UUID) -> None:
+        await self.executor.run(self.receipts.close, receipt_id)
+
+    async def delete(self, receipt_id: UUID) -> None:
+        await self.executor.run(self.receipts.delete, receipt_id)
+
+
+@dataclass
+class AsyncReportDB:
+    report: ReportRepository
+    executor: Runner
+
+    async def get(self) -> Report:
+        return await self.executor.run(self.report.get)
+
+    async def get_buckets(
+        self, granularity: Granularity, start: datetime | None, end: datetime | None
+    ) -> list[SalesBucket]:
+        return await self.executor.run(self.report.get_buckets, granularity, start, end)
+
+
+@dataclass
+class AsyncSalesAnalyticsDB:
+    analytics: SalesAnalytics
+    executor: Runner
+
+    async def summarise(
+        self, start: datetime | None, end: datetime | None
+    ) -> SalesSummary:
+        return await self.executor.run(self.analytics.summarise, start, end)
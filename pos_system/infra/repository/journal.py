@@ -0,0 +1,267 @@
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import BinaryIO, Iterator
+from uuid import UUID, uuid4
+
+from pos_system.core.errors import ParameterDoesNotExistError, ReceiptAlreadyClosedError
+from pos_system.core.products import ProductRepository
+from pos_system.core.receipt import Receipt
+from pos_system.infra.metrics import timed
+from pos_system.infra.repository.connection import ConnectionPool
+from pos_system.infra.repository.receipt import ReceiptEvent, ReceiptsDB
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ReceiptJournal:
+    """Append-only log of receipt writes, group-committed and applied later."""
+
+    path: Path
+    db: ConnectionPool
+    max_batch: int = 1024
+    max_retries: int = 3
+    retry_delay: float = 1.0
+    flushes: int = 0
+
+    _file: BinaryIO | None = field(init=False, repr=False)
+    _changed: threading.Condition = field(init=False, repr=False)
+    _queued: list[ReceiptEvent] = field(init=False, repr=False)
+    _unapplied: deque[ReceiptEvent] = field(init=False, repr=False)
+    _last: int = field(init=False, repr=False)
+    _durable: int = field(init=False, repr=False)
+    _applied: int = field(init=False, repr=False)
+    _flushing: bool = field(init=False, repr=False)
+    _closing: bool = field(init=False, repr=False)
+    _error: Exception | None = field(init=False, repr=False)
+    _thread: threading.Thread | None = field(init=False, repr=False)
+    _locks: tuple[threading.Lock, ...] = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self._file = None
+        self._changed = threading.Condition()
+        self._queued = []
+        self._unapplied = deque()
+        self._last = self._durable = self._applied = 0
+        self._flushing = self._closing = False
+        self._error = None
+        self._thread = None
+        self._locks = tuple(threading.Lock() for _ in range(64))
+
+    def open(self) -> int:
+        """Replay events SQLite has not applied yet and start the applier."""
+        with self.db.transaction() as cursor:
+            row = cursor.execute("SELECT seq FROM journal_applied").fetchone()
+        applied = 0 if row is None else row[0]
+
+        replayed = 0
+        pending = [event for event in self._read() if event.seq > applied]
+        for start in range(0, len(pending), self.max_batch):
+            end = start + self.max_batch
+            batch = pending[start:end]
+            self._apply(batch)
+            replayed += len(batch)
+        if pending:
+            applied = pending[-1].seq
+            logger.info("Journal replayed", extra={"events": replayed})
+        self._truncate()
+
+        self._last = self._durable = self._applied = applied
+        self._closing = False
+        self._error = None
+        self._file = open(self.path, "ab")
+        self._thread = threading.Thread(
+            target=self._run, name="pos-journal", daemon=True
+        )
+        self._thread.start()
+        return replayed
+
+    def lock(self, receipt_id: UUID) -> threading.Lock:
+        """The lock to hold from checking a receipt until appending to it."""
+        return self._locks[hash(receipt_id) % len(self._locks)]
+
+    def append(self, event: ReceiptEvent) -> None:
+        with self._changed:
+            if self._error is not None:
+                raise self._error
+            self._last += 1
+            event.seq = self._last
+            self._queued.append(event)
+            while self._durable < event.seq:
+                if self._error is not None:
+                    raise self._error
+                if self._flushing:
+                    self._changed.wait()
+                else:
+                    self._flush()
+
+    def _flush(self) -> None:
+        """Write and fsync the queue; called, and returns, holding the lock."""
+        assert self._file is not None, "journal is not open"
+        batch, self._queued = self._queued, []
+        self._flushing = True
+        self._changed.release()
+        try:
+            self._file.write(b"".join(f"{e.to_json()}\n".encode() for e in batch))
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        except OSError as e:
+            logger.error("Journal write failed", extra={"error": str(e)})
+            self._error = e
+        finally:
+            self._changed.acquire()
+            self._flushing = False
+            self._changed.notify_all()
+        if self._error is None:
+            self.flushes += 1
+            self._durable = batch[-1].seq
+            self._unapplied.extend(batch)
+
+    def barrier(self) -> None:
+        """Wait until SQLite reflects every write acknowledged so far."""
+        with self._changed:
+            durable = self._durable
+            self._changed.wait_for(
+                lambda: self._applied >= durable or self._error is not None
+            )
+            if self._applied < durable:
+                assert self._error is not None
+                raise self._error
+
+    def close(self) -> None:
+        """Apply what is left, make SQLite durable and start a fresh journal."""
+        with self._changed:
+            self._closing = True
+            self._changed.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self._applied < self._durable:
+            logger.error(
+                "Journal kept for replay",
+                extra={"applied": self._applied, "durable": self._durable},
+            )
+            return
+        self._truncate()
+
+    def _run(self) -> None:
+        failures = 0
+        while True:
+            with self._changed:
+                self._changed.wait_for(lambda: self._unapplied or self._closing)
+                if not self._unapplied:
+                    return
+                count = min(len(self._unapplied), self.max_batch)
+                batch = [self._unapplied.popleft() for _ in range(count)]
+            try:
+                self._apply(batch)
+            except Exception as e:
+                failures += 1
+                logger.exception("Journal apply failed", extra={"attempt": failures})
+                with self._changed:
+                    self._unapplied.extendleft(reversed(batch))
+                    if failures > self.max_retries:
+                        # Waiters fail from here on; the events stay on disk.
+                        self._error = e
+                        self._changed.notify_all()
+                        return
+                    self._changed.wait(self.retry_delay)
+                continue
+            failures = 0
+            with self._changed:
+                self._applied = batch[-1].seq
+                self._changed.notify_all()
+
+    def _apply(self, batch: list[ReceiptEvent]) -> None:
+        with self.db.unit_of_work(immediate=True) as uow:
+            ReceiptsDB(uow).apply(batch)
+            with uow.transaction() as cursor:
+                cursor.execute("UPDATE journal_applied SET seq = ?", (batch[-1].seq,))
+                if cursor.rowcount == 0:
+                    cursor.execute(
+                        "INSERT INTO journal_applied (seq) VALUES (?)",
+                        (batch[-1].seq,),
+                    )
+
+    def _read(self) -> Iterator[ReceiptEvent]:
+        if not self.path.exists():
+            return
+        with open(self.path) as file:
+            for number, line in enumerate(file, start=1):
+                try:
+                    yield ReceiptEvent.from_json(line)
+                except ValueError:
+                    # Only the last line can be torn, by a crash mid-write;
+                    # its append was never acknowledged.
+                    logger.warning("Journal line skipped", extra={"line": number})
+
+    def _truncate(self) -> None:
+        """Drop applied events once a checkpoint has synced them to the db."""
+        with self.db.acquire() as conn:
+            row = conn.execute("PRAGMA wal_checkpoint(FULL)").fetchone()
+        busy, log, checkpointed = row
+        if busy or log != checkpointed:
+            logger.warning(
+                "Journal kept, checkpoint incomplete",
+                extra={"log": log, "checkpointed": checkpointed},
+            )
+            return
+        with open(self.path, "wb") as file:
+            os.fsync(file.fileno())
+
+
+@timed
+@dataclass
+class JournaledReceiptsDB:
+    """Receipt repository that validates writes, then journals them."""
+
+    journal: ReceiptJournal
+    receipts: ReceiptsDB
+    products: ProductRepository
+
+    def create(self) -> Receipt:
+        receipt = Receipt(id=uuid4(), status="open", total=0, products=[])
+        self.journal.append(ReceiptEvent("create", str(receipt.id)))
+        return receipt
+
+    def add_product(self, receipt_id: UUID, product_id: UUID, quantity: int) -> None:
+        self.add_products(receipt_id, {product_id: quantity})
+
+    def add_products(self, receipt_id: UUID, quantities: dict[UUID, int]) -> None:
+        with self.journal.lock(receipt_id):
+            if self.get(receipt_id).status == "closed":
+                raise ReceiptAlreadyClosedError()
+            prices = {
+                str(product.id): product.price
+                for product in self.products.get_many(list(quantities))
+            }
+            lines = []
+            for product_id, quantity in quantities.items():
+                if str(product_id) not in prices:
+                    raise ParameterDoesNotExistError(product_id)
+                lines.append((str(product_id), quantity, prices[str(product_id)]))
+            self.journal.append(ReceiptEvent("add", str(receipt_id), lines=lines))
+
+    def get(self, receipt_id: UUID) -> Receipt:
+        self.journal.barrier()
+        return self.receipts.get(receipt_id)
+
+    def close(self, receipt_id: UUID) -> None:
+        with self.journal.lock(receipt_id):
+            if self.get(receipt_id).status != "closed":
+                self.journal.append(ReceiptEvent("close", str(receipt_id)))
+
+    def delete(self, receipt_id: UUID) -> None:
+        with self.journal.lock(receipt_id):
+            if self.get(receipt_id).status == "closed":
+                raise ReceiptAlreadyClosedError()
+            self.journal.append(ReceiptEvent("delete", str(receipt_id)))
@@ -0,0 +1,490 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+from bisect import bisect_right, insort
+from collections import defaultdict
+from contextlib import contextmanager
+from dataclasses import dataclass, field, replace
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Iterator
+from uuid import UUID, uuid4
+
+from pos_system.core.analytics import ProductSales, SalesSummary, UnitSales
+from pos_system.core.errors import (
+    DoesNotExistError,
+    ExistsError,
+    ParameterDoesNotExistError,
+    ReceiptAlreadyClosedError,
+)
+from pos_system.core.products import Product, RejectedProduct
+from pos_system.core.receipt import Receipt, ReceiptProduct
+from pos_system.core.report import Granularity, Report, SalesBucket
+from pos_system.core.units import Unit
+from pos_system.infra.metrics import timed
+from pos_system.infra.repository.report import (
+    BUCKET_FORMATS,
+    TIMESTAMP_FORMAT,
+    timestamp_range,
+)
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FORMAT = 1
+
+
+@dataclass
+class StoredReceipt:
+    status: str
+    total: float
+    created_at: str
+    closed_at: str | None = None
+    lines: dict[str, ReceiptProduct] = field(default_factory=dict)
+
+
+@dataclass
+class MemoryStore:
+    """Process-local state; rows are replaced, never mutated, under lock."""
+
+    units: dict[str, Unit] = field(default_factory=dict)
+    unit_names: dict[str, str] = field(default_factory=dict)
+    products: dict[str, Product] = field(default_factory=dict)
+    barcodes: dict[str, str] = field(default_factory=dict)
+    receipts: dict[str, StoredReceipt] = field(default_factory=dict)
+    report: Report = field(default_factory=lambda: Report(0, 0))
+    rollups: dict[tuple[str, str], Report] = field(default_factory=dict)
+    version: int = 0
+
+    lock: threading.RLock = field(default_factory=threading.RLock, repr=False)
+    unit_keys: list[str] = field(default_factory=list, repr=False)
+    product_keys: list[str] = field(default_factory=list, repr=False)
+
+    @contextmanager
+    def write(self) -> Iterator[None]:
+        with self.lock:
+            yield
+            self.version += 1
+
+    def put_unit(self, unit: Unit) -> None:
+        key = str(unit.id)
+        self.units[key] = unit
+        self.unit_names[unit.name] = key
+        insort(self.unit_keys, key)
+
+    def put_product(self, product: Product) -> None:
+        key = str(product.id)
+        if key not in self.products:
+            insort(self.product_keys, key)
+        self.products[key] = product
+        self.barcodes[product.barcode] = key
+
+    @staticmethod
+    def page(keys: list[str], after: UUID | None, limit: int | None) -> list[str]:
+        start = bisect_right(keys, str(after or ""))
+        end = None if limit is None else start + limit
+        return keys[start:end]
+
+    def to_snapshot(self) -> tuple[int, dict[str, Any]]:
+        """The version and contents of the store, as of one point in time."""
+        # Rows are replaced, never mutated, so references are enough.
+        with self.lock:
+            version = self.version
+            units = list(self.units.values())
+            products = list(self.products.values())
+            receipts = list(self.receipts.items())
+            report = self.report
+            rollups = list(self.rollups.items())
+        return version, {
+            "format": SNAPSHOT_FORMAT,
+            "units": [[str(u.id), u.name] for u in units],
+            "products": [
+                [str(p.id), str(p.unit_id), p.name, p.barcode, p.price]
+                for p in products
+            ],
+            "receipts": {
+                key: {
+                    "status": receipt.status,
+                    "total": receipt.total,
+                    "created_at": receipt.created_at,
+                    "closed_at": receipt.closed_at,
+                    "lines": [
+                        [str(line.id), line.quantity, line.price, line.total]
+                        for line in receipt.lines.values()
+                    ],
+                }
+                for key, receipt in receipts
+            },
+            "report": [report.n_receipts, report.revenue],
+            "rollups": [
+                [granularity, bucket, totals.n_receipts, totals.revenue]
+                for (granularity, bucket), totals in rollups
+            ],
+        }
+
+    @classmethod
+    def from_snapshot(cls, snapshot: dict[str, Any]) -> MemoryStore:
+        store = cls(report=Report(*snapshot["report"]))
+        for unit_id, name in snapshot["units"]:
+            store.put_unit(Unit(name, UUID(unit_id)))
+        for product_id, unit_id, name, barcode, price in snapshot["products"]:
+            store.put_product(
+                Product(UUID(unit_id), name, barcode, price, UUID(product_id))
+            )
+        for key, receipt in snapshot["receipts"].items():
+            lines = {
+                product_id: ReceiptProduct(UUID(product_id), quantity, price, total)
+                for product_id, quantity, price, total in receipt.pop("lines")
+            }
+            store.receipts[key] = StoredReceipt(**receipt, lines=lines)
+        for granularity, bucket, n_receipts, revenue in snapshot["rollups"]:
+            store.rollups[granularity, bucket] = Report(n_receipts, revenue)
+        return store
+
+    def save(self, path: Path) -> int:
+        """Write a snapshot atomically and return the version it holds."""
+        version, snapshot = self.to_snapshot()
+        partial = path.with_name(path.name + ".tmp")
+        with open(partial, "w") as file:
+            json.dump(snapshot, file)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(partial, path)
+        return version
+
+    @classmethod
+    def restore(cls, path: Path) -> MemoryStore:
+        """Load the snapshot at path, or start empty if there is none yet."""
+        if not path.exists():
+            return cls()
+        with open(path) as file:
+            store = cls.from_snapshot(json.load(file))
+        logger.info("Snapshot restored", extra={"path": str(path)})
+        return store
+
+
+@dataclass
+class Snapshotter:
+    """Saves the store every interval seconds if it changed, and on stop."""
+
+    store: MemoryStore
+    path: Path
+    interval: float = 30.0
+
+    _saved: int = field(init=False, repr=False)
+    _stopped: threading.Event = field(init=False, repr=False)
+    _thread: threading.Thread | None = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self._saved = self.store.version
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def start(self) -> None:
+        self._stopped.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="pos-snapshot", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.save()
+
+    def save(self) -> None:
+        if self.store.version == self._saved:
+            return
+        self._saved = self.store.save(self.path)
+        logger.debug("Snapshot saved", extra={"path": str(self.path)})
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            try:
+                self.save()
+            except OSError as e:
+                logger.error("Snapshot failed", extra={"error": str(e)})
+
+
+def now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+@timed
+@dataclass
+class MemoryUnitsDB:
+    store: MemoryStore
+
+    def create(self, unit: Unit) -> Unit:
+        with self.store.write():
+            if str(unit.id) in self.store.units or unit.name in self.store.unit_names:
+                raise ExistsError(unit)
+            self.store.put_unit(unit)
+
+        logger.debug("Unit created", extra={"unit_id": str(unit.id)})
+        return unit
+
+    def get(self, unit_id: UUID) -> Unit:
+        unit = self.store.units.get(str(unit_id))
+        if unit is None:
+            raise DoesNotExistError(unit_id)
+        return unit
+
+    def get_all(self) -> list[Unit]:
+        return self.get_page(None, None)
+
+    def get_page(self, after: UUID | None, limit: int | None) -> list[Unit]:
+        with self.store.lock:
+            keys = self.store.page(self.store.unit_keys, after, limit)
+            return [self.store.units[key] for key in keys]
+
+    def delete_unit_by_name(self, name: str) -> None:
+        with self.store.write():
+            key = self.store.unit_names.pop(name, None)
+            if key is not None:
+                del self.store.units[key]
+                self.store.unit_keys.remove(key)
+        logger.debug("Unit deleted", extra={"unit_name": name})
+
+
+@timed
+@dataclass
+class MemoryProductsDB:
+    store: MemoryStore
+
+    def create(self, product: Product) -> Product:
+        with self.store.write():
+            self._check(product)
+            self.store.put_product(product)
+
+        logger.debug("Product created", extra={"product_id": str(product.id)})
+        return product
+
+    def create_many(self, products: list[Product]) -> list[RejectedProduct]:
+        rejected: list[RejectedProduct] = []
+        with self.store.write():
+            for index, product in enumerate(products):
+                try:
+                    self._check(product)
+                except (ExistsError, ParameterDoesNotExistError) as error:
+                    rejected.append(RejectedProduct(index, product, error))
+                else:
+                    self.store.put_product(product)
+        return rejected
+
+    def _check(self, product: Product) -> None:
+        if str(product.unit_id) not in self.store.units:
+            raise ParameterDoesNotExistError(product.unit_id)
+        if (
+            str(product.id) in self.store.products
+            or product.barcode in self.store.barcodes
+        ):
+            raise ExistsError(product)
+
+    def get(self, product_id: UUID) -> Product:
+        product = self.store.products.get(str(product_id))
+        if product is None:
+            raise DoesNotExistError()
+        return product
+
+    def get_many(self, product_ids: list[UUID]) -> list[Product]:
+        products = (self.store.products.get(str(key)) for key in product_ids)
+        return [product for product in products if product is not None]
+
+    def get_by_barcode(self, barcode: str) -> Product:
+        with self.store.lock:
+            key = self.store.barcodes.get(barcode)
+            if key is None:
+                raise DoesNotExistError()
+            return self.store.products[key]
+
+    def get_all(self) -> list[Product]:
+        return self.get_page(None, None)
+
+    def get_page(self, after: UUID | None, limit: int | None) -> list[Product]:
+        with self.store.lock:
+            keys = self.store.page(self.store.product_keys, after, limit)
+            return [self.store.products[key] for key in keys]
+
+    def update_price(self, product_id: UUID, new_price: float) -> None:
+        with self.store.write():
+            product = self.get(product_id)
+            self.store.put_product(replace(product, price=new_price))
+        logger.debug("Price updated", extra={"product_id": str(product_id)})
+
+    def delete_product_by_id(self, product_id: str) -> None:
+        with self.store.write():
+            product = self.store.products.pop(product_id, None)
+            if product is not None:
+                del self.store.barcodes[product.barcode]
+                self.store.product_keys.remove(product_id)
+        logger.debug("Product deleted", extra={"product_id": product_id})
+
+
+@timed
+@dataclass
+class MemoryReceiptsDB:
+    store: MemoryStore
+
+    def create(self) -> Receipt:
+        receipt = Receipt(id=uuid4(), status="open", total=0, products=[])
+        with self.store.write():
+            self.store.receipts[str(receipt.id)] = StoredReceipt(
+                receipt.status, receipt.total, now().strftime(TIMESTAMP_FORMAT)
+            )
+
+        logger.debug("Receipt created", extra={"receipt_id": str(receipt.id)})
+        return receipt
+
+    def add_product(self, receipt_id: UUID, product_id: UUID, quantity: int) -> None:
+        self.add_products(receipt_id, {product_id: quantity})
+
+    def add_products(self, receipt_id: UUID, quantities: dict[UUID, int]) -> None:
+        with self.store.write():
+            receipt = self._get(receipt_id)
+            if receipt.status == "closed":
+                raise ReceiptAlreadyClosedError()
+            prices = {}
+            for product_id in quantities:
+                product = self.store.products.get(str(product_id))
+                if product is None:
+                    raise ParameterDoesNotExistError(product_id)
+                prices[str(product_id)] = product.price
+
+            lines = dict(receipt.lines)
+            for product_id, quantity in quantities.items():
+                key = str(product_id)
+                line = lines.get(key)
+                if line is None:
+                    line = ReceiptProduct(product_id, 0, prices[key], 0)
+                # Like the SQL upsert, a line keeps the price it was opened at.
+                lines[key] = replace(
+                    line,
+                    quantity=line.quantity + quantity,
+                    total=line.total + quantity * line.price,
+                )
+            self.store.receipts[str(receipt_id)] = replace(
+                receipt,
+                total=sum(line.total for line in lines.values()),
+                lines=lines,
+            )
+
+    def get(self, receipt_id: UUID) -> Receipt:
+        with self.store.lock:
+            receipt = self._get(receipt_id)
+            return Receipt(
+                id=receipt_id,
+                status=receipt.status,
+                total=receipt.total,
+                products=list(receipt.lines.values()),
+            )
+
+    def close(self, receipt_id: UUID) -> None:
+        with self.store.write():
+            receipt = self._get(receipt_id)
+            if receipt.status == "closed":
+                return
+
+            closed_at = now()
+            self.store.receipts[str(receipt_id)] = replace(
+                receipt,
+                status="closed",
+                closed_at=closed_at.strftime(TIMESTAMP_FORMAT),
+            )
+            self.store.report = self._record_sale(self.store.report, receipt.total)
+            for granularity, bucket_format in BUCKET_FORMATS.items():
+                bucket = (granularity, closed_at.strftime(bucket_format))
+                totals = self.store.rollups.get(bucket, Report(0, 0))
+                self.store.rollups[bucket] = self._record_sale(totals, receipt.total)
+        logger.debug("Receipt closed", extra={"receipt_id": str(receipt_id)})
+
+    @staticmethod
+    def _record_sale(totals: Report, total: float) -> Report:
+        return Report(totals.n_receipts + 1, totals.revenue + total)
+
+    def delete(self, receipt_id: UUID) -> None:
+        with self.store.write():
+            if self._get(receipt_id).status == "closed":
+                raise ReceiptAlreadyClosedError()
+            del self.store.receipts[str(receipt_id)]
+        logger.debug("Receipt deleted", extra={"receipt_id": str(receipt_id)})
+
+    def _get(self, receipt_id: UUID) -> StoredReceipt:
+        receipt = self.store.receipts.get(str(receipt_id))
+        if receipt is None:
+            raise DoesNotExistError()
+        return receipt
+
+
+@timed
+@dataclass
+class MemoryReportDB:
+    store: MemoryStore
+
+    def get(self) -> Report:
+        with self.store.lock:
+            return replace(self.store.report)
+
+    def get_buckets(
+        self, granularity: Granularity, start: datetime | None, end: datetime | None
+    ) -> list[SalesBucket]:
+        lower, upper = timestamp_range(start, end)
+        with self.store.lock:
+            buckets = sorted(
+                (bucket, totals.n_receipts, totals.revenue)
+                for (kind, bucket), totals in self.store.rollups.items()
+                if kind == granularity and lower <= bucket < upper
+            )
+        return [
+            SalesBucket(
+                start=datetime.strptime(bucket, TIMESTAMP_FORMAT).replace(
+                    tzinfo=timezone.utc
+                ),
+                n_receipts=n_receipts,
+                revenue=revenue,
+            )
+            for bucket, n_receipts, revenue in buckets
+        ]
+
+
+@dataclass
+class MemorySalesAnalytics:
+    """SalesAnalytics over the store: a plain scan of closed receipts' lines."""
+
+    store: MemoryStore
+
+    def summarise(self, start: datetime | None, end: datetime | None) -> SalesSummary:
+        lower, upper = timestamp_range(start, end)
+        products: dict[str, ProductSales] = {}
+        units: dict[str, UnitSales] = {}
+        basket_sizes: defaultdict[int, int] = defaultdict(int)
+        with self.store.lock:
+            for receipt in self.store.receipts.values():
+                if receipt.status != "closed" or not (
+                    lower <= (receipt.closed_at or "") < upper
+                ):
+                    continue
+                basket = 0
+                for key, line in receipt.lines.items():
+                    product = self.store.products.get(key)
+                    unit_id = None if product is None else product.unit_id
+                    sold = products.setdefault(
+                        key, ProductSales(line.id, unit_id, 0, 0)
+                    )
+                    unit = units.setdefault(str(unit_id), UnitSales(unit_id, 0, 0))
+                    for sales in (sold, unit):
+                        sales.quantity += line.quantity
+                        sales.revenue += line.total
+                    basket += line.quantity
+                if basket:
+                    basket_sizes[basket] += 1
+
+        return SalesSummary(
+            products=sorted(products.values(), key=lambda s: s.revenue, reverse=True),
+            units=sorted(units.values(), key=lambda s: s.revenue, reverse=True),
+            basket_sizes=dict(sorted(basket_sizes.items())),
+        )
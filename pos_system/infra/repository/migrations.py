@@ -0,0 +1,147 @@
+from sqlite3 import Connection, Cursor
+from typing import Callable
+
+from pos_system.infra.repository.connection import transaction
+
+
+def reject_duplicates(cursor: Cursor) -> None:
+    for table, column in (("units", "name"), ("products", "barcode")):
+        cursor.execute(
+            f"SELECT {column} FROM {table} GROUP BY {column} HAVING COUNT(*) > 1"
+        )
+        duplicates = [row[0] for row in cursor.fetchall()]
+        if duplicates:
+            raise ValueError(
+                f"Cannot make {table}.{column} unique, these values repeat: "
+                f"{', '.join(map(str, duplicates))}. Rename or remove the extra "
+                "rows and start again."
+            )
+
+
+Migration = tuple[str | Callable[[Cursor], None], ...]
+
+MIGRATIONS: tuple[Migration, ...] = (
+    (
+        """
+        CREATE TABLE IF NOT EXISTS units (
+            uuid TEXT PRIMARY KEY,
+            name TEXT
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS products (
+            uuid TEXT PRIMARY KEY,
+            unit_id TEXT NOT NULL,
+            name TEXT NOT NULL,
+            barcode TEXT NOT NULL,
+            price REAL NOT NULL
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS sales_report (
+            n_receipts INTEGER NOT NULL,
+            revenue REAL NOT NULL
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS receipts (
+            id TEXT PRIMARY KEY,
+            status TEXT,
+            total FLOAT
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS receipt_products (
+            receipt_id TEXT,
+            product_id TEXT,
+            quantity INTEGER,
+            FOREIGN KEY (receipt_id) REFERENCES receipts(id)
+        )
+        """,
+        """
+        INSERT INTO sales_report (n_receipts, revenue)
+        SELECT 0, 0 WHERE NOT EXISTS (SELECT 1 FROM sales_report)
+        """,
+    ),
+    (
+        reject_duplicates,
+        """
+        UPDATE receipt_products SET quantity = (
+            SELECT SUM(r.quantity) FROM receipt_products r
+            WHERE r.receipt_id = receipt_products.receipt_id
+            AND r.product_id = receipt_products.product_id
+        )
+        """,
+        """
+        DELETE FROM receipt_products WHERE rowid NOT IN (
+            SELECT MIN(rowid) FROM receipt_products GROUP BY receipt_id, product_id
+        )
+        """,
+        """
+        CREATE UNIQUE INDEX IF NOT EXISTS units_name ON units (name)
+        """,
+        """
+        CREATE UNIQUE INDEX IF NOT EXISTS products_barcode ON products (barcode)
+        """,
+        """
+        CREATE UNIQUE INDEX IF NOT EXISTS receipt_products_receipt_product
+        ON receipt_products (receipt_id, product_id)
+        """,
+    ),
+    (
+        """
+        ALTER TABLE receipt_products ADD COLUMN price REAL
+        """,
+        """
+        ALTER TABLE receipt_products ADD COLUMN total REAL
+        """,
+        """
+        UPDATE receipt_products
+        SET price = p.price, total = receipt_products.quantity * p.price
+        FROM products p WHERE p.uuid = receipt_products.product_id
+        """,
+    ),
+    (
+        """
+        ALTER TABLE receipts ADD COLUMN created_at TEXT
+        """,
+        """
+        ALTER TABLE receipts ADD COLUMN closed_at TEXT
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS sales_rollups (
+            granularity TEXT NOT NULL,
+            bucket TEXT NOT NULL,
+            n_receipts INTEGER NOT NULL,
+            revenue REAL NOT NULL,
+            PRIMARY KEY (granularity, bucket)
+        ) WITHOUT ROWID
+        """,
+    ),
+    (
+        """
+        UPDATE sales_report SET revenue = revenue - (
+            SELECT COALESCE(SUM(total), 0) FROM receipts WHERE status != 'closed'
+        )
+        """,
+    ),
+    (
+        """
+        CREATE TABLE IF NOT EXISTS journal_applied (seq INTEGER NOT NULL)
+        """,
+    ),
+)
+
+
+def migrate(conn: Connection) -> int:
+    """Apply every migration newer than the database's user_version."""
+    with transaction(conn, immediate=True) as cursor:
+        version = cursor.execute("PRAGMA user_version").fetchone()[0]
+        for number, statements in enumerate(MIGRATIONS[version:], start=version + 1):
+            for statement in statements:
+                if isinstance(statement, str):
+                    cursor.execute(statement)
+                else:
+                    statement(cursor)
+            cursor.execute(f"PRAGMA user_version = {number}")
+    return len(MIGRATIONS)
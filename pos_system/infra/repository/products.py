@@ -1,6 +1,8 @@
+import json
+import logging
 import sqlite3
-from dataclasses import dataclass
-from sqlite3 import Connection
+from dataclasses import dataclass, field
+from sqlite3 import Cursor
 from uuid import UUID
 
 from pos_system.core.errors import (
@@ -8,88 +10,145 @@ from pos_system.core.errors import (
     ExistsError,
     ParameterDoesNotExistError,
 )
-from pos_system.core.products import Product
+from pos_system.core.products import Product, RejectedProduct
+from pos_system.infra.metrics import timed
+from pos_system.infra.repository.connection import ConnectionPool, Database
 
+logger = logging.getLogger(__name__)
 
+
+@timed
 @dataclass
 class ProductsDB:
-    db_file: str
-
-    def __init__(self) -> None:
-        self.db_file = "../pos_db.db"
-
-    def create_connection(self) -> Connection | None:
-        try:
-            conn = sqlite3.connect(self.db_file)
-            return conn
-        except sqlite3.Error as e:
-            print(e)
-            return None
+    db: Database = field(default_factory=ConnectionPool)
 
     def create(self, product: Product) -> Product:
         try:
-            conn = self.create_connection()
-            if conn is None:
-                raise sqlite3.Error
-            cursor = conn.cursor()
-            select = """
-                SELECT * from products WHERE barcode =?
-            """
-            cursor.execute(select, (product.barcode,))
-            u = cursor.fetchone()
-            print(u)
-            if u:
-                raise KeyError
-
-            select = """
-                SELECT * from units WHERE uuid =?
+            with self.db.transaction() as cursor:
+                insert_product_sql = """
+                    INSERT INTO products (uuid, unit_id, name, barcode, price)
+                    SELECT ?, ?, ?, ?, ?
+                    WHERE EXISTS (SELECT 1 FROM units WHERE uuid = ?)
                 """
-            cursor.execute(select, (str(product.unit_id),))
-            u = cursor.fetchone()
-            print(u)
-            if not u:
-                raise ParameterDoesNotExistError
-
-            insert_unit_sql = """
-                INSERT INTO products (uuid, unit_id, name, barcode, price)
-                VALUES (?, ?, ?, ?, ?)
-            """
-            cursor.execute(
-                insert_unit_sql,
-                (
-                    str(product.id),
-                    str(product.unit_id),
-                    product.name,
-                    product.barcode,
-                    product.price,
-                ),
-            )
-            conn.commit()
-
-            print("Product created successfully.")
+                cursor.execute(
+                    insert_product_sql,
+                    (
+                        str(product.id),
+                        str(product.unit_id),
+                        product.name,
+                        product.barcode,
+                        product.price,
+                        str(product.unit_id),
+                    ),
+                )
+                if cursor.rowcount == 0:
+                    raise ParameterDoesNotExistError
+
+            logger.debug("Product created", extra={"product_id": str(product.id)})
             return product
-        except KeyError:
+        except sqlite3.IntegrityError:
             raise ExistsError(product)
         except sqlite3.Error as e:
-            print(e)
+            logger.error("Database error", extra={"error": str(e)})
+            raise e
+
+    def create_many(self, products: list[Product]) -> list[RejectedProduct]:
+        try:
+            with self.db.transaction() as cursor:
+                known_units = self._existing(
+                    cursor, "units", "uuid", {str(p.unit_id) for p in products}
+                )
+                taken_barcodes = self._existing(
+                    cursor, "products", "barcode", {p.barcode for p in products}
+                )
+
+                accepted: list[Product] = []
+                rejected: list[RejectedProduct] = []
+                for index, product in enumerate(products):
+                    if str(product.unit_id) not in known_units:
+                        error: Exception = ParameterDoesNotExistError(product.unit_id)
+                    elif product.barcode in taken_barcodes:
+                        error = ExistsError(product)
+                    else:
+                        taken_barcodes.add(product.barcode)
+                        accepted.append(product)
+                        continue
+                    rejected.append(RejectedProduct(index, product, error))
+
+                insert_products_sql = """
+                    INSERT INTO products (uuid, unit_id, name, barcode, price)
+                    VALUES (?, ?, ?, ?, ?)
+                """
+                cursor.executemany(
+                    insert_products_sql,
+                    (
+                        (
+                            str(p.id),
+                            str(p.unit_id),
+                            p.name,
+                            p.barcode,
+                            p.price,
+                        )
+                        for p in accepted
+                    ),
+                )
+            return rejected
+        except sqlite3.Error as e:
+            logger.error("Database error", extra={"error": str(e)})
             raise e
-        finally:
-            if conn:
-                conn.close()
+
+    def _existing(
+        self, cursor: Cursor, table: str, column: str, values: set[str]
+    ) -> set[str]:
+        select_existing_sql = f"""
+            SELECT {column} FROM {table}
+            WHERE {column} IN (SELECT value FROM json_each(?))
+        """
+        cursor.execute(select_existing_sql, (json.dumps(list(values)),))
+        return {row[0] for row in cursor.fetchall()}
 
     def get(self, product_id: UUID) -> Product:
+        return self._get_where("uuid", str(product_id))
+
+    def get_many(self, product_ids: list[UUID]) -> list[Product]:
         try:
-            conn = self.create_connection()
-            if conn is None:
-                raise sqlite3.Error
-            cursor = conn.cursor()
+            with self.db.transaction() as cursor:
+                select_products_sql = """
+                    SELECT uuid, unit_id, name, barcode, price FROM products
+                    WHERE uuid IN (SELECT value FROM json_each(?))
+                """
 
-            select_unit_sql = """
-                SELECT uuid, unit_id, name, barcode, price FROM products WHERE uuid = ?
-            """
+                ids = [str(product_id) for product_id in product_ids]
+                cursor.execute(select_products_sql, (json.dumps(ids),))
+                products_data = cursor.fetchall()
 
-            cursor.execute(select_unit_sql, (str(product_id),))
-            product_data = cursor.fetchone()
+            return [
+                Product(
+                    product_data[1],
+                    product_data[2],
+                    product_data[3],
+                    product_data[4],
+                    product_data[0],
+                )
+                for product_data in products_data
+            ]
+        except sqlite3.Error as e:
+            logger.error("Database error", extra={"error": str(e)})
+            raise e
+
+    def get_by_barcode(self, barcode: str) -> Product:
+        return self._get_where("barcode", barcode)
+
+    def _get_where(self, column: str, value: str) -> Product:
+        try:
+            with self.db.transaction() as cursor:
+                select_product_sql = f"""
+                    SELECT uuid, unit_id, name, barcode, price
+                    FROM products WHERE {column} = ?
+                """
+
+                cursor.execute(select_product_sql, (value,))
+                product_data = cursor.fetchone()
 
             if product_data:
                 return Product(
@@ -102,25 +161,25 @@ class ProductsDB:
             else:
                 raise DoesNotExistError()
         except sqlite3.Error as e:
-            print(e)
+            logger.error("Database error", extra={"error": str(e)})
             raise e
-        finally:
-            if conn:
-                conn.close()
 
     def get_all(self) -> list[Product]:
-        try:
-            conn = self.create_connection()
-            if conn is None:
-                raise sqlite3.Error
-            cursor = conn.cursor()
+        return self.get_page(None, None)
 
-            select_all_products_sql = """
-                SELECT uuid, unit_id, name, barcode, price FROM products
-            """
+    def get_page(self, after: UUID | None, limit: int | None) -> list[Product]:
+        try:
+            with self.db.transaction() as cursor:
+                select_products_sql = """
+                    SELECT uuid, unit_id, name, barcode, price FROM products
+                    WHERE uuid > ? ORDER BY uuid LIMIT ?
+                """
 
-            cursor.execute(select_all_products_sql)
-            products_data = cursor.fetchall()
+                cursor.execute(
+                    select_products_sql,
+                    (str(after or ""), -1 if limit is None else limit),
+                )
+                products_data = cursor.fetchall()
 
             products = []
             for product_data in products_data:
@@ -135,27 +194,23 @@ class ProductsDB:
                 )
             return products
         except sqlite3.Error as e:
-            print(e)
+            logger.error("Database error", extra={"error": str(e)})
             raise e
-        finally:
-            if conn:
-                conn.close()
 
     def update_price(self, product_id: UUID, new_price: float) -> None:
         try:
-            conn = self.create_connection()
-            if conn is None:
-                raise sqlite3.Error
-            cursor = conn.cursor()
-            select = """
-                SELECT * from products WHERE uuid =?
-            """
-            cursor.execute(select, (str(product_id),))
-            u = cursor.fetchone()
-            if u:
+            with self.db.transaction() as cursor:
+                select = """
+                    SELECT * from products WHERE uuid =?
+                """
+                cursor.execute(select, (str(product_id),))
+                u = cursor.fetchone()
+                if not u:
+                    raise DoesNotExistError()
+
                 update_price_sql = """
-                            UPDATE products SET price = ? WHERE uuid = ?
-                        """
+                    UPDATE products SET price = ? WHERE uuid = ?
+                """
                 cursor.execute(
                     update_price_sql,
                     (
@@ -163,32 +218,16 @@ class ProductsDB:
                         str(product_id),
                     ),
                 )
-                conn.commit()
-                print(f"Price updated successfully for product: {product_id}")
-            else:
-                raise DoesNotExistError()
-        except KeyError:
-            raise DoesNotExistError()
+            logger.debug("Price updated", extra={"product_id": str(product_id)})
         except sqlite3.Error as e:
-            print(e)
+            logger.error("Database error", extra={"error": str(e)})
             raise e
-        finally:
-            if conn:
-                conn.close()
 
     def delete_product_by_id(self, product_id: str) -> None:
         try:
-            conn = self.create_connection()
-            if conn is None:
-                raise sqlite3.Error
-            cursor = conn.cursor()
-
-            cursor.execute("DELETE FROM products WHERE uuid = ?", (product_id,))
-            conn.commit()
-            print(f"Product deleted successfully, id: {product_id}")
+            with self.db.transaction() as cursor:
+                cursor.execute("DELETE FROM products WHERE uuid = ?", (product_id,))
+            logger.debug("Product deleted", extra={"product_id": product_id})
         except sqlite3.Error as e:
-            print(e)
+            logger.error("Database error", extra={"error": str(e)})
             raise e
-        finally:
-            if conn:
-                conn.close()
@@ -1,7 +1,9 @@
+import json
+import logging
 import sqlite3
-from dataclasses import dataclass
-from sqlite3 import Connection
-from typing import List
+from dataclasses import dataclass, field
+from sqlite3 import Cursor
+from typing import List, Literal
 from uuid import UUID, uuid4
 
 from pos_system.core.errors import (
@@ -9,316 +11,280 @@ from pos_system.core.errors import (
     ParameterDoesNotExistError,
     ReceiptAlreadyClosedError,
 )
+from pos_system.core.products import ProductRepository
 from pos_system.core.receipt import Receipt, ReceiptProduct
+from pos_system.infra.metrics import timed
+from pos_system.infra.repository.connection import ConnectionPool, Database
+from pos_system.infra.repository.products import ProductsDB
+from pos_system.infra.repository.report import BUCKET_FORMATS, current_timestamp
+
+logger = logging.getLogger(__name__)
 
 
 @dataclass
-class ReceiptsDB:
-    db_file: str
+class ReceiptEvent:
+    """A receipt write as journaled, with its time and the prices charged."""
 
-    def __init__(self) -> None:
-        self.db_file = "../pos_db.db"
+    op: Literal["create", "add", "close", "delete"]
+    receipt_id: str
+    at: str = field(default_factory=current_timestamp)
+    lines: list[tuple[str, int, float]] = field(default_factory=list)
+    seq: int = 0
 
-    def create_connection(self) -> Connection | None:
-        try:
-            conn = sqlite3.connect(self.db_file)
-            return conn
-        except sqlite3.Error as e:
-            print(e)
-            return None
+    def to_json(self) -> str:
+        return json.dumps(
+            [self.seq, self.op, self.receipt_id, self.at, self.lines],
+            separators=(",", ":"),
+        )
+
+    @classmethod
+    def from_json(cls, line: str) -> "ReceiptEvent":
+        seq, op, receipt_id, at, lines = json.loads(line)
+        return cls(op, receipt_id, at, [tuple(item) for item in lines], seq)
+
+
+@timed
+@dataclass
+class ReceiptsDB:
+    db: Database = field(default_factory=ConnectionPool)
+    products: ProductRepository | None = None
 
     def create(self) -> Receipt:
         try:
-            conn = self.create_connection()
-            if conn is None:
-                raise sqlite3.Error
-            cursor = conn.cursor()
-            u_id = uuid4()
-            receipt = Receipt(id=u_id, status="open", total=0, products=[])
-
-            insert_unit_sql = """
-                INSERT INTO receipts (id, status, total) VALUES (?, ?, ?)
-            """
-            cursor.execute(
-                insert_unit_sql, (str(receipt.id), receipt.status, receipt.total)
-            )
-            conn.commit()
+            with self.db.transaction() as cursor:
+                u_id = uuid4()
+                receipt = Receipt(id=u_id, status="open", total=0, products=[])
+                self._insert(cursor, str(receipt.id), current_timestamp())
 
-            print("Receipt created successfully.")
+            logger.debug("Receipt created", extra={"receipt_id": str(receipt.id)})
             return receipt
         except sqlite3.Error as e:
-            print(e)
+            logger.error("Database error", extra={"error": str(e)})
             raise e
-        finally:
-            if conn:
-                conn.close()
 
     def add_product(self, receipt_id: UUID, product_id: UUID, quantity: int) -> None:
+        self.add_products(receipt_id, {product_id: quantity})
+
+    def add_products(self, receipt_id: UUID, quantities: dict[UUID, int]) -> None:
         try:
-            conn = self.create_connection()
-            if conn is None:
-                raise sqlite3.Error
-            cursor = conn.cursor()
-
-            select_receipt_sql = """
-                SELECT id, status, total FROM receipts WHERE id = ?
-            """
-
-            cursor.execute(select_receipt_sql, (str(receipt_id),))
-            product_data = cursor.fetchone()
-
-            if not product_data:
-                raise DoesNotExistError()
-            products = self.get_receipt_products(receipt_id)
-            total = product_data[2]
-
-            select_unit_sql = """
-                            SELECT price
-                            FROM products WHERE uuid = ?
-                        """
-
-            cursor.execute(select_unit_sql, (str(product_id),))
-            product_data = cursor.fetchone()
-
-            if not product_data:
-                raise ParameterDoesNotExistError()
-
-            price = product_data[0]
-            already_in_receipt = False
-
-            for product in products:
-                if product.id == str(product_id):
-                    already_in_receipt = True
-                    break
-
-            if already_in_receipt:
-                select_receipt_product_sql = """
-                                SELECT quantity FROM receipt_products
-                                WHERE receipt_id = ? AND product_id = ?
-                            """
-                cursor.execute(
-                    select_receipt_product_sql, (str(receipt_id), str(product_id))
-                )
-                product_data = cursor.fetchone()
-                quantity_ = product_data[0]
-                total_quantity = quantity_ + quantity
-                update_receipt_sql = """
-                                        UPDATE receipt_products SET quantity = ?
-                                        WHERE receipt_id = ? AND product_id = ?
-                                    """
-                cursor.execute(
-                    update_receipt_sql,
-                    (
-                        total_quantity,
-                        str(receipt_id),
-                        str(product_id),
-                    ),
-                )
-            else:
-                insert_product_sql = """
-                                INSERT INTO receipt_products
-                                (receipt_id, product_id, quantity)
-                                VALUES (?, ?, ?)
-                            """
-                cursor.execute(
-                    insert_product_sql, (str(receipt_id), str(product_id), quantity)
-                )
-            total_ = total + quantity * price
-            update_receipt_sql = """
-                                UPDATE receipts SET total = ? WHERE id = ?
-                            """
-            cursor.execute(
-                update_receipt_sql,
-                (
-                    total_,
+            with self.db.transaction() as cursor:
+                select_receipt_sql = """
+                    SELECT status FROM receipts WHERE id = ?
+                """
+                cursor.execute(select_receipt_sql, (str(receipt_id),))
+                row = cursor.fetchone()
+                if row is None:
+                    raise DoesNotExistError()
+                if row[0] == "closed":
+                    raise ReceiptAlreadyClosedError()
+
+                catalog = self.products or ProductsDB(self.db)
+                prices = {
+                    str(product.id): product.price
+                    for product in catalog.get_many(list(quantities))
+                }
+                for product_id in quantities:
+                    if str(product_id) not in prices:
+                        raise ParameterDoesNotExistError(product_id)
+
+                self._add_lines(
+                    cursor,
                     str(receipt_id),
-                ),
-            )
-            select_sales_sql = """
-                                        SELECT n_receipts, revenue FROM sales_report
-                                    """
-
-            cursor.execute(select_sales_sql)
-            sales_data = cursor.fetchone()
-            if sales_data is None:
-                cursor.execute(
-                    "INSERT INTO sales_report (n_receipts, revenue) VALUES (0, 0)"
+                    [
+                        (str(product_id), quantity, prices[str(product_id)])
+                        for product_id, quantity in quantities.items()
+                    ],
                 )
-                sales_data = [0, 0]
-
-            # closed_receipts = sales_data[0]
-            revenue = sales_data[1]
+        except sqlite3.Error as e:
+            logger.error("Database error", extra={"error": str(e)})
+            raise e
 
-            update_sales_sql = """
-                                                    UPDATE sales_report SET revenue = ?
-                                                """
+    def _add_lines(
+        self, cursor: Cursor, receipt_id: str, lines: list[tuple[str, int, float]]
+    ) -> None:
+        upsert_product_sql = """
+            INSERT INTO receipt_products
+            (receipt_id, product_id, quantity, price, total)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (receipt_id, product_id)
+            DO UPDATE SET quantity = quantity + excluded.quantity,
+                          total = total + excluded.quantity * price
+            RETURNING price
+        """
+        amount = 0.0
+        for product_id, quantity, price in lines:
             cursor.execute(
-                update_sales_sql,
-                (revenue + quantity * price,),
+                upsert_product_sql,
+                (receipt_id, product_id, quantity, price, quantity * price),
             )
-            conn.commit()
-        except sqlite3.Error as e:
-            print(e)
-            raise e
-        finally:
-            if conn:
-                conn.close()
+            # A line that already exists keeps the price it was opened at.
+            amount += quantity * cursor.fetchone()[0]
+
+        update_receipt_sql = """
+            UPDATE receipts SET total = total + ? WHERE id = ?
+        """
+        cursor.execute(update_receipt_sql, (amount, receipt_id))
 
     def get(self, receipt_id: UUID) -> Receipt:
         try:
-            conn = self.create_connection()
-            if conn is None:
-                raise sqlite3.Error
-            cursor = conn.cursor()
-
-            select_receipt_sql = """
-                SELECT id, status, total FROM receipts WHERE id = ?
-            """
-
-            cursor.execute(select_receipt_sql, (str(receipt_id),))
-            product_data = cursor.fetchone()
-
-            if product_data:
-                return Receipt(
-                    id=product_data[0],
-                    products=self.get_receipt_products(receipt_id),
-                    total=product_data[2],
-                    status=product_data[1],
-                )
-            else:
-                raise DoesNotExistError()
+            with self.db.transaction() as cursor:
+                select_receipt_sql = """
+                    SELECT id, status, total FROM receipts WHERE id = ?
+                """
+
+                cursor.execute(select_receipt_sql, (str(receipt_id),))
+                product_data = cursor.fetchone()
+
+                if product_data:
+                    return Receipt(
+                        id=product_data[0],
+                        products=self._select_receipt_products(cursor, receipt_id),
+                        total=product_data[2],
+                        status=product_data[1],
+                    )
+                else:
+                    raise DoesNotExistError()
         except sqlite3.Error as e:
-            print(e)
+            logger.error("Database error", extra={"error": str(e)})
             raise e
-        finally:
-            if conn:
-                conn.close()
 
     def get_receipt_products(self, receipt_id: UUID) -> List[ReceiptProduct]:
         try:
-            conn = self.create_connection()
-            if conn is None:
-                raise sqlite3.Error
-            cursor = conn.cursor()
-
-            select_receipt_products_sql = """
-                SELECT product_id, quantity FROM receipt_products WHERE receipt_id = ?
-            """
-
-            cursor.execute(select_receipt_products_sql, (str(receipt_id),))
-            products = cursor.fetchall()
-            product_list = []
-            for product in products:
-                select_unit_sql = """
-                                SELECT price FROM products WHERE uuid = ?
-                            """
-
-                cursor.execute(select_unit_sql, (str(product[0]),))
-                product_data = cursor.fetchone()
-                price = product_data[0]
-                total = price * product[1]
-
-                res_product = ReceiptProduct(
-                    id=product[0], quantity=product[1], price=price, total=total
-                )
-                product_list.append(res_product)
-
-            return product_list
+            with self.db.transaction() as cursor:
+                return self._select_receipt_products(cursor, receipt_id)
         except sqlite3.Error as e:
-            print(e)
+            logger.error("Database error", extra={"error": str(e)})
             raise e
-        finally:
-            if conn:
-                conn.close()
+
+    def _select_receipt_products(
+        self, cursor: Cursor, receipt_id: UUID
+    ) -> List[ReceiptProduct]:
+        select_receipt_products_sql = """
+            SELECT product_id, quantity, price, total
+            FROM receipt_products WHERE receipt_id = ?
+        """
+
+        cursor.execute(select_receipt_products_sql, (str(receipt_id),))
+        return [
+            ReceiptProduct(id=product_id, quantity=quantity, price=price, total=total)
+            for product_id, quantity, price, total in cursor.fetchall()
+        ]
 
     def close(self, receipt_id: UUID) -> None:
         try:
-            conn = self.create_connection()
-            if conn is None:
-                raise sqlite3.Error
-            cursor = conn.cursor()
-
-            select_receipt_sql = """
-                SELECT id, status, total FROM receipts WHERE id = ?
-            """
-
-            cursor.execute(select_receipt_sql, (str(receipt_id),))
-            product_data = cursor.fetchone()
-
-            if product_data:
-                update_receipt_sql = """
-                            UPDATE receipts SET status = ? WHERE id = ?
-                        """
-                cursor.execute(
-                    update_receipt_sql,
-                    (
-                        "closed",
-                        str(receipt_id),
-                    ),
-                )
-                print(f"Status updated successfully for receipt: {receipt_id}")
-            else:
-                raise DoesNotExistError()
-
-            select_sales_sql = """
-                            SELECT n_receipts, revenue FROM sales_report
-                        """
-
-            cursor.execute(select_sales_sql)
-            sales_data = cursor.fetchone()
-            if sales_data is None:
-                cursor.execute(
-                    "INSERT INTO sales_report (n_receipts, revenue) VALUES (0, 0)"
-                )
-                sales_data = [0, 0]
-
-            closed_receipts = sales_data[0]
-            # revenue = sales_data[1]
+            with self.db.transaction() as cursor:
+                if not self._close(cursor, str(receipt_id), current_timestamp()):
+                    cursor.execute(
+                        "SELECT 1 FROM receipts WHERE id = ?", (str(receipt_id),)
+                    )
+                    if cursor.fetchone() is None:
+                        raise DoesNotExistError()
+                    return
+                logger.debug("Receipt closed", extra={"receipt_id": str(receipt_id)})
+        except sqlite3.Error as e:
+            logger.error("Database error", extra={"error": str(e)})
+            raise e
 
-            update_sales_sql = """
-                                        UPDATE sales_report SET n_receipts = ?
-                                    """
+    def _close(self, cursor: Cursor, receipt_id: str, closed_at: str) -> bool:
+        """Close an open receipt and recognise its sale; False if there is none."""
+        close_receipt_sql = """
+            UPDATE receipts SET status = ?, closed_at = ?
+            WHERE id = ? AND status != ?
+            RETURNING total
+        """
+        cursor.execute(close_receipt_sql, ("closed", closed_at, receipt_id, "closed"))
+        closed = cursor.fetchone()
+        if closed is None:
+            return False
+
+        self._record_sale(cursor, closed[0])
+
+        rollup_sql = """
+            INSERT INTO sales_rollups (granularity, bucket, n_receipts, revenue)
+            SELECT ?, strftime(?, closed_at), 1, total
+            FROM receipts WHERE id = ?
+            ON CONFLICT (granularity, bucket) DO UPDATE SET
+                n_receipts = n_receipts + 1,
+                revenue = revenue + excluded.revenue
+        """
+        cursor.executemany(
+            rollup_sql,
+            [
+                (granularity, bucket_format, receipt_id)
+                for granularity, bucket_format in BUCKET_FORMATS.items()
+            ],
+        )
+        return True
+
+    def _record_sale(self, cursor: Cursor, total: float) -> None:
+        """Recognise a closed receipt's revenue with an in-place increment."""
+        update_sales_sql = """
+            UPDATE sales_report
+            SET n_receipts = n_receipts + 1, revenue = revenue + ?
+        """
+        cursor.execute(update_sales_sql, (total,))
+        if cursor.rowcount == 0:
             cursor.execute(
-                update_sales_sql,
-                (closed_receipts + 1,),
+                "INSERT INTO sales_report (n_receipts, revenue) VALUES (1, ?)",
+                (total,),
             )
-            conn.commit()
-        except sqlite3.Error as e:
-            print(e)
-            raise e
-        finally:
-            if conn:
-                conn.close()
 
     def delete(self, receipt_id: UUID) -> None:
         try:
-            conn = self.create_connection()
-            if conn is None:
-                raise sqlite3.Error
-            cursor = conn.cursor()
-
-            select_receipt_sql = """
-                SELECT id, status, total FROM receipts WHERE id = ?
-            """
+            with self.db.transaction() as cursor:
+                select_receipt_sql = """
+                    SELECT id, status, total FROM receipts WHERE id = ?
+                """
 
-            cursor.execute(select_receipt_sql, (str(receipt_id),))
-            product_data = cursor.fetchone()
+                cursor.execute(select_receipt_sql, (str(receipt_id),))
+                product_data = cursor.fetchone()
 
-            if product_data:
+                if not product_data:
+                    raise DoesNotExistError()
                 if product_data[1] == "closed":
                     raise ReceiptAlreadyClosedError()
-                cursor.execute("DELETE FROM receipts WHERE id = ?", (str(receipt_id),))
-                cursor.execute(
-                    "DELETE FROM receipt_products WHERE receipt_id = ?",
-                    (str(receipt_id),),
-                )
-                conn.commit()
-                print(f"Receipt deleted successfully successfully: {receipt_id}")
-            else:
-                raise DoesNotExistError()
+                self._delete(cursor, str(receipt_id))
+            logger.debug("Receipt deleted", extra={"receipt_id": str(receipt_id)})
+        except sqlite3.Error as e:
+            logger.error("Database error", extra={"error": str(e)})
+            raise e
+
+    def _delete(self, cursor: Cursor, receipt_id: str) -> None:
+        cursor.execute("DELETE FROM receipts WHERE id = ?", (receipt_id,))
+        cursor.execute(
+            "DELETE FROM receipt_products WHERE receipt_id = ?", (receipt_id,)
+        )
+
+    def _insert(self, cursor: Cursor, receipt_id: str, created_at: str) -> None:
+        insert_receipt_sql = """
+            INSERT INTO receipts (id, status, total, created_at)
+            VALUES (?, 'open', 0, ?)
+        """
+        cursor.execute(insert_receipt_sql, (receipt_id, created_at))
+
+    def apply(self, events: list[ReceiptEvent]) -> None:
+        """Apply journaled writes in one transaction, skipping stale ones."""
+        try:
+            with self.db.transaction() as cursor:
+                for event in events:
+                    select_status_sql = "SELECT status FROM receipts WHERE id = ?"
+                    cursor.execute(select_status_sql, (event.receipt_id,))
+                    row = cursor.fetchone()
+                    status = None if row is None else row[0]
+
+                    if event.op == "create" and status is None:
+                        self._insert(cursor, event.receipt_id, event.at)
+                    elif event.op == "add" and status == "open":
+                        self._add_lines(cursor, event.receipt_id, event.lines)
+                    elif event.op == "close" and status is not None:
+                        self._close(cursor, event.receipt_id, event.at)
+                    elif event.op == "delete" and status == "open":
+                        self._delete(cursor, event.receipt_id)
+                    else:
+                        logger.warning(
+                            "Journal event skipped",
+                            extra={"seq": event.seq, "op": event.op},
+                        )
         except sqlite3.Error as e:
-            print(e)
+            logger.error("Database error", extra={"error": str(e)})
             raise e
-        finally:
-            if conn:
-                conn.close()
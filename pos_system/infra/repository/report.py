@@ -1,49 +1,89 @@
+import logging
 import sqlite3
-from dataclasses import dataclass
-from sqlite3 import Connection
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
 
-from pos_system.core.report import Report
+from pos_system.core.report import Granularity, Report, SalesBucket
+from pos_system.infra.metrics import timed
+from pos_system.infra.repository.connection import ConnectionPool, Database
 
+logger = logging.getLogger(__name__)
 
-@dataclass
-class ReportDB:
-    db_file: str
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+BUCKET_FORMATS: dict[Granularity, str] = {
+    "hour": "%Y-%m-%d %H:00:00",
+    "day": "%Y-%m-%d 00:00:00",
+}
 
-    def __init__(self) -> None:
-        self.db_file = "../pos_db.db"
 
-    def create_connection(self) -> Connection | None:
-        try:
-            conn = sqlite3.connect(self.db_file)
-            return conn
-        except sqlite3.Error as e:
-            print(e)
-            return None
+def to_timestamp(moment: datetime) -> str:
+    """Format a datetime like SQLite's datetime('now'): UTC, naive meaning UTC."""
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc)
+    return moment.strftime(TIMESTAMP_FORMAT)
+
+
+def current_timestamp() -> str:
+    return to_timestamp(datetime.now(timezone.utc))
+
+
+def timestamp_range(start: datetime | None, end: datetime | None) -> tuple[str, str]:
+    """Bounds for a half-open [start, end) filter; None leaves a side open."""
+    lower = "" if start is None else to_timestamp(start)
+    upper = "~" if end is None else to_timestamp(end)
+    return lower, upper
+
+
+@timed
+@dataclass
+class ReportDB:
+    db: Database = field(default_factory=ConnectionPool)
 
     def get(self) -> Report:
         try:
-            conn = self.create_connection()
-            if conn is None:
-                raise sqlite3.Error
-            cursor = conn.cursor()
+            with self.db.transaction() as cursor:
+                select_report_sql = """
+                    SELECT n_receipts, revenue FROM sales_report
+                """
 
-            select_report_sql = """
-                SELECT n_receipts, revenue FROM sales_report
-            """
+                cursor.execute(select_report_sql)
+                sales_data = cursor.fetchone()
 
-            cursor.execute(select_report_sql)
-            sales_data = cursor.fetchone()
+                if sales_data is None:
+                    cursor.execute(
+                        "INSERT INTO sales_report (n_receipts, revenue) VALUES (0, 0)"
+                    )
+                    sales_data = [0, 0]
 
-            if sales_data is None:
+            return Report(sales_data[0], sales_data[1])
+        except sqlite3.Error as e:
+            logger.error("Database error", extra={"error": str(e)})
+            raise e
+
+    def get_buckets(
+        self, granularity: Granularity, start: datetime | None, end: datetime | None
+    ) -> list[SalesBucket]:
+        """Closed-receipt totals per bucket whose start lies in [start, end)."""
+        select_buckets_sql = """
+            SELECT bucket, n_receipts, revenue FROM sales_rollups
+            WHERE granularity = ? AND bucket >= ? AND bucket < ?
+            ORDER BY bucket
+        """
+        try:
+            with self.db.transaction() as cursor:
                 cursor.execute(
-                    "INSERT INTO sales_report (n_receipts, revenue) VALUES (0, 0)"
+                    select_buckets_sql, (granularity, *timestamp_range(start, end))
                 )
-                sales_data = [0, 0]
-
-            return Report(sales_data[0], sales_data[1])
+                return [
+                    SalesBucket(
+                        start=datetime.strptime(bucket, TIMESTAMP_FORMAT).replace(
+                            tzinfo=timezone.utc
+                        ),
+                        n_receipts=n_receipts,
+                        revenue=revenue,
+                    )
+                    for bucket, n_receipts, revenue in cursor.fetchall()
+                ]
         except sqlite3.Error as e:
-            print(e)
+            logger.error("Database error", extra={"error": str(e)})
             raise e
-        finally:
-            if conn:
-                conn.close()
@@ -1,122 +1,83 @@
+import logging
 import sqlite3
-from dataclasses import dataclass
-from sqlite3 import Connection
+from dataclasses import dataclass, field
 from uuid import UUID
 
 from pos_system.core.errors import DoesNotExistError, ExistsError
 from pos_system.core.units import Unit
+from pos_system.infra.metrics import timed
+from pos_system.infra.repository.connection import ConnectionPool, Database
 
+logger = logging.getLogger(__name__)
 
+
+@timed
 @dataclass
 class UnitsDB:
-    db_file: str
-
-    def __init__(self) -> None:
-        self.db_file = "../pos_db.db"
-
-    def create_connection(self) -> Connection | None:
-        try:
-            conn = sqlite3.connect(self.db_file)
-            return conn
-        except sqlite3.Error as e:
-            print(e)
-            return None
+    db: Database = field(default_factory=ConnectionPool)
 
     def create(self, unit: Unit) -> Unit:
         try:
-            conn = self.create_connection()
-            if conn is None:
-                raise sqlite3.Error
-            cursor = conn.cursor()
-            select = """
-                SELECT * from units WHERE name =?
-            """
-            cursor.execute(select, (unit.name,))
-            u = cursor.fetchone()
-            print(u)
-            if u:
-                raise KeyError
+            with self.db.transaction() as cursor:
+                insert_unit_sql = """
+                    INSERT INTO units (uuid, name) VALUES (?, ?)
+                """
+                cursor.execute(insert_unit_sql, (str(unit.id), unit.name))
 
-            insert_unit_sql = """
-                INSERT INTO units (uuid, name) VALUES (?, ?)
-            """
-            cursor.execute(insert_unit_sql, (str(unit.id), unit.name))
-            conn.commit()
-
-            print("Unit created successfully.")
+            logger.debug("Unit created", extra={"unit_id": str(unit.id)})
             return unit
-        except KeyError:
+        except sqlite3.IntegrityError:
             raise ExistsError(unit)
         except sqlite3.Error as e:
-            print(e)
+            logger.error("Database error", extra={"error": str(e)})
             raise e
-        finally:
-            if conn:
-                conn.close()
 
     def get(self, unit_id: UUID) -> Unit:
         try:
-            conn = self.create_connection()
-            if conn is None:
-                raise sqlite3.Error
-            cursor = conn.cursor()
-
-            select_unit_sql = """
-                SELECT uuid, name FROM units WHERE uuid = ?
-            """
+            with self.db.transaction() as cursor:
+                select_unit_sql = """
+                    SELECT uuid, name FROM units WHERE uuid = ?
+                """
 
-            cursor.execute(select_unit_sql, (str(unit_id),))
-            unit_data = cursor.fetchone()
+                cursor.execute(select_unit_sql, (str(unit_id),))
+                unit_data = cursor.fetchone()
 
             if unit_data:
                 return Unit(unit_data[1], unit_data[0])
             else:
                 raise DoesNotExistError(unit_id)
         except sqlite3.Error as e:
-            print(e)
+            logger.error("Database error", extra={"error": str(e)})
             raise e
-        finally:
-            if conn:
-                conn.close()
 
     def get_all(self) -> list[Unit]:
-        try:
-            conn = self.create_connection()
-            if conn is None:
-                raise sqlite3.Error
-            cursor = conn.cursor()
+        return self.get_page(None, None)
 
-            select_all_units_sql = """
-                SELECT uuid, name FROM units
-            """
+    def get_page(self, after: UUID | None, limit: int | None) -> list[Unit]:
+        try:
+            with self.db.transaction() as cursor:
+                select_units_sql = """
+                    SELECT uuid, name FROM units WHERE uuid > ? ORDER BY uuid LIMIT ?
+                """
 
-            cursor.execute(select_all_units_sql)
-            units_data = cursor.fetchall()
+                cursor.execute(
+                    select_units_sql, (str(after or ""), -1 if limit is None else limit)
+                )
+                units_data = cursor.fetchall()
 
             units = []
             for unit_data in units_data:
                 units.append(Unit(unit_data[1], UUID(unit_data[0])))
             return units
         except sqlite3.Error as e:
-            print(e)
+            logger.error("Database error", extra={"error": str(e)})
             raise e
-        finally:
-            if conn:
-                conn.close()
 
     def delete_unit_by_name(self, name: str) -> None:
         try:
-            conn = self.create_connection()
-            if conn is None:
-                raise sqlite3.Error
-            cursor = conn.cursor()
-
-            cursor.execute("DELETE FROM units WHERE name = ?", (name,))
-            conn.commit()
-            print(f"Unit deleted successfully: {name}")
+            with self.db.transaction() as cursor:
+                cursor.execute("DELETE FROM units WHERE name = ?", (name,))
+            logger.debug("Unit deleted", extra={"unit_name": name})
         except sqlite3.Error as e:
-            print(e)
+            logger.error("Database error", extra={"error": str(e)})
             raise e
-        finally:
-            if conn:
-                conn.close()
@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import sqlite3
+import threading
+from concurrent.futures import Future
+from contextlib import contextmanager
+from contextvars import copy_context
+from dataclasses import dataclass, field
+from functools import partial
+from queue import Empty, SimpleQueue
+from sqlite3 import Connection, Cursor
+from typing import Any, Callable, Iterator, TypeVar
+
+from pos_system.infra.repository.connection import ConnectionPool, transaction
+from pos_system.infra.tracing import traced
+
+T = TypeVar("T")
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Command:
+    call: Callable[[], Any]
+    future: Future[Any] = field(default_factory=Future)
+
+
+@dataclass
+class Writer:
+    """One thread and connection running queued writes in shared transactions."""
+
+    pool: ConnectionPool
+    max_batch: int = 64
+    max_pending: int = 1024
+    batches: int = 0
+    commands: int = 0
+
+    _queue: SimpleQueue[Command | None] = field(init=False, repr=False)
+    _slots: asyncio.Semaphore = field(init=False, repr=False)
+    _conn: Connection = field(init=False, repr=False)
+    _callbacks: list[Callable[[], None]] = field(init=False, repr=False)
+    _thread: threading.Thread = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self._queue = SimpleQueue()
+        self._slots = asyncio.Semaphore(self.max_pending)
+        self._conn = self.pool.connect()
+        self._callbacks = []
+        self._thread = threading.Thread(
+            target=self._run, name="pos-writer", daemon=True
+        )
+        self._thread.start()
+
+    async def run(self, function: Callable[..., T], *args: Any) -> T:
+        call = partial(copy_context().run, traced, partial(function, *args))
+        async with self._slots:
+            command = Command(call)
+            self._queue.put(command)
+            result: T = await asyncio.wrap_future(command.future)
+            return result
+
+    @contextmanager
+    def transaction(self) -> Iterator[Cursor]:
+        with transaction(self._conn) as cursor:
+            yield cursor
+
+    def on_commit(self, callback: Callable[[], None]) -> None:
+        self._callbacks.append(callback)
+
+    def shutdown(self) -> None:
+        self._queue.put(None)
+        self._thread.join()
+        self._conn.close()
+
+    def _run(self) -> None:
+        while (batch := self._take()) is not None:
+            self._execute(batch)
+
+    def _take(self) -> list[Command] | None:
+        first = self._queue.get()
+        if first is None:
+            return None
+        batch = [first]
+        while len(batch) < self.max_batch:
+            try:
+                command = self._queue.get_nowait()
+            except Empty:
+                break
+            if command is None:
+                self._queue.put(None)
+                break
+            batch.append(command)
+        return batch
+
+    def _execute(self, batch: list[Command]) -> None:
+        outcomes: list[tuple[Any, BaseException | None]] = []
+        callbacks: list[Callable[[], None]] = []
+        try:
+            self._conn.execute("BEGIN IMMEDIATE")
+            for command in batch:
+                if not command.future.set_running_or_notify_cancel():
+                    outcomes.append((None, None))
+                    continue
+                # Repository calls open a savepoint, as the transaction is open.
+                self._callbacks = []
+                try:
+                    outcomes.append((command.call(), None))
+                except Exception as e:
+                    outcomes.append((None, e))
+                else:
+                    callbacks.extend(self._callbacks)
+            self._conn.commit()
+        except sqlite3.Error as e:
+            logger.error("Write batch failed", extra={"error": str(e)})
+            if self._conn.in_transaction:
+                self._conn.rollback()
+            self._callbacks.clear()
+            for command in batch:
+                if not command.future.cancelled():
+                    command.future.set_exception(e)
+            return
+
+        self.batches += 1
+        self.commands += len(batch)
+        self._callbacks = []
+        for callback in callbacks:
+            callback()
+        for command, (result, error) in zip(batch, outcomes):
+            if command.future.cancelled():
+                continue
+            if error is None:
+                command.future.set_result(result)
+            else:
+                command.future.set_exception(error)
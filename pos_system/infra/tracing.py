@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import json
+import logging
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from time import perf_counter
+from typing import Callable, TypeVar
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+T = TypeVar("T")
+
+TRACE_HEADER = "x-query-trace"
+MAX_HEADER_STATEMENTS = 50
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class QueryTrace:
+    """SQL statements run for one request and the time spent running them."""
+
+    statements: list[str] = field(default_factory=list)
+    call_seconds: float = 0.0
+
+    def to_header(self) -> str:
+        return json.dumps(
+            {
+                "count": len(self.statements),
+                "call_ms": round(self.call_seconds * 1e3, 3),
+                "statements": [
+                    " ".join(statement.split())
+                    for statement in self.statements[:MAX_HEADER_STATEMENTS]
+                ],
+            }
+        )
+
+
+current_trace: ContextVar[QueryTrace | None] = ContextVar("current_trace", default=None)
+
+
+def record_statement(statement: str) -> None:
+    """sqlite3 trace callback: attribute a statement to the current request."""
+    trace = current_trace.get()
+    if trace is not None:
+        trace.statements.append(statement)
+
+
+def traced(call: Callable[[], T]) -> T:
+    """Run a database call, adding its duration to the current request's trace."""
+    trace = current_trace.get()
+    if trace is None:
+        return call()
+    start = perf_counter()
+    try:
+        return call()
+    finally:
+        trace.call_seconds += perf_counter() - start
+
+
+@dataclass
+class QueryTraceMiddleware:
+    """Reports each request's statements and logs those over budget."""
+
+    app: ASGIApp
+    budget: int | None = None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        trace = QueryTrace()
+
+        async def send_with_trace(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (TRACE_HEADER.encode(), trace.to_header().encode()),
+                ]
+            await send(message)
+
+        token = current_trace.set(trace)
+        try:
+            await self.app(scope, receive, send_with_trace)
+        finally:
+            current_trace.reset(token)
+            self.check_budget(scope, trace)
+
+    def check_budget(self, scope: Scope, trace: QueryTrace) -> None:
+        if self.budget is not None and len(trace.statements) > self.budget:
+            logger.warning(
+                "Query budget exceeded",
+                extra={
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "statements": len(trace.statements),
+                    "budget": self.budget,
+                },
+            )
@@ -1,13 +1,110 @@
 from __future__ import annotations
 
+import atexit
+import os
+from dataclasses import replace
+from typing import Annotated, Any
+
 import uvicorn
-from typer import Typer
+from fastapi import FastAPI
+from typer import BadParameter, Option, Typer
 
-from pos_system.runner.setup import init_app
+from pos_system.infra.log import configure_logging, parse_sample_rates
+from pos_system.runner.settings import Backend, Settings
+from pos_system.runner.setup import bootstrap, init_app
 
 cli = Typer(no_args_is_help=True, add_completion=False)
 
 
 @cli.command()
-def run(host: str = "0.0.0.0", port: int = 8000) -> None:
-    uvicorn.run(host=host, port=port, app=init_app())
+def run(
+    host: str = "0.0.0.0",
+    port: int = 8000,
+    database: Annotated[
+        str | None, Option(help="File path, or memory:<name> for in-memory.")
+    ] = None,
+    pool_size: int | None = None,
+    log_level: str = "INFO",
+    log_sample: Annotated[
+        list[str], Option(help="Keep a fraction of a logger's records: name=rate.")
+    ] = [],
+    trace_sql: bool | None = None,
+    query_budget: Annotated[
+        int | None, Option(help="Log traced requests running more statements.")
+    ] = None,
+    backend: Annotated[
+        Backend | None, Option(help="sqlite, or memory for dicts plus snapshots.")
+    ] = None,
+    snapshot: Annotated[
+        str | None, Option(help="Memory backend snapshot file, restored on start.")
+    ] = None,
+    snapshot_interval: float | None = None,
+    journal: Annotated[
+        str | None, Option(help="Journal receipt writes to this file first.")
+    ] = None,
+    writer: Annotated[
+        bool | None, Option(help="Send all writes to a single batching writer.")
+    ] = None,
+    workers: Annotated[
+        int, Option(help="Worker processes, each with its own connections.")
+    ] = 1,
+) -> None:
+    """Serve the API. Options override the POS_* environment variables."""
+    overrides: dict[str, Any] = {
+        "database": database,
+        "pool_size": pool_size,
+        "trace_sql": trace_sql,
+        "query_budget": query_budget,
+        "backend": backend,
+        "snapshot": snapshot,
+        "snapshot_interval": snapshot_interval,
+        "journal": journal,
+        "writer": writer,
+    }
+    settings = replace(
+        Settings.from_env(),
+        **{name: value for name, value in overrides.items() if value is not None},
+    )
+    listener = configure_logging(log_level, parse_sample_rates(log_sample))
+    try:
+        if workers == 1:
+            uvicorn.run(host=host, port=port, app=init_app(settings))
+            return
+
+        check_shareable(settings)
+        bootstrap(settings)
+        # A worker's cache would miss price updates made by the others.
+        settings = replace(settings, cache_products=False)
+        # Workers are spawned, not forked: they rebuild settings and logging
+        # from the environment in worker_app.
+        os.environ.update(settings.to_env())
+        os.environ["POS_LOG_LEVEL"] = log_level
+        os.environ["POS_LOG_SAMPLE"] = ",".join(log_sample)
+        uvicorn.run(
+            "pos_system.runner.cli:worker_app",
+            factory=True,
+            host=host,
+            port=port,
+            workers=workers,
+        )
+    finally:
+        listener.stop()
+
+
+def check_shareable(settings: Settings) -> None:
+    """Worker processes share only what is on disk and locked by SQLite."""
+    if settings.backend == "memory" or settings.database.startswith("memory:"):
+        raise BadParameter("In-memory state cannot be shared by workers.")
+    if settings.journal is not None:
+        raise BadParameter("The receipt journal supports one process.")
+
+
+def worker_app() -> FastAPI:
+    """App factory run by each uvicorn worker process."""
+    sample = os.environ.get("POS_LOG_SAMPLE", "")
+    listener = configure_logging(
+        os.environ.get("POS_LOG_LEVEL", "INFO"),
+        parse_sample_rates([option for option in sample.split(",") if option]),
+    )
+    atexit.register(listener.stop)
+    return init_app()
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass
+from typing import Literal, Mapping, cast, get_args
+
+from pos_system.infra.repository.connection import DEFAULT_DB_FILE
+
+Backend = Literal["sqlite", "memory"]
+
+
+@dataclass(frozen=True)
+class Settings:
+    """Deployment settings, read from POS_* environment variables.
+
+    database is a file path (point it at /dev/shm for tmpfs) or memory:<name>
+    for a named in-memory database shared by the whole process. The memory
+    backend skips SQLite altogether and keeps its state in Python dicts,
+    saved to the snapshot file every snapshot_interval seconds and on shutdown.
+    With journal set, the SQLite backend appends receipt writes to that file
+    and applies them to the database in the background. With writer set, one
+    thread and connection run all writes, batching concurrent ones into a
+    transaction. cache_products keeps recently read products in process
+    memory; turn it off when several processes write the same database.
+    """
+
+    database: str = DEFAULT_DB_FILE
+    pool_size: int = 8
+    trace_sql: bool = False
+    query_budget: int | None = None
+    backend: Backend = "sqlite"
+    snapshot: str | None = None
+    snapshot_interval: float = 30.0
+    journal: str | None = None
+    writer: bool = False
+    cache_products: bool = True
+
+    @classmethod
+    def from_env(cls, environ: Mapping[str, str] = os.environ) -> Settings:
+        budget = environ.get("POS_QUERY_BUDGET")
+        backend = environ.get("POS_BACKEND", cls.backend)
+        if backend not in get_args(Backend):
+            raise ValueError(f"Unknown backend {backend!r}.")
+        return cls(
+            database=environ.get("POS_DATABASE", cls.database),
+            pool_size=int(environ.get("POS_POOL_SIZE", cls.pool_size)),
+            trace_sql=environ.get("POS_TRACE_SQL", "").lower() in ("1", "true"),
+            query_budget=int(budget) if budget else None,
+            backend=cast(Backend, backend),
+            snapshot=environ.get("POS_SNAPSHOT") or None,
+            snapshot_interval=float(
+                environ.get("POS_SNAPSHOT_INTERVAL", cls.snapshot_interval)
+            ),
+            journal=environ.get("POS_JOURNAL") or None,
+            writer=environ.get("POS_WRITER", "").lower() in ("1", "true"),
+            cache_products=environ.get("POS_CACHE_PRODUCTS", "true").lower()
+            in ("1", "true"),
+        )
+
+    def to_env(self) -> dict[str, str]:
+        """The POS_* variables that from_env reads back as these settings."""
+        budget = self.query_budget
+        return {
+            "POS_DATABASE": self.database,
+            "POS_POOL_SIZE": str(self.pool_size),
+            "POS_TRACE_SQL": str(self.trace_sql).lower(),
+            "POS_QUERY_BUDGET": "" if budget is None else str(budget),
+            "POS_BACKEND": self.backend,
+            "POS_SNAPSHOT": self.snapshot or "",
+            "POS_SNAPSHOT_INTERVAL": str(self.snapshot_interval),
+            "POS_JOURNAL": self.journal or "",
+            "POS_WRITER": str(self.writer).lower(),
+            "POS_CACHE_PRODUCTS": str(self.cache_products).lower(),
+        }
@@ -1,21 +1,158 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import AsyncIterator
+
 from fastapi import FastAPI
 
-from pos_system.infra.fastapi import product_api, receipt_api, report_api, unit_api
-from pos_system.infra.repository import ReceiptsDB, UnitsDB
-from pos_system.infra.repository.products import ProductsDB
-from pos_system.infra.repository.report import ReportDB
+from pos_system.infra.fastapi import (
+    metrics_api,
+    product_api,
+    receipt_api,
+    report_api,
+    unit_api,
+)
+from pos_system.infra.metrics import MetricsMiddleware
+from pos_system.infra.repository import ConnectionPool, ProductsDB, UnitsDB
+from pos_system.infra.repository.analytics import SalesAnalyticsDB
+from pos_system.infra.repository.cache import ProductCache, UnitCache
+from pos_system.infra.repository.executor import Executor
+from pos_system.infra.repository.journal import ReceiptJournal
+from pos_system.infra.repository.memory import (
+    MemorySalesAnalytics,
+    MemoryStore,
+    Snapshotter,
+)
+from pos_system.infra.repository.migrations import migrate
+from pos_system.infra.repository.writer import Writer
+from pos_system.infra.tracing import QueryTraceMiddleware, record_statement
+from pos_system.runner.settings import Settings
+
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    if isinstance(app.state.db, ConnectionPool):
+        # Nothing is served yet, so blocking the event loop costs nothing.
+        warm_up(app)
+    snapshots = app.state.snapshots
+    if snapshots is not None:
+        snapshots.start()
+    yield
+    app.state.executor.shutdown()
+    app.state.analytics_executor.shutdown()
+    if app.state.writer is not None:
+        app.state.writer.shutdown()
+    if snapshots is not None:
+        snapshots.stop()
+    if app.state.journal is not None:
+        app.state.journal.close()
+    if isinstance(app.state.db, ConnectionPool):
+        tidy(app.state.db)
+        app.state.db.close()
 
 
-def init_app() -> FastAPI:
-    app = FastAPI()
+def init_app(
+    settings: Settings | None = None, executor: Executor | None = None
+) -> FastAPI:
+    settings = settings or Settings.from_env()
+    app = FastAPI(lifespan=lifespan)
     app.include_router(unit_api)
     app.include_router(product_api)
     app.include_router(report_api)
     app.include_router(receipt_api)
+    app.include_router(metrics_api)
+    app.add_middleware(MetricsMiddleware)
+    if settings.trace_sql:
+        app.add_middleware(QueryTraceMiddleware, budget=settings.query_budget)
 
-    app.state.units = UnitsDB()
-    app.state.products = ProductsDB()
-    app.state.report = ReportDB()
-    app.state.receipts = ReceiptsDB()
-
+    app.state.snapshots = app.state.journal = app.state.writer = None
+    if settings.backend == "memory":
+        init_memory_backend(app, settings)
+    else:
+        init_sqlite_backend(app, settings, executor)
     return app
+
+
+def bootstrap(settings: Settings) -> None:
+    """Create or migrate the schema, e.g. once before starting workers."""
+    pool = ConnectionPool(settings.database, size=1)
+    try:
+        with pool.acquire() as conn:
+            migrate(conn)
+    finally:
+        pool.close()
+
+
+def warm_up(app: FastAPI) -> None:
+    """Migrate, replay the journal, open the pool's connections and load the
+    catalog and units into their caches, so first requests find them warm.
+    """
+    db: ConnectionPool = app.state.db
+    with db.acquire() as conn:
+        migrate(conn)
+    if app.state.journal is not None:
+        app.state.journal.open()
+    db.fill()
+    products = app.state.product_cache
+    if products is not None:
+        for product in ProductsDB(db).get_page(None, products.capacity):
+            products.put(product)
+    for unit in UnitsDB(db).get_page(None, app.state.unit_cache.capacity):
+        app.state.unit_cache.put(unit)
+    logger.info(
+        "Caches warmed",
+        extra={
+            "products": 0 if products is None else len(products),
+            "units": len(app.state.unit_cache),
+        },
+    )
+
+
+def tidy(db: ConnectionPool) -> None:
+    """Refresh the query planner's statistics and fold the WAL into the
+    database file, so the next start does not replay it.
+    """
+    with db.acquire() as conn:
+        conn.execute("PRAGMA optimize")
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+
+def init_sqlite_backend(
+    app: FastAPI, settings: Settings, executor: Executor | None
+) -> None:
+    app.state.db = ConnectionPool(
+        settings.database,
+        settings.pool_size,
+        on_statement=record_statement if settings.trace_sql else None,
+    )
+    if settings.journal is not None and settings.writer:
+        raise ValueError("The receipt journal and the writer are exclusive.")
+    if settings.journal is not None:
+        app.state.journal = ReceiptJournal(Path(settings.journal), app.state.db)
+    if settings.writer:
+        app.state.writer = Writer(app.state.db)
+    app.state.executor = executor or Executor(max_workers=app.state.db.size)
+    app.state.write_lock = asyncio.Lock()
+    app.state.product_cache = ProductCache() if settings.cache_products else None
+    app.state.unit_cache = UnitCache()
+    app.state.analytics = SalesAnalyticsDB(settings.database)
+    # Worker processes cannot see an in-memory database.
+    app.state.analytics_executor = Executor(
+        max_workers=2, processes=not app.state.db.in_memory
+    )
+
+
+def init_memory_backend(app: FastAPI, settings: Settings) -> None:
+    if settings.snapshot is None:
+        store = MemoryStore()
+    else:
+        store = MemoryStore.restore(Path(settings.snapshot))
+        app.state.snapshots = Snapshotter(
+            store, Path(settings.snapshot), settings.snapshot_interval
+        )
+    app.state.db = store
+    app.state.executor = app.state.analytics_executor = Executor(inline=True)
+    app.state.analytics = MemorySalesAnalytics(store)
@@ -0,0 +1,50 @@
+import shutil
+import sqlite3
+from contextlib import closing
+from dataclasses import replace
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+from fastapi.testclient import TestClient
+
+from pos_system.infra.repository import ConnectionPool
+from pos_system.runner.settings import Settings
+from pos_system.runner.setup import init_app
+
+FIXTURE_DB = Path(__file__).resolve().parents[1] / "pos_db.db"
+
+
+@pytest.fixture(scope="session")
+def settings(tmp_path_factory: pytest.TempPathFactory) -> Iterator[Settings]:
+    """The suite runs on a copy of the fixture DB, in a temporary file or, with
+    POS_DATABASE=memory:<name>, in a named in-memory database.
+    """
+    copy = tmp_path_factory.mktemp("db") / FIXTURE_DB.name
+    shutil.copyfile(FIXTURE_DB, copy)
+    with closing(sqlite3.connect(copy)) as conn:
+        # A WAL header, left by any pool that opened the file, breaks memdb.
+        conn.execute("PRAGMA journal_mode = DELETE")
+
+    settings = Settings.from_env()
+    if Path(settings.database) == FIXTURE_DB:
+        settings = replace(settings, database=str(copy))
+    pool = ConnectionPool(settings.database)
+    if pool.in_memory:
+        with closing(sqlite3.connect(copy)) as source, pool.acquire() as conn:
+            source.backup(conn)
+    yield settings
+    pool.close()
+
+
+@pytest.fixture
+def db(settings: Settings) -> Iterator[ConnectionPool]:
+    pool = ConnectionPool(settings.database)
+    yield pool
+    pool.close()
+
+
+@pytest.fixture
+def client(settings: Settings) -> Iterator[TestClient]:
+    with TestClient(init_app(settings)) as client:
+        yield client
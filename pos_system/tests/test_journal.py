@@ -0,0 +1,158 @@
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from uuid import uuid4
+
+import pytest
+from fastapi.testclient import TestClient
+
+from pos_system.infra.repository import ConnectionPool, ProductsDB
+from pos_system.infra.repository.journal import JournaledReceiptsDB, ReceiptJournal
+from pos_system.infra.repository.migrations import migrate
+from pos_system.infra.repository.receipt import ReceiptEvent, ReceiptsDB
+from pos_system.runner.settings import Settings
+from pos_system.runner.setup import init_app
+
+
+def journal_on(tmp_path: Path) -> ReceiptJournal:
+    db = ConnectionPool(str(tmp_path / "pos.db"))
+    with db.acquire() as conn:
+        migrate(conn)
+    return ReceiptJournal(tmp_path / "receipts.journal", db)
+
+
+def test_journaled_receipts_behave_like_direct_writes(tmp_path: Path) -> None:
+    settings = Settings(
+        str(tmp_path / "pos.db"), journal=str(tmp_path / "receipts.journal")
+    )
+
+    with TestClient(init_app(settings)) as client:
+        unit = client.post("/units", json={"name": "kg"}).json()["unit"]
+        product = {"unit_id": unit["id"], "name": "a", "barcode": "1", "price": 3}
+        product_id = client.post("/products", json=product).json()["product"]["id"]
+        receipt_id = client.post("/receipts").json()["receipt"]["id"]
+        line = {"id": product_id, "quantity": 2}
+
+        response = client.post(f"/receipts/{receipt_id}/products", json=line)
+        unknown = client.post(f"/receipts/{uuid4()}/products", json=line)
+        client.patch(f"/receipts/{receipt_id}", json={"status": "closed"})
+        added = client.post(f"/receipts/{receipt_id}/products", json=line)
+        closed = client.delete(f"/receipts/{receipt_id}")
+
+    assert response.json()["receipt"]["total"] == 6
+    assert unknown.status_code == 404
+    assert added.status_code == 403
+    assert closed.status_code == 403
+    assert (tmp_path / "receipts.journal").stat().st_size == 0
+    with TestClient(init_app(Settings(str(tmp_path / "pos.db")))) as client:
+        assert client.get("/sales").json()["sales"] == {"n_receipts": 1, "revenue": 6}
+
+
+def test_unapplied_events_are_replayed_once(tmp_path: Path) -> None:
+    receipt_id = str(uuid4())
+    events = [
+        ReceiptEvent("create", receipt_id, seq=1),
+        ReceiptEvent("add", receipt_id, lines=[(str(uuid4()), 2, 1.5)], seq=2),
+        ReceiptEvent("close", receipt_id, seq=3),
+    ]
+    lines = "".join(f"{event.to_json()}\n" for event in events)
+    (tmp_path / "receipts.journal").write_text(lines + '[4,"crea')
+
+    journal = journal_on(tmp_path)
+    assert journal.open() == 3
+    journal.close()
+    assert journal.open() == 0
+    journal.close()
+
+    with journal.db.transaction() as cursor:
+        cursor.execute("SELECT status, total FROM receipts WHERE id = ?", (receipt_id,))
+        assert cursor.fetchone() == ("closed", 3)
+        cursor.execute("SELECT seq FROM journal_applied")
+        assert cursor.fetchone() == (3,)
+
+
+def test_concurrent_appends_share_flushes(tmp_path: Path) -> None:
+    journal = journal_on(tmp_path)
+    journal.open()
+
+    with ThreadPoolExecutor(16) as pool:
+        for _ in range(200):
+            pool.submit(journal.append, ReceiptEvent("create", str(uuid4())))
+    journal.barrier()
+    journal.close()
+
+    with journal.db.transaction() as cursor:
+        assert cursor.execute("SELECT COUNT(*) FROM receipts").fetchone() == (200,)
+    assert journal.flushes < 200
+
+
+def test_close_waits_for_an_add_in_flight(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    journal = journal_on(tmp_path)
+    journal.open()
+    unit_id, product_id = uuid4(), uuid4()
+    with journal.db.transaction() as cursor:
+        cursor.execute("INSERT INTO units VALUES (?, 'kg')", (str(unit_id),))
+        cursor.execute(
+            "INSERT INTO products VALUES (?, ?, 'a', '1', 2.0)",
+            (str(product_id), str(unit_id)),
+        )
+    receipts = JournaledReceiptsDB(
+        journal, ReceiptsDB(journal.db), ProductsDB(journal.db)
+    )
+    receipt_id = receipts.create().id
+
+    checked, resume = threading.Event(), threading.Event()
+    append = journal.append
+
+    def paused(event: ReceiptEvent) -> None:
+        if event.op == "add":
+            checked.set()
+            resume.wait()
+        append(event)
+
+    monkeypatch.setattr(journal, "append", paused)
+    adding = threading.Thread(
+        target=receipts.add_product, args=(receipt_id, product_id, 3)
+    )
+    closing = threading.Thread(target=receipts.close, args=(receipt_id,))
+    adding.start()
+    checked.wait()
+    closing.start()
+    closing.join(0.1)
+    waited = closing.is_alive()
+    resume.set()
+    adding.join()
+    closing.join()
+
+    receipt = receipts.get(receipt_id)
+    journal.close()
+    assert waited
+    assert receipt.status == "closed"
+    assert receipt.total == 6
+
+
+def test_failed_applies_wake_waiters_and_keep_the_journal(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    journal = journal_on(tmp_path)
+    journal.max_retries, journal.retry_delay = 1, 0.0
+    journal.open()
+
+    def failing(batch: list[ReceiptEvent]) -> None:
+        raise sqlite3.OperationalError("disk I/O error")
+
+    monkeypatch.setattr(journal, "_apply", failing)
+    journal.append(ReceiptEvent("create", str(uuid4())))
+    with pytest.raises(sqlite3.OperationalError):
+        journal.barrier()
+    with pytest.raises(sqlite3.OperationalError):
+        journal.append(ReceiptEvent("create", str(uuid4())))
+    journal.close()
+    monkeypatch.undo()
+
+    assert (tmp_path / "receipts.journal").stat().st_size > 0
+    assert journal.open() == 1
+    journal.close()
@@ -0,0 +1,45 @@
+import io
+import json
+import logging
+
+from pos_system.infra.log import (
+    SamplingFilter,
+    configure_logging,
+    parse_sample_rates,
+)
+
+
+def record(name: str, level: int = logging.DEBUG) -> logging.LogRecord:
+    return logging.LogRecord(name, level, __file__, 0, "message", None, None)
+
+
+def test_should_sample_by_longest_logger_prefix() -> None:
+    rates = parse_sample_rates(["pos_system=1", "pos_system.infra.repository=0.1"])
+    sampler = SamplingFilter(rates, draw=lambda: 0.5)
+
+    assert sampler.filter(record("pos_system.infra.fastapi"))
+    assert not sampler.filter(record("pos_system.infra.repository.products"))
+    assert sampler.filter(record("pos_system.infra.repository.products", 30))
+
+
+def test_should_write_json_lines_off_the_calling_thread() -> None:
+    stream = io.StringIO()
+    listener = configure_logging("DEBUG", {"pos_system.quiet": 0}, stream)
+    try:
+        logger = logging.getLogger("pos_system.infra.repository.units")
+        logger.debug("Unit created", extra={"unit_id": "kg"})
+        logging.getLogger("pos_system.quiet").info("dropped")
+    finally:
+        listener.stop()
+        root = logging.getLogger("pos_system")
+        root.handlers, root.propagate = [], True
+        root.setLevel(logging.NOTSET)
+
+    (line,) = stream.getvalue().splitlines()
+    assert json.loads(line) | {"time": None} == {
+        "time": None,
+        "level": "DEBUG",
+        "logger": "pos_system.infra.repository.units",
+        "message": "Unit created",
+        "unit_id": "kg",
+    }
@@ -0,0 +1,92 @@
+from pathlib import Path
+from uuid import uuid4
+
+import pytest
+from fastapi.testclient import TestClient
+
+from pos_system.core.errors import (
+    DoesNotExistError,
+    ExistsError,
+    ParameterDoesNotExistError,
+    ReceiptAlreadyClosedError,
+)
+from pos_system.core.products import Product
+from pos_system.core.units import Unit
+from pos_system.infra.repository import (
+    MemoryProductsDB,
+    MemoryReceiptsDB,
+    MemoryStore,
+    MemoryUnitsDB,
+)
+from pos_system.runner.settings import Settings
+from pos_system.runner.setup import init_app
+
+
+def test_memory_repositories_keep_the_error_contracts() -> None:
+    store = MemoryStore()
+    units, products, receipts = (
+        MemoryUnitsDB(store),
+        MemoryProductsDB(store),
+        MemoryReceiptsDB(store),
+    )
+    unit = units.create(Unit("kg"))
+    product = products.create(Product(unit.id, "apple", "001", 2.5))
+
+    with pytest.raises(ExistsError):
+        units.create(Unit("kg"))
+    with pytest.raises(ExistsError):
+        products.create(Product(unit.id, "pear", "001", 1))
+    with pytest.raises(ParameterDoesNotExistError):
+        products.create(Product(uuid4(), "pear", "002", 1))
+    with pytest.raises(DoesNotExistError):
+        products.get_by_barcode("002")
+
+    receipt = receipts.create()
+    with pytest.raises(ParameterDoesNotExistError):
+        receipts.add_product(receipt.id, uuid4(), 1)
+    with pytest.raises(DoesNotExistError):
+        receipts.add_product(uuid4(), product.id, 1)
+
+    receipts.add_product(receipt.id, product.id, 2)
+    products.update_price(product.id, 10)
+    receipts.add_product(receipt.id, product.id, 1)
+    receipts.close(receipt.id)
+    receipts.close(receipt.id)
+
+    assert receipts.get(receipt.id).total == 7.5
+    assert (store.report.n_receipts, store.report.revenue) == (1, 7.5)
+    with pytest.raises(ReceiptAlreadyClosedError):
+        receipts.delete(receipt.id)
+
+
+def test_memory_pages_follow_id_order() -> None:
+    units = MemoryUnitsDB(MemoryStore())
+    ids = sorted(str(units.create(Unit(f"u{i}")).id) for i in range(5))
+
+    first = units.get_page(None, 2)
+    rest = units.get_page(first[-1].id, None)
+
+    assert [str(unit.id) for unit in first + rest] == ids
+
+
+def test_memory_backend_restores_its_snapshot(tmp_path: Path) -> None:
+    settings = Settings(backend="memory", snapshot=str(tmp_path / "pos.json"))
+
+    with TestClient(init_app(settings)) as client:
+        unit = client.post("/units", json={"name": "kg"}).json()["unit"]
+        product = {"unit_id": unit["id"], "name": "a", "barcode": "1", "price": 3}
+        product_id = client.post("/products", json=product).json()["product"]["id"]
+        receipt_id = client.post("/receipts").json()["receipt"]["id"]
+        line = {"id": product_id, "quantity": 2}
+        client.post(f"/receipts/{receipt_id}/products", json=line)
+        client.patch(f"/receipts/{receipt_id}", json={"status": "closed"})
+        added = client.post(f"/receipts/{receipt_id}/products", json=line)
+        receipt = client.get(f"/receipts/{receipt_id}").json()
+        sales = client.get("/sales").json()
+
+    assert added.status_code == 403
+    with TestClient(init_app(settings)) as client:
+        assert client.get(f"/receipts/{receipt_id}").json() == receipt
+        assert client.get("/sales").json() == sales
+        assert sales == {"sales": {"n_receipts": 1, "revenue": 6}}
+        assert client.get("/sales/units").json()["units"][0]["revenue"] == 6
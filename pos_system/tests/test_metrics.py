@@ -0,0 +1,36 @@
+from fastapi.testclient import TestClient
+
+from pos_system.infra.metrics import Histogram
+
+
+def test_should_render_cumulative_prometheus_buckets() -> None:
+    histogram = Histogram("latency_seconds", "Latency.", ("route",), (0.1, 1.0))
+    for seconds in (0.05, 0.1, 0.5, 2.0):
+        histogram.observe(("/units",), seconds)
+
+    assert list(histogram.render()) == [
+        "# HELP latency_seconds Latency.",
+        "# TYPE latency_seconds histogram",
+        'latency_seconds_bucket{route="/units",le="0.1"} 2',
+        'latency_seconds_bucket{route="/units",le="1.0"} 3',
+        'latency_seconds_bucket{route="/units",le="+Inf"} 4',
+        'latency_seconds_sum{route="/units"} 2.65',
+        'latency_seconds_count{route="/units"} 4',
+    ]
+
+
+def test_should_expose_route_and_repository_latency(client: TestClient) -> None:
+    unit_id = "a22c734a-d034-4527-81df-c29b42dfd2f9"
+    client.get(f"/units/{unit_id}")
+    client.get("/units")
+    client.get("/no-such-route")
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    body = response.text
+    assert 'method="GET",route="/units/{unit_id}",status="200"' in body
+    assert 'method="GET",route="unmatched",status="404"' in body
+    assert 'repository="UnitsDB",method="get_page"' in body
+    assert f'route="/units/{unit_id}"' not in body
@@ -0,0 +1,43 @@
+import sqlite3
+from contextlib import closing
+from pathlib import Path
+
+import pytest
+
+from pos_system.infra.repository.migrations import MIGRATIONS, migrate
+
+
+def baseline(path: Path) -> sqlite3.Connection:
+    conn = sqlite3.connect(path, isolation_level=None)
+    for statement in MIGRATIONS[0]:
+        assert isinstance(statement, str)
+        conn.execute(statement)
+    conn.execute("PRAGMA user_version = 1")
+    conn.execute("INSERT INTO units VALUES ('u', 'kg')")
+    conn.execute("INSERT INTO products VALUES ('p', 'u', 'a', '1', 2.5)")
+    conn.execute("INSERT INTO receipts VALUES ('r', 'open', 12.5)")
+    return conn
+
+
+def test_upgrade_merges_repeated_receipt_lines(tmp_path: Path) -> None:
+    with closing(baseline(tmp_path / "pos.db")) as conn:
+        conn.executemany(
+            "INSERT INTO receipt_products VALUES ('r', 'p', ?)", [(2,), (3,)]
+        )
+
+        migrate(conn)
+
+        lines = conn.execute(
+            "SELECT quantity, price, total FROM receipt_products"
+        ).fetchall()
+        assert lines == [(5, 2.5, 12.5)]
+
+
+def test_upgrade_rejects_repeated_barcodes(tmp_path: Path) -> None:
+    with closing(baseline(tmp_path / "pos.db")) as conn:
+        conn.execute("INSERT INTO products VALUES ('q', 'u', 'b', '1', 3.0)")
+
+        with pytest.raises(ValueError, match="products.barcode"):
+            migrate(conn)
+
+        assert conn.execute("PRAGMA user_version").fetchone() == (1,)
@@ -1,17 +1,20 @@
 from dataclasses import dataclass
+from pathlib import Path
 from typing import Any
 from uuid import uuid4
 
-import pytest
 from fastapi.testclient import TestClient
 
-from pos_system.infra.repository import ProductsDB
-from pos_system.runner.setup import init_app
-
-
-@pytest.fixture
-def client() -> TestClient:
-    return TestClient(init_app())
+from pos_system.core.products import Product
+from pos_system.core.units import Unit
+from pos_system.infra.repository import (
+    CachedProductsDB,
+    ConnectionPool,
+    ProductCache,
+    ProductsDB,
+    UnitsDB,
+)
+from pos_system.infra.repository.migrations import migrate
 
 
 @dataclass
@@ -60,7 +63,9 @@ def test_get_all_products(client: TestClient) -> None:
     assert len(response.json()["products"]) == 2
 
 
-def test_create_and_update_product_price(client: TestClient) -> None:
+def test_create_and_update_product_price(
+    client: TestClient, db: ConnectionPool
+) -> None:
     product_data = Fake().product()
     invalid_unit_product = Fake().product_invalid_unit()
 
@@ -99,7 +104,7 @@ def test_create_and_update_product_price(client: TestClient) -> None:
     assert response.json()["product"]["name"] == "ball"
     assert response.json()["product"]["price"] == new_price
 
-    products_db = ProductsDB()
+    products_db = ProductsDB(db)
     products_db.delete_product_by_id(product_id)
 
 
@@ -112,3 +117,99 @@ def test_update_unknown_id(client: TestClient) -> None:
     assert response.json() == {
         "message": f"Product with id<{unknown_id}> does not exist."
     }
+
+
+def test_price_update_invalidates_cached_product(client: TestClient) -> None:
+    known_id = "28265140-c1a3-47c9-81a2-5fb05283ddc8"
+    old_price = client.get(f"/products/{known_id}").json()["product"]["price"]
+
+    client.patch(f"/products/{known_id}", json={"new_price": 1234.5})
+    response = client.get(f"/products/{known_id}")
+    client.patch(f"/products/{known_id}", json={"new_price": old_price})
+
+    assert response.json()["product"]["price"] == 1234.5
+
+
+def test_product_cache_evicts_least_recently_used() -> None:
+    cache = ProductCache(capacity=2)
+    a, b, c = (Product(uuid4(), name, name, 1.0) for name in "abc")
+
+    cache.put(a)
+    cache.put(b)
+    cache.get(a.id)
+    cache.put(c)
+
+    assert cache.get(b.id) is None
+    assert cache.get_by_barcode("a") is a
+    assert (cache.hits, cache.misses) == (2, 1)
+
+
+def test_reader_snapshot_does_not_recache_replaced_price(tmp_path: Path) -> None:
+    db = ConnectionPool(str(tmp_path / "pos.db"))
+    with db.acquire() as conn:
+        migrate(conn)
+    unit = UnitsDB(db).create(Unit("pc"))
+    product = ProductsDB(db).create(Product(unit.id, "a", "1", 1.0))
+    cache = ProductCache()
+
+    reader = db.begin()
+    catalog = CachedProductsDB(ProductsDB(reader), cache, reader)
+    with reader.transaction() as cursor:
+        cursor.execute("SELECT COUNT(*) FROM products")
+    with db.unit_of_work(immediate=True) as writer:
+        CachedProductsDB(ProductsDB(writer), cache, writer).update_price(
+            product.id, 99.0
+        )
+
+    assert catalog.get(product.id).price == 1.0
+    reader.commit()
+    assert cache.get(product.id) is None
+    assert CachedProductsDB(ProductsDB(db), cache, db).get(product.id).price == 99.0
+    db.close()
+
+
+def test_get_product_by_barcode(client: TestClient) -> None:
+    response = client.get("/products/by-barcode/010110")
+
+    assert response.status_code == 200
+    assert response.json()["product"]["id"] == "28265140-c1a3-47c9-81a2-5fb05283ddc8"
+
+    response = client.get("/products/by-barcode/unknown")
+
+    assert response.status_code == 404
+    assert response.json() == {
+        "message": "Product with barcode<unknown> does not exist."
+    }
+
+
+def test_import_products_in_batch(client: TestClient, db: ConnectionPool) -> None:
+    unit_id = "12c33cb8-9590-4a6e-9b59-5e3598d57e7c"
+    missing_unit_id = str(uuid4())
+    rows = [
+        {"unit_id": unit_id, "name": "a", "barcode": "batch-1", "price": 1},
+        {"unit_id": unit_id, "name": "b", "barcode": "010110", "price": 1},
+        {"unit_id": missing_unit_id, "name": "c", "barcode": "batch-2", "price": 1},
+        {"unit_id": unit_id, "name": "d", "barcode": "batch-1", "price": 1},
+        {"unit_id": unit_id, "name": "e", "barcode": "batch-3"},
+    ]
+
+    response = client.post("/products/batch", json=rows)
+
+    assert response.status_code == 201
+    assert response.json()["created"] == 1
+    rejected = response.json()["rejected"]
+    assert [row["index"] for row in rejected] == [1, 2, 3, 4]
+    assert rejected[0]["message"] == "Product with barcode<010110> already exist."
+    assert rejected[1]["message"] == f"Unit with id<{missing_unit_id}> does not exist."
+
+    response = client.post(
+        "/products/batch",
+        content=f"unit_id,name,barcode,price\n{unit_id},f,batch-4,2.5\n",
+        headers={"content-type": "text/csv"},
+    )
+
+    assert response.json() == {"created": 1, "rejected": []}
+
+    products_db = ProductsDB(db)
+    for barcode in ("batch-1", "batch-4"):
+        products_db.delete_product_by_id(str(products_db.get_by_barcode(barcode).id))
@@ -3,18 +3,22 @@ from uuid import UUID, uuid4
 import pytest
 from fastapi.testclient import TestClient
 
-from pos_system.infra.repository import ReceiptsDB
-from pos_system.runner.setup import init_app
+from pos_system.core.products import Product
+from pos_system.infra.repository import (
+    CachedProductsDB,
+    ConnectionPool,
+    ProductCache,
+    ProductsDB,
+    ReceiptsDB,
+)
+from pos_system.runner.settings import Settings
 
-
-@pytest.fixture
-def client() -> TestClient:
-    return TestClient(init_app())
+BRINJI = "28265140-c1a3-47c9-81a2-5fb05283ddc8"
 
 
 @pytest.fixture
-def receipts_db() -> ReceiptsDB:
-    return ReceiptsDB()
+def receipts_db(db: ConnectionPool) -> ReceiptsDB:
+    return ReceiptsDB(db)
 
 
 def test_should_not_get_unknown_receipt(
@@ -136,3 +140,150 @@ def test_delete_receipt_does_not_exist(
     assert response.json() == {
         "message": f"Receipt with id<{receipt_id}> does not exist."
     }
+
+
+@pytest.mark.parametrize(
+    "receipt_id",
+    ["e7ea17cc-7d62-4556-9b04-7713cae427bf", "385ee5de-0517-4b3a-b929-8fd70c71e7b7"],
+)
+def test_get_receipt_runs_constant_number_of_queries(
+    receipt_id: str, settings: Settings
+) -> None:
+    pool = ConnectionPool(settings.database, size=1)
+    statements: list[str] = []
+    with pool.acquire() as conn:
+        conn.set_trace_callback(statements.append)
+
+    receipt = ReceiptsDB(pool).get(UUID(receipt_id))
+    selects = [sql for sql in statements if sql.strip().startswith("SELECT")]
+    pool.close()
+
+    assert len(receipt.products) > 0
+    assert len(selects) == 2
+
+
+def test_receipt_keeps_price_at_time_of_sale(
+    client: TestClient, db: ConnectionPool
+) -> None:
+    product = {
+        "unit_id": "12c33cb8-9590-4a6e-9b59-5e3598d57e7c",
+        "name": "snapshot",
+        "barcode": "snapshot-0001",
+        "price": 2.5,
+    }
+    product_id = client.post("/products", json=product).json()["product"]["id"]
+    receipt_id = client.post("/receipts").json()["receipt"]["id"]
+    client.post(
+        f"/receipts/{receipt_id}/products", json={"id": product_id, "quantity": 2}
+    )
+
+    client.patch(f"/products/{product_id}", json={"new_price": 100})
+    response = client.post(
+        f"/receipts/{receipt_id}/products", json={"id": product_id, "quantity": 1}
+    )
+
+    assert response.json()["receipt"]["products"] == [
+        {"id": product_id, "quantity": 3, "price": 2.5, "total": 7.5}
+    ]
+    assert response.json()["receipt"]["total"] == 7.5
+
+    client.delete(f"/receipts/{receipt_id}")
+    ProductsDB(db).delete_product_by_id(product_id)
+
+
+def test_add_product_to_receipt_by_barcode(client: TestClient) -> None:
+    receipt_id = client.post("/receipts").json()["receipt"]["id"]
+
+    response = client.post(
+        f"/receipts/{receipt_id}/products", json={"barcode": "010111", "quantity": 3}
+    )
+
+    assert response.status_code == 201
+    assert response.json()["receipt"]["products"][0]["id"] == (
+        "c7cbcfa2-90e3-4cfc-aa14-efc42037d4d2"
+    )
+
+    response = client.post(
+        f"/receipts/{receipt_id}/products", json={"barcode": "missing", "quantity": 1}
+    )
+
+    assert response.status_code == 404
+    assert response.json() == {
+        "message": "Product with barcode<missing> does not exist."
+    }
+
+    client.delete(f"/receipts/{receipt_id}")
+
+
+def test_add_products_to_receipt_in_batch(client: TestClient) -> None:
+    receipt_id = client.post("/receipts").json()["receipt"]["id"]
+    brinji = "28265140-c1a3-47c9-81a2-5fb05283ddc8"
+    yveli = "c7cbcfa2-90e3-4cfc-aa14-efc42037d4d2"
+    unknown = str(uuid4())
+
+    response = client.post(
+        f"/receipts/{receipt_id}/products/batch",
+        json=[{"id": yveli, "quantity": 1}, {"id": unknown, "quantity": 1}],
+    )
+
+    assert response.status_code == 404
+    assert response.json() == {"message": f"Product with id<{unknown}> does not exist."}
+
+    client.post(f"/receipts/{receipt_id}/products", json={"id": yveli, "quantity": 1})
+    response = client.post(
+        f"/receipts/{receipt_id}/products/batch",
+        json=[
+            {"id": yveli, "quantity": 2},
+            {"id": brinji, "quantity": 1},
+            {"id": yveli, "quantity": 3},
+        ],
+    )
+
+    assert response.status_code == 201
+    receipt = response.json()["receipt"]
+    assert {p["id"]: p["quantity"] for p in receipt["products"]} == {
+        yveli: 6,
+        brinji: 1,
+    }
+    assert receipt["total"] == 6 * 10.0 + 1000.0
+
+    client.delete(f"/receipts/{receipt_id}")
+
+
+@pytest.mark.parametrize(
+    "path, body",
+    [
+        ("products", {"id": BRINJI, "quantity": 5}),
+        ("products/batch", [{"id": BRINJI, "quantity": 5}]),
+    ],
+)
+def test_should_not_add_products_to_closed_receipt(
+    client: TestClient, path: str, body: object
+) -> None:
+    receipt_id = client.post("/receipts").json()["receipt"]["id"]
+    line = {"id": BRINJI, "quantity": 1}
+    client.post(f"/receipts/{receipt_id}/products", json=line)
+    client.patch(f"/receipts/{receipt_id}", json={"status": "closed"})
+    receipt = client.get(f"/receipts/{receipt_id}").json()
+    sales = client.get("/sales").json()
+
+    response = client.post(f"/receipts/{receipt_id}/{path}", json=body)
+
+    assert response.status_code == 403
+    assert response.json() == {"message": f"Receipt with id<{receipt_id}> is closed."}
+    assert client.get(f"/receipts/{receipt_id}").json() == receipt
+    assert client.get("/sales").json() == sales
+
+
+def test_batch_add_prices_lines_through_the_catalog(db: ConnectionPool) -> None:
+    cache = ProductCache()
+    unit_id = UUID("12c33cb8-9590-4a6e-9b59-5e3598d57e7c")
+    cache.put(Product(unit_id, "b", "010110", 4, UUID(BRINJI)))
+    receipts = ReceiptsDB(db, CachedProductsDB(ProductsDB(db), cache, db))
+    receipt_id = receipts.create().id
+
+    receipts.add_products(receipt_id, {UUID(BRINJI): 2})
+    receipts.add_product(receipt_id, UUID(BRINJI), 1)
+
+    assert receipts.get(receipt_id).total == 12
+    receipts.delete(receipt_id)
@@ -1,29 +1,182 @@
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
 from typing import Any
+from uuid import UUID
 
-import pytest
 from fastapi.testclient import TestClient
 
-from pos_system.infra.repository import ReportDB
-from pos_system.runner.setup import init_app
-
-
-@pytest.fixture
-def client() -> TestClient:
-    return TestClient(init_app())
+from pos_system.benchmarks.common import seed_products
+from pos_system.core.report import Report
+from pos_system.infra.repository import (
+    ConnectionPool,
+    ProductsDB,
+    ReceiptsDB,
+    ReportDB,
+)
+from pos_system.infra.repository.analytics import SalesAnalyticsDB
+from pos_system.sqlite import create_tables
 
 
 @dataclass
 class Fake:
+    db: ConnectionPool
+
     def report(self) -> dict[str, Any]:
-        db = ReportDB()
-        report = db.get()
+        report = ReportDB(self.db).get()
         return {"n_receipts": report.n_receipts, "revenue": report.revenue}
 
 
-def test_should_return_sales_report(client: TestClient) -> None:
-    report = Fake().report()
+def test_should_return_sales_report(client: TestClient, db: ConnectionPool) -> None:
+    report = Fake(db).report()
     response = client.get("/sales")
 
     assert response.status_code == 200
     assert response.json() == {"sales": {**report}}
+
+
+def test_should_roll_up_closed_receipts_by_bucket(client: TestClient) -> None:
+    since = (datetime.now(timezone.utc) - timedelta(days=1)).isoformat()
+    params = {"from": since, "granularity": "day"}
+    before = client.get("/sales", params=params).json()["sales"]
+
+    receipt_id = client.post("/receipts").json()["receipt"]["id"]
+    client.post(
+        f"/receipts/{receipt_id}/products",
+        json={"id": "28265140-c1a3-47c9-81a2-5fb05283ddc8", "quantity": 2},
+    )
+    client.patch(f"/receipts/{receipt_id}", json={"status": "closed"})
+
+    response = client.get("/sales", params=params)
+
+    assert response.status_code == 200
+    assert response.json()["sales"] == {
+        "n_receipts": before["n_receipts"] + 1,
+        "revenue": before["revenue"] + 2000,
+    }
+    (bucket,) = response.json()["buckets"][-1:]
+    assert bucket["start"].endswith("00:00:00Z")
+
+
+def test_should_not_include_buckets_in_lifetime_report(client: TestClient) -> None:
+    assert "buckets" not in client.get("/sales").json()
+
+
+def test_should_require_granularity_for_a_period(client: TestClient) -> None:
+    response = client.get("/sales", params={"from": "2024-05-01T00:00:00Z"})
+
+    assert response.status_code == 422
+    assert response.json() == {"message": "A period needs a granularity: hour or day."}
+
+
+REGISTERS = 8
+RECEIPTS_PER_REGISTER = 10
+SCANS_PER_RECEIPT = 5
+
+
+def test_should_keep_exact_totals_under_concurrent_registers(tmp_path: Path) -> None:
+    db_file = str(tmp_path / "registers.db")
+    create_tables(db_file)
+    (product_id,) = seed_products(db_file, 1, price=1.5)
+    pool = ConnectionPool(db_file)
+
+    with ThreadPoolExecutor(REGISTERS) as executor:
+        list(
+            executor.map(
+                lambda _: run_register(pool, product_id, RECEIPTS_PER_REGISTER),
+                range(REGISTERS),
+            )
+        )
+    report = ReportDB(pool).get()
+    pool.close()
+
+    closed = REGISTERS * RECEIPTS_PER_REGISTER
+    assert report == Report(closed, closed * SCANS_PER_RECEIPT * 1.5)
+
+
+def run_register(pool: ConnectionPool, product_id: UUID, receipts: int) -> None:
+    for _ in range(receipts):
+        with pool.unit_of_work(immediate=True) as uow:
+            receipt = ReceiptsDB(uow).create()
+        for _ in range(SCANS_PER_RECEIPT):
+            with pool.unit_of_work(immediate=True) as uow:
+                ReceiptsDB(uow).add_product(receipt.id, product_id, 1)
+        with pool.unit_of_work(immediate=True) as uow:
+            ReceiptsDB(uow).close(receipt.id)
+
+
+def test_should_recognise_revenue_once_at_close(client: TestClient) -> None:
+    before = client.get("/sales").json()["sales"]
+    receipt_id = client.post("/receipts").json()["receipt"]["id"]
+    client.post(
+        f"/receipts/{receipt_id}/products",
+        json={"id": "c7cbcfa2-90e3-4cfc-aa14-efc42037d4d2", "quantity": 3},
+    )
+
+    assert client.get("/sales").json()["sales"] == before
+
+    client.patch(f"/receipts/{receipt_id}", json={"status": "closed"})
+    client.patch(f"/receipts/{receipt_id}", json={"status": "closed"})
+
+    assert client.get("/sales").json()["sales"] == {
+        "n_receipts": before["n_receipts"] + 1,
+        "revenue": before["revenue"] + 30,
+    }
+
+
+def test_should_aggregate_closed_sales_per_product_and_unit(tmp_path: Path) -> None:
+    db_file = str(tmp_path / "analytics.db")
+    create_tables(db_file)
+    first, second = seed_products(db_file, 2, price=1.5)
+    pool = ConnectionPool(db_file)
+    receipts = ReceiptsDB(pool)
+    for basket in ({first: 2, second: 1}, {first: 1}):
+        receipt = receipts.create()
+        receipts.add_products(receipt.id, basket)
+        receipts.close(receipt.id)
+    receipts.add_products(receipts.create().id, {second: 5})
+    pool.close()
+
+    summary = SalesAnalyticsDB(db_file, chunk_size=2).summarise(None, None)
+
+    assert [(p.id, p.quantity, p.revenue) for p in summary.products] == [
+        (first, 3, 4.5),
+        (second, 1, 1.5),
+    ]
+    assert [(u.quantity, u.revenue) for u in summary.units] == [(4, 6.0)]
+    assert summary.basket_sizes == {1: 1, 3: 1}
+
+
+def test_should_keep_sales_of_deleted_products(tmp_path: Path) -> None:
+    db_file = str(tmp_path / "analytics.db")
+    create_tables(db_file)
+    first, second = seed_products(db_file, 2, price=1.5)
+    pool = ConnectionPool(db_file)
+    receipts = ReceiptsDB(pool)
+    receipt = receipts.create()
+    receipts.add_products(receipt.id, {first: 1, second: 2})
+    receipts.close(receipt.id)
+    ProductsDB(pool).delete_product_by_id(str(second))
+    report = ReportDB(pool).get()
+    pool.close()
+
+    summary = SalesAnalyticsDB(db_file).summarise(None, None)
+
+    assert [(p.id, p.unit_id, p.revenue) for p in summary.products][0] == (
+        second,
+        None,
+        3.0,
+    )
+    assert sum(unit.revenue for unit in summary.units) == report.revenue
+    assert [u.id for u in summary.units if u.id is None] == [None]
+
+
+def test_should_return_unit_sales_from_worker_process(client: TestClient) -> None:
+    response = client.get("/sales/units")
+
+    assert response.status_code == 200
+    assert {unit["id"] for unit in response.json()["units"]} <= {
+        "a22c734a-d034-4527-81df-c29b42dfd2f9",
+        "12c33cb8-9590-4a6e-9b59-5e3598d57e7c",
+    }
@@ -0,0 +1,48 @@
+import pytest
+from typer import BadParameter
+
+from pos_system.infra.repository import ConnectionPool
+from pos_system.runner.cli import check_shareable
+from pos_system.runner.settings import Settings
+
+
+def test_should_read_settings_from_environment() -> None:
+    environ = {
+        "POS_DATABASE": "/dev/shm/pos.db",
+        "POS_POOL_SIZE": "4",
+        "POS_TRACE_SQL": "true",
+        "POS_QUERY_BUDGET": "12",
+    }
+
+    assert Settings.from_env(environ) == Settings("/dev/shm/pos.db", 4, True, 12)
+    assert Settings.from_env({}) == Settings()
+
+
+def test_named_memory_database_is_shared_by_pools() -> None:
+    writer = ConnectionPool("memory:settings-test")
+    with writer.transaction() as cursor:
+        cursor.execute("CREATE TABLE t (x INTEGER)")
+        cursor.execute("INSERT INTO t VALUES (1)")
+
+    reader = ConnectionPool("memory:settings-test")
+    with reader.transaction() as cursor:
+        assert cursor.execute("SELECT x FROM t").fetchall() == [(1,)]
+    reader.close()
+    writer.close()
+
+
+def test_settings_survive_the_environment_round_trip() -> None:
+    settings = Settings(
+        "/tmp/pos.db", 2, query_budget=0, writer=True, cache_products=False
+    )
+
+    assert Settings.from_env(settings.to_env()) == settings
+    assert Settings.from_env(Settings().to_env()) == Settings()
+
+
+def test_workers_reject_state_held_in_process() -> None:
+    with pytest.raises(BadParameter):
+        check_shareable(Settings("memory:workers"))
+    with pytest.raises(BadParameter):
+        check_shareable(Settings(journal="receipts.journal"))
+    check_shareable(Settings("/tmp/pos.db", writer=True))
@@ -0,0 +1,36 @@
+from pathlib import Path
+from uuid import UUID
+
+from fastapi.testclient import TestClient
+
+from pos_system.infra.repository import ConnectionPool
+from pos_system.infra.repository.migrations import migrate
+from pos_system.runner.settings import Settings
+from pos_system.runner.setup import init_app, tidy
+
+
+def test_startup_bootstraps_a_new_database_and_warms_caches(tmp_path: Path) -> None:
+    settings = Settings(str(tmp_path / "pos.db"))
+    with TestClient(init_app(settings)) as client:
+        unit = client.post("/units", json={"name": "kg"}).json()["unit"]
+        product = {"unit_id": unit["id"], "name": "a", "barcode": "1", "price": 3}
+        product_id = client.post("/products", json=product).json()["product"]["id"]
+
+    app = init_app(settings)
+    with TestClient(app) as client:
+        assert app.state.unit_cache.get(UUID(unit["id"])) is not None
+        assert app.state.product_cache.get(UUID(product_id)) is not None
+        assert client.get("/sales").json()["sales"] == {"n_receipts": 0, "revenue": 0}
+
+
+def test_shutdown_checkpoints_the_wal(tmp_path: Path) -> None:
+    db = ConnectionPool(str(tmp_path / "pos.db"))
+    with db.acquire() as conn:
+        migrate(conn)
+    wal = tmp_path / "pos.db-wal"
+    # An open connection keeps SQLite from deleting the WAL on close.
+    with db.acquire():
+        assert wal.stat().st_size > 0
+        tidy(db)
+        assert wal.stat().st_size == 0
+    db.close()
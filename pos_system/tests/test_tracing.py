@@ -0,0 +1,88 @@
+import json
+import logging
+from dataclasses import replace
+from typing import Any, Iterator
+
+import pytest
+from fastapi.testclient import TestClient
+from httpx import Response
+
+from pos_system.runner.settings import Settings
+from pos_system.runner.setup import init_app
+
+UNIT_ID = "a22c734a-d034-4527-81df-c29b42dfd2f9"
+PRODUCT_ID = "28265140-c1a3-47c9-81a2-5fb05283ddc8"
+RECEIPT_ID = "e7ea17cc-7d62-4556-9b04-7713cae427bf"
+
+
+@pytest.fixture
+def client(settings: Settings) -> Iterator[TestClient]:
+    with TestClient(init_app(replace(settings, trace_sql=True))) as client:
+        yield client
+
+
+def statements(response: Response) -> int:
+    trace: dict[str, Any] = json.loads(response.headers["x-query-trace"])
+    assert trace["count"] == len(trace["statements"])
+    assert trace["call_ms"] >= 0
+    return int(trace["count"])
+
+
+@pytest.mark.parametrize(
+    "path, budget",
+    [
+        (f"/units/{UNIT_ID}", 5),
+        ("/units", 5),
+        (f"/products/{PRODUCT_ID}", 5),
+        ("/products", 5),
+        (f"/receipts/{RECEIPT_ID}", 6),
+        ("/sales", 5),
+    ],
+)
+def test_reads_should_stay_within_query_budget(
+    client: TestClient, path: str, budget: int
+) -> None:
+    response = client.get(path)
+
+    assert response.status_code == 200
+    assert statements(response) <= budget
+
+
+def test_receipt_writes_should_stay_within_query_budget(client: TestClient) -> None:
+    created = client.post("/receipts")
+    receipt_id = created.json()["receipt"]["id"]
+    added = client.post(
+        f"/receipts/{receipt_id}/products", json={"id": PRODUCT_ID, "quantity": 1}
+    )
+    batch = client.post(
+        f"/receipts/{receipt_id}/products/batch",
+        json=[{"id": PRODUCT_ID, "quantity": 1}],
+    )
+    deleted = client.delete(f"/receipts/{receipt_id}")
+
+    assert statements(created) <= 5
+    assert statements(added) <= 14
+    assert statements(batch) <= 12
+    assert statements(deleted) <= 7
+
+
+def test_should_log_requests_over_budget(
+    settings: Settings, caplog: pytest.LogCaptureFixture
+) -> None:
+    app = init_app(replace(settings, trace_sql=True, query_budget=1))
+
+    with TestClient(app) as client, caplog.at_level(
+        logging.WARNING, logger="pos_system.infra.tracing"
+    ):
+        response = client.get("/units")
+
+    (record,) = caplog.records
+    assert record.message == "Query budget exceeded"
+    assert record.__dict__["statements"] == statements(response)
+
+
+def test_should_not_trace_by_default(settings: Settings) -> None:
+    with TestClient(init_app(settings)) as client:
+        response = client.get(f"/units/{UNIT_ID}")
+
+    assert "x-query-trace" not in response.headers
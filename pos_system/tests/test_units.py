@@ -1,17 +1,12 @@
+import json
 from dataclasses import dataclass
 from typing import Any
 from uuid import UUID, uuid4
 
-import pytest
 from fastapi.testclient import TestClient
 
-from pos_system.infra.repository import UnitsDB
-from pos_system.runner.setup import init_app
-
-
-@pytest.fixture
-def client() -> TestClient:
-    return TestClient(init_app())
+from pos_system.core.units import Unit
+from pos_system.infra.repository import ConnectionPool, UnitCache, UnitsDB
 
 
 @dataclass
@@ -42,7 +37,7 @@ def test_should_get_known_unit(client: TestClient) -> None:
     }
 
 
-def test_should_create_unit_and_get_all(client: TestClient) -> None:
+def test_should_create_unit_and_get_all(client: TestClient, db: ConnectionPool) -> None:
     unit_data = Fake().unit()
 
     response = client.post("/units", json=unit_data)
@@ -61,5 +56,46 @@ def test_should_create_unit_and_get_all(client: TestClient) -> None:
     assert response.status_code == 409
     assert response.json() == {"message": f"Unit with name<{name}> already exist."}
 
-    unit_db = UnitsDB()
+    unit_db = UnitsDB(db)
     unit_db.delete_unit_by_name(name)
+
+
+def test_units_are_keyset_paginated(client: TestClient) -> None:
+    response = client.get("/units", params={"limit": 1})
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "units": [{"id": "12c33cb8-9590-4a6e-9b59-5e3598d57e7c", "name": "g"}]
+    }
+
+    after = response.json()["units"][0]["id"]
+    response = client.get("/units", params={"after": after, "limit": 1})
+
+    assert response.json() == {
+        "units": [{"id": "a22c734a-d034-4527-81df-c29b42dfd2f9", "name": "kg"}]
+    }
+
+
+def test_units_can_be_streamed_as_ndjson(client: TestClient) -> None:
+    response = client.get("/units", params={"stream": True})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert [json.loads(line)["name"] for line in response.iter_lines()] == ["g", "kg"]
+
+
+def test_unit_cache_is_bounded_and_drops_puts_after_invalidation() -> None:
+    cache = UnitCache(capacity=1)
+    a, b = Unit("a"), Unit("b")
+
+    cache.put(a)
+    cache.put(b)
+
+    assert cache.get(a.id) is None
+    assert cache.get(b.id) is b
+
+    generation = cache.generation
+    cache.invalidate(b.id)
+    cache.put(b, generation)
+
+    assert cache.get(b.id) is None
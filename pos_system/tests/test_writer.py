@@ -0,0 +1,76 @@
+import asyncio
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+from pos_system.core.errors import ExistsError
+from pos_system.core.units import Unit
+from pos_system.infra.repository import ConnectionPool, UnitsDB
+from pos_system.infra.repository.migrations import migrate
+from pos_system.infra.repository.writer import Writer
+from pos_system.runner.settings import Settings
+from pos_system.runner.setup import init_app
+
+
+def test_writer_batches_commands_and_isolates_failures(tmp_path: Path) -> None:
+    pool = ConnectionPool(str(tmp_path / "pos.db"))
+    with pool.acquire() as conn:
+        migrate(conn)
+    writer = Writer(pool)
+    units = UnitsDB(writer)
+
+    async def create_units() -> list[Unit | BaseException]:
+        names = [f"u{i}" for i in range(50)] + ["u0"]
+        return await asyncio.gather(
+            *(writer.run(units.create, Unit(name)) for name in names),
+            return_exceptions=True,
+        )
+
+    results = asyncio.run(create_units())
+    writer.shutdown()
+
+    assert [type(result) for result in results].count(ExistsError) == 1
+    assert len(UnitsDB(pool).get_all()) == 50
+    assert writer.commands == 51
+    assert writer.batches < writer.commands
+    pool.close()
+
+
+def test_failed_commands_drop_their_commit_callbacks(tmp_path: Path) -> None:
+    writer = Writer(ConnectionPool(str(tmp_path / "pos.db")))
+    committed: list[str] = []
+
+    def command(name: str, fail: bool) -> None:
+        writer.on_commit(lambda: committed.append(name))
+        with writer.transaction() as cursor:
+            cursor.execute("SELECT 1")
+            if fail:
+                raise ValueError(name)
+
+    async def run_commands() -> list[BaseException | None]:
+        results = await asyncio.gather(
+            writer.run(command, "kept", False),
+            writer.run(command, "dropped", True),
+            return_exceptions=True,
+        )
+        return list(results)
+
+    results = asyncio.run(run_commands())
+    writer.shutdown()
+
+    assert isinstance(results[1], ValueError)
+    assert committed == ["kept"]
+    writer.pool.close()
+
+
+def test_writes_through_the_writer(settings: Settings) -> None:
+    settings = Settings(settings.database, writer=True)
+
+    with TestClient(init_app(settings)) as client:
+        receipt_id = client.post("/receipts").json()["receipt"]["id"]
+        line = {"barcode": "010111", "quantity": 3}
+        response = client.post(f"/receipts/{receipt_id}/products", json=line)
+        deleted = client.delete(f"/receipts/{receipt_id}")
+
+    assert response.json()["receipt"]["total"] == 30
+    assert deleted.status_code == 200